@@ -0,0 +1,58 @@
+// Precaches every content asset listed in /precache-manifest.json (written by
+// scripts/build_json.py) and serves them cache-first, so no screen waits on the
+// network after the first start. src/main.tsx registers this script as
+// /sw.js?v=<manifest hash>, so every build that changes an asset installs the
+// worker again; only assets whose revision changed since the last install are
+// downloaded.
+const CACHE = "kiosk-precache-v1";
+const MANIFEST = "/precache-manifest.json";
+
+const absolute = url => new URL(url, self.location.origin).href;
+
+self.addEventListener("install", event => {
+  event.waitUntil((async () => {
+    const response = await fetch(MANIFEST, { cache: "no-store" });
+    if (!response.ok) return;
+    const manifest = await response.clone().json();
+    const cache = await caches.open(CACHE);
+    const previousResponse = await cache.match(MANIFEST);
+    const previous = previousResponse ? await previousResponse.json() : { assets: [] };
+    const revisions = new Map(previous.assets.map(a => [a.url, a.revision]));
+    for (const asset of manifest.assets) {
+      if (revisions.get(asset.url) === asset.revision && (await cache.match(absolute(asset.url)))) continue;
+      const res = await fetch(asset.url, { cache: "reload" });
+      if (res.ok) await cache.put(absolute(asset.url), res);
+    }
+    await cache.put(MANIFEST, response);
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener("activate", event => {
+  event.waitUntil((async () => {
+    const names = await caches.keys();
+    await Promise.all(names.filter(name => name.startsWith("kiosk-precache-") && name !== CACHE).map(name => caches.delete(name)));
+    const cache = await caches.open(CACHE);
+    const manifestResponse = await cache.match(MANIFEST);
+    if (manifestResponse) {
+      const keep = new Set((await manifestResponse.json()).assets.map(a => absolute(a.url)));
+      keep.add(absolute(MANIFEST));
+      for (const request of await cache.keys()) {
+        if (!keep.has(request.url)) await cache.delete(request);
+      }
+    }
+    await self.clients.claim();
+  })());
+});
+
+self.addEventListener("fetch", event => {
+  const { request } = event;
+  if (request.method !== "GET" || new URL(request.url).origin !== self.location.origin) return;
+  // Media range requests go to the network; the precache holds whole files
+  if (request.url === absolute(MANIFEST) || request.headers.has("range")) return;
+  event.respondWith(
+    caches.open(CACHE)
+      .then(cache => cache.match(request.url))
+      .then(hit => hit || fetch(request)),
+  );
+});
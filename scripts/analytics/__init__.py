@@ -0,0 +1,11 @@
+"""Offline analytics over the kiosk's ``server/analytics.db``.
+
+Run ``python scripts/analytics --help`` for the commands.
+"""
+from .db import DEFAULT_DB, AnalyticsError, columns, connect, rows, since_cutoff
+from .summaries import (
+  REPORTS, daily, domain_stats, dwell_percentiles, project_stats, question_stats,
+  quiz_skips, screensaver, stage_stats, summary, top_sessions,
+)
+from .rollups import DEFAULT_ROLLUP_DB, open_rollups, update as update_rollups
+from .sessions import SessionStats, analyze as analyze_sessions
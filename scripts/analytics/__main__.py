@@ -0,0 +1,34 @@
+"""``python scripts/analytics <command> [options]``"""
+import pathlib
+import sys
+
+if not __package__:
+  # Run as ``python scripts/analytics``: make the package importable by name
+  sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+  __package__ = "analytics"
+
+from analytics import export, ingest_bench, merge, query_bench, quiz, report, retention, rollups, sessions
+
+COMMANDS = {
+  "bench-ingest": ingest_bench.main,
+  "bench-queries": query_bench.main,
+  "export": export.main,
+  "merge": merge.main,
+  "quiz": quiz.main,
+  "report": report.main,
+  "retention": retention.main,
+  "rollup": rollups.main,
+  "sessions": sessions.main,
+}
+
+
+def main(argv=None):
+  argv = sys.argv[1:] if argv is None else argv
+  if not argv or argv[0] not in COMMANDS:
+    names = ", ".join(COMMANDS)
+    sys.exit(f"usage: python scripts/analytics <command> [options]  (commands: {names})")
+  COMMANDS[argv[0]](argv[1:])
+
+
+if __name__ == "__main__":
+  main()
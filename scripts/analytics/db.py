@@ -0,0 +1,96 @@
+"""Read-only access to the analytics server's ``analytics.db``.
+
+The server (``server/index.js``) keeps the database in memory with sql.js
+and rewrites the whole file after each ingest batch, so readers here never
+take a lock the server waits on. The file is opened with ``mode=ro``; a read
+that races a rewrite fails with "malformed" or "not a database" and is
+retried.
+"""
+import array
+import pathlib
+import sqlite3
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+DEFAULT_DB = ROOT / "server" / "analytics.db"
+
+COLUMNS = ("id", "sessionId", "ts", "type", "stageId", "domainId", "appVersion", "payload")
+OPEN_RETRIES = 5
+FETCH_BATCH = 50_000
+
+
+class AnalyticsError(RuntimeError):
+  """The analytics database is missing, unreadable or lacks what a query needs."""
+
+
+def connect(path=DEFAULT_DB, retries=OPEN_RETRIES):
+  """Open ``path`` read-only and check it has an ``events`` table and JSON1."""
+  path = pathlib.Path(path)
+  if not path.is_file():
+    raise AnalyticsError(f"{path}: no such database")
+  uri = f"{path.resolve().as_uri()}?mode=ro"
+  for attempt in range(retries):
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    try:
+      conn.execute("SELECT json_extract('{}', '$.x')")
+      conn.execute("SELECT 1 FROM events LIMIT 1").fetchall()
+      return conn
+    except sqlite3.OperationalError as e:
+      conn.close()
+      if "no such function" in str(e):
+        raise AnalyticsError(f"SQLite {sqlite3.sqlite_version} lacks the JSON1 functions") from None
+      if "no such table" in str(e):
+        raise AnalyticsError(f"{path}: no events table (not an analytics database?)") from None
+      error = e
+    except sqlite3.DatabaseError as e:
+      # The server was halfway through rewriting the file
+      conn.close()
+      error = e
+    time.sleep(0.05 * (attempt + 1))
+  raise AnalyticsError(f"{path}: {error}")
+
+
+def since_cutoff(since_hours=None, now_ms=None):
+  """Epoch-ms cutoff for a ``sinceHours`` filter, or None (same as the server's ``sinceClause``)."""
+  if since_hours is None:
+    return None
+  now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+  return now_ms - since_hours * 3600 * 1000
+
+
+def where(*conditions, cutoff=None):
+  """``(sql, params)`` for a WHERE clause from fixed conditions plus the optional ts cutoff."""
+  conditions = list(conditions)
+  params = []
+  if cutoff is not None:
+    conditions.append("ts >= ?")
+    params.append(cutoff)
+  return ("WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+
+def rows(conn, sql, params=()):
+  """Run a query and return a list of dicts keyed by column name."""
+  cur = conn.execute(sql, params)
+  names = [d[0] for d in cur.description]
+  return [dict(zip(names, row)) for row in cur]
+
+
+def columns(conn, sql, params=(), typecodes=None):
+  """Run a query and return its result as columns instead of rows.
+
+  ``typecodes`` maps column names to ``array`` typecodes (``"q"`` for ints,
+  ``"d"`` for floats); those columns come back as compact ``array.array``
+  buffers, the others as lists. Rows are fetched in batches, so millions of
+  events never exist as Python tuples all at once.
+  """
+  typecodes = typecodes or {}
+  cur = conn.execute(sql, params)
+  names = [d[0] for d in cur.description]
+  out = {name: array.array(typecodes[name]) if name in typecodes else [] for name in names}
+  targets = [out[name] for name in names]
+  while True:
+    batch = cur.fetchmany(FETCH_BATCH)
+    if not batch:
+      return out
+    for target, values in zip(targets, zip(*batch)):
+      target.extend(values)
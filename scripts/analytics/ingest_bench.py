@@ -0,0 +1,331 @@
+"""Drive the analytics server's ingest endpoint with synthetic kiosks.
+
+Each simulated kiosk is an asyncio task with its own keep-alive HTTP/1.1
+connection that POSTs batches of events from ``synthetic`` exactly as
+``src/analytics/client.ts`` does (``{sessionId, appVersion, events}``, at
+most 50 events per request). A sampler records the database file size and
+acknowledged events over time, and optional SSE subscribers on
+``/api/analytics/stream`` make the server pay for its per-ingest broadcast
+of ``currentSummary()``.
+
+The report has throughput (events and requests per second), request latency
+percentiles, errors by status, and the ``analytics.db`` growth timeline;
+``--json`` writes it as a machine-readable file to compare runs.
+
+The server writes to its own ``server/analytics.db``: run the benchmark
+against a scratch checkout or a copy of the server directory, never the
+live stand. ``--url`` has no default, and the run refuses to start when the
+server's health check reports it writes the stand's own ``server/analytics.db``
+(or ``--db`` names that file)::
+
+  (cd /tmp/stand-bench/server && PORT=4100 node index.js) &
+  python scripts/analytics bench-ingest --url http://127.0.0.1:4100 \\
+      --db /tmp/stand-bench/server/analytics.db --kiosks 8 --duration 60 --json ingest.json
+
+Only the standard library is used, so no HTTP client needs installing.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import pathlib
+import sys
+import time
+import urllib.parse
+
+from .db import DEFAULT_DB, AnalyticsError
+from .synthetic import APP_VERSION, CONTENT_DIR, Catalog, kiosks
+
+ENDPOINTS = {"json": "/api/analytics/events", "plain": "/api/analytics/events-plain"}
+CONTENT_TYPES = {"json": "application/json", "plain": "text/plain"}
+# client.ts sends at most this many queued events per request
+MAX_BATCH = 50
+SAMPLE_SECONDS = 1.0
+
+
+class Connection:
+  """A keep-alive HTTP/1.1 connection that reconnects after errors."""
+
+  def __init__(self, host, port):
+    self.host = host
+    self.port = port
+    self.reader = self.writer = None
+
+  async def _open(self):
+    self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+  def close(self):
+    if self.writer is not None:
+      self.writer.close()
+      self.reader = self.writer = None
+
+  async def request(self, method, path, body=b"", content_type="application/json"):
+    """Send one request; returns ``(status, body)``."""
+    if self.writer is None:
+      await self._open()
+    head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n")
+    try:
+      self.writer.write(head.encode("ascii") + body)
+      await self.writer.drain()
+      status_line = await self.reader.readline()
+      if not status_line:
+        raise ConnectionError("server closed the connection")
+      status = int(status_line.split()[1])
+      length = None
+      chunked = False
+      keep_alive = True
+      while True:
+        line = await self.reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+          break
+        name, _, value = line.decode("latin-1").partition(":")
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == "content-length":
+          length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value:
+          chunked = True
+        elif name == "connection" and value == "close":
+          keep_alive = False
+      if chunked:
+        data = b""
+        while True:
+          size = int((await self.reader.readline()).split(b";")[0], 16)
+          chunk = await self.reader.readexactly(size + 2)
+          if not size:
+            break
+          data += chunk[:-2]
+      elif length is not None:
+        data = await self.reader.readexactly(length)
+      else:
+        data = await self.reader.read()
+        keep_alive = False
+    except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+      self.close()
+      raise
+    if not keep_alive:
+      self.close()
+    return status, data
+
+
+class Stats:
+  """Counters shared by the kiosk tasks."""
+
+  def __init__(self):
+    self.latencies = []
+    self.requests = 0
+    self.events = 0
+    self.errors = {}
+    self.sse_bytes = 0
+
+  def error(self, key):
+    self.errors[key] = self.errors.get(key, 0) + 1
+
+
+def percentile(ordered, q):
+  if not ordered:
+    return None
+  return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+async def run_kiosk(visitor, conn, path, fmt, batch, interval, deadline, budget, stats):
+  stream = iter(visitor)
+  content_type = CONTENT_TYPES[fmt]
+  next_send = time.perf_counter()
+  while time.perf_counter() < deadline and budget[0] > 0:
+    size = min(batch, budget[0])
+    budget[0] -= size
+    events = [next(stream) for _ in range(size)]
+    body = json.dumps({"sessionId": visitor.session_id, "appVersion": APP_VERSION, "events": events}).encode()
+    started = time.perf_counter()
+    try:
+      status, _ = await conn.request("POST", path, body, content_type)
+    except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+      stats.error(type(e).__name__)
+      await asyncio.sleep(0.1)
+      continue
+    elapsed = time.perf_counter() - started
+    stats.requests += 1
+    if status == 200:
+      stats.latencies.append(elapsed)
+      stats.events += size
+    else:
+      stats.error(f"HTTP {status}")
+    if interval:
+      next_send += interval
+      delay = next_send - time.perf_counter()
+      if delay > 0:
+        await asyncio.sleep(delay)
+  conn.close()
+
+
+async def run_subscriber(host, port, stats):
+  """Hold an SSE stream open and count what the server broadcasts."""
+  try:
+    reader, writer = await asyncio.open_connection(host, port)
+  except OSError as e:
+    stats.error(f"sse {type(e).__name__}")
+    return
+  writer.write(f"GET /api/analytics/stream HTTP/1.1\r\nHost: {host}:{port}\r\n"
+               "Accept: text/event-stream\r\n\r\n".encode("ascii"))
+  try:
+    while True:
+      data = await reader.read(65536)
+      if not data:
+        return
+      stats.sse_bytes += len(data)
+  finally:
+    writer.close()
+
+
+def db_id(path):
+  """The ``dbId`` the server's health check reports when it writes ``path`` (see server/index.js)."""
+  path = pathlib.Path(path)
+  return hashlib.sha256(str(path.parent.resolve() / path.name).encode("utf-8")).hexdigest()[:16]
+
+
+def _db_size(db):
+  try:
+    return os.stat(db).st_size
+  except (FileNotFoundError, TypeError):
+    return None
+
+
+async def run_sampler(db, stats, started, timeline, interval=SAMPLE_SECONDS):
+  while True:
+    timeline.append({
+      "seconds": round(time.perf_counter() - started, 3),
+      "events": stats.events,
+      "requests": stats.requests,
+      "dbBytes": _db_size(db),
+    })
+    await asyncio.sleep(interval)
+
+
+async def bench(url, catalog, kiosk_count=4, duration=30.0, total_events=None, batch=10, rate=None,
+                fmt="json", subscribers=0, db=None, seed=0, settle=1.0):
+  """Run the benchmark and return the report dict. Refuses to run against the live stand's database."""
+  if db is not None and pathlib.Path(db).resolve() == DEFAULT_DB.resolve():
+    raise AnalyticsError(f"{db} is the live stand's database; benchmark a copy of the server instead")
+  parsed = urllib.parse.urlsplit(url)
+  host, port = parsed.hostname or "127.0.0.1", parsed.port or 80
+  path = (parsed.path.rstrip("/") or "") + ENDPOINTS[fmt]
+  stats = Stats()
+  timeline = []
+
+  probe = Connection(host, port)
+  status, body = await probe.request("GET", (parsed.path.rstrip("/") or "") + "/api/analytics/health")
+  probe.close()
+  if status != 200:
+    raise ConnectionError(f"{url}/api/analytics/health answered HTTP {status}")
+  try:
+    health = json.loads(body)
+  except ValueError:
+    health = {}
+  if isinstance(health, dict) and health.get("dbId") == db_id(DEFAULT_DB):
+    raise AnalyticsError(f"{url} is the live stand's server (it writes {DEFAULT_DB}); "
+                         "benchmark a copy of the server on another port instead")
+
+  db_before = _db_size(db)
+  sse = [asyncio.create_task(run_subscriber(host, port, stats)) for _ in range(subscribers)]
+  started = time.perf_counter()
+  sampler = asyncio.create_task(run_sampler(db, stats, started, timeline))
+  deadline = started + duration if duration else float("inf")
+  budget = [total_events if total_events else float("inf")]
+  interval = batch * kiosk_count / rate if rate else 0
+  visitors = kiosks(catalog, kiosk_count, seed, start_ms=int(time.time() * 1000))
+  await asyncio.gather(*(
+    run_kiosk(v, Connection(host, port), path, fmt, batch, interval, deadline, budget, stats) for v in visitors
+  ))
+  elapsed = time.perf_counter() - started
+  # The server saves on a debounce timer; give the last write a moment to land
+  await asyncio.sleep(settle)
+  sampler.cancel()
+  for task in sse:
+    task.cancel()
+  await asyncio.gather(sampler, *sse, return_exceptions=True)
+  timeline.append({"seconds": round(time.perf_counter() - started, 3), "events": stats.events,
+                   "requests": stats.requests, "dbBytes": _db_size(db)})
+
+  ordered = sorted(stats.latencies)
+
+  def ms(q):
+    return None if not ordered else round(percentile(ordered, q) * 1000, 2)
+
+  db_after = _db_size(db)
+  # A missing file before the run is a fresh server that has not saved yet
+  growth = None if db_after is None else db_after - (db_before or 0)
+  return {
+    "url": url,
+    "endpoint": path,
+    "kiosks": kiosk_count,
+    "batch": batch,
+    "targetRate": rate,
+    "sseSubscribers": subscribers,
+    "seconds": round(elapsed, 3),
+    "requests": stats.requests,
+    "events": stats.events,
+    "errors": stats.errors,
+    "eventsPerSecond": round(stats.events / elapsed, 1) if elapsed else None,
+    "requestsPerSecond": round(stats.requests / elapsed, 1) if elapsed else None,
+    "latencyMs": {"p50": ms(0.5), "p90": ms(0.9), "p99": ms(0.99),
+                  "max": round(ordered[-1] * 1000, 2) if ordered else None},
+    "db": {"path": None if db is None else str(db), "bytesBefore": db_before, "bytesAfter": db_after, "growth": growth,
+           "bytesPerEvent": round(growth / stats.events, 1) if growth is not None and stats.events else None},
+    "sseBytes": stats.sse_bytes,
+    "timeline": timeline,
+  }
+
+
+def print_report(report):
+  lat = report["latencyMs"]
+  print(f"{report['events']:,} events in {report['requests']:,} requests over {report['seconds']:.1f} s "
+        f"({report['kiosks']} kiosks, batch {report['batch']}, {report['sseSubscribers']} SSE)")
+  print(f"  throughput  {report['eventsPerSecond']} events/s  {report['requestsPerSecond']} req/s")
+  print(f"  latency     p50 {lat['p50']} ms  p90 {lat['p90']} ms  p99 {lat['p99']} ms  max {lat['max']} ms")
+  db = report["db"]
+  if db["growth"] is not None:
+    print(f"  db growth   {db['bytesBefore'] or 0:,} -> {db['bytesAfter']:,} bytes "
+          f"(+{db['growth']:,}, {db['bytesPerEvent']} bytes/event)")
+  elif db["path"] is None:
+    print("  db growth   not tracked; pass --db with the server's database file")
+  else:
+    print(f"  db growth   {db['path']} not found; pass --db to track it")
+  if report["errors"]:
+    print("  errors      " + ", ".join(f"{k}: {v}" for k, v in sorted(report["errors"].items())))
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog="analytics bench-ingest", description="Load-test the ingest endpoint.")
+  parser.add_argument("--url", required=True,
+                      help="base URL of a scratch server, e.g. http://127.0.0.1:4100 (never the live stand)")
+  parser.add_argument("--db", type=pathlib.Path, default=None,
+                      help="that server's database file, sampled for growth (default: not tracked)")
+  parser.add_argument("--kiosks", type=int, default=4, help="concurrent clients (default: %(default)s)")
+  parser.add_argument("--duration", type=float, default=30.0, help="seconds to run (default: %(default)s)")
+  parser.add_argument("--events", type=int, default=None, help="stop after this many events")
+  parser.add_argument("--batch", type=int, default=10, help=f"events per request, at most {MAX_BATCH} like the client")
+  parser.add_argument("--rate", type=float, default=None, help="target events/s across all kiosks (default: flat out)")
+  parser.add_argument("--format", choices=tuple(ENDPOINTS), default="json",
+                      help="json: /api/analytics/events, plain: the text/plain no-preflight endpoint")
+  parser.add_argument("--sse", type=int, default=0, help="SSE subscribers to hold open (default: %(default)s)")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--content", type=pathlib.Path, default=CONTENT_DIR)
+  parser.add_argument("--json", type=pathlib.Path, default=None, help="write the full report here")
+  args = parser.parse_args(argv)
+  if not 1 <= args.batch <= MAX_BATCH:
+    parser.error(f"--batch must be between 1 and {MAX_BATCH}")
+
+  catalog = Catalog.load(args.content)
+  try:
+    report = asyncio.run(bench(args.url, catalog, args.kiosks, args.duration, args.events, args.batch,
+                               args.rate, args.format, args.sse, args.db, args.seed))
+  except AnalyticsError as e:
+    sys.exit(f"analytics: {e}")
+  except OSError as e:
+    sys.exit(f"analytics: cannot reach {args.url}: {e}")
+  print_report(report)
+  if args.json:
+    args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"  report      {args.json}")
@@ -0,0 +1,207 @@
+"""Merge many stands' ``analytics.db`` snapshots into one fleet database.
+
+The fleet database has the server's ``events`` table plus a ``standId``
+column, so every other command (``report``, ``rollup``, ``export``) works on
+it unchanged via ``--db``. Events are deduplicated by ``id`` (client UUIDs)
+with ``INSERT OR IGNORE``: the first stand to contribute an event keeps it.
+
+Each source is attached read-only and copied with ``INSERT ... SELECT`` in
+rowid chunks, so rows stream inside SQLite and never pass through Python.
+Per-source watermarks (rowid plus the id at that rowid, as in the rollups)
+make re-merging a fresh snapshot copy only its new events. A source whose
+watermark row changed (replaced or VACUUMed) is rescanned from the start,
+which the dedup makes harmless.
+
+Secondary indexes are dropped before a large load and rebuilt once after
+it, which is much faster than maintaining them row by row. Small
+incremental merges keep them.
+
+Usage::
+
+  python scripts/analytics merge fleet.db snapshots/*/analytics.db      # stand id = directory name
+  python scripts/analytics merge fleet.db lobby=/mnt/lobby/analytics.db foyer=foyer.db
+"""
+import argparse
+import pathlib
+import sqlite3
+import sys
+import time
+
+from .db import AnalyticsError, connect
+
+DEFAULT_FLEET_DB = pathlib.Path("fleet_analytics.db")
+CHUNK_ROWS = 250_000
+# Drop and rebuild the secondary indexes when a merge adds more than this share of the table
+REINDEX_RATIO = 0.2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+  id TEXT PRIMARY KEY,
+  sessionId TEXT NOT NULL,
+  ts INTEGER NOT NULL,
+  type TEXT NOT NULL,
+  stageId TEXT,
+  domainId TEXT,
+  appVersion TEXT,
+  payload TEXT,
+  standId TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS merge_sources (
+  standId TEXT PRIMARY KEY,
+  path TEXT NOT NULL,
+  watermark INTEGER NOT NULL,
+  watermarkId TEXT,
+  events INTEGER NOT NULL DEFAULT 0,
+  mergedAt INTEGER NOT NULL
+);
+"""
+
+# Same indexes as server/index.js, plus per-stand lookups
+INDEXES = {
+  "idx_events_type_ts": "events(type, ts)",
+  "idx_events_ts": "events(ts)",
+  "idx_events_stage": "events(stageId)",
+  "idx_events_domain": "events(domainId)",
+  "idx_events_stand_ts": "events(standId, ts)",
+}
+
+
+def parse_source(spec):
+  """``"stand=path"`` or a bare path; a bare ``.../<stand>/analytics.db`` is named after its directory."""
+  stand, sep, path = spec.partition("=")
+  if not sep:
+    path = pathlib.Path(spec)
+    stand = path.parent.name if path.name == "analytics.db" and path.parent.name else path.stem
+    return stand, path
+  return stand, pathlib.Path(path)
+
+
+def open_fleet(path):
+  conn = sqlite3.connect(path, isolation_level=None)
+  conn.execute("PRAGMA journal_mode=WAL")
+  conn.execute("PRAGMA synchronous=NORMAL")
+  conn.execute("PRAGMA cache_size=-262144")  # 256 MiB
+  conn.executescript(SCHEMA)
+  return conn
+
+
+def drop_indexes(conn):
+  for name in INDEXES:
+    conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def create_indexes(conn, analyze=True):
+  for name, target in INDEXES.items():
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+  if analyze:
+    conn.execute("ANALYZE")
+
+
+def _pending(conn, stand, path, log=print):
+  """``(start_rowid, top_rowid)`` still to merge from the attached source."""
+  row = conn.execute("SELECT watermark, watermarkId FROM merge_sources WHERE standId = ?", (stand,)).fetchone()
+  top = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM src.events").fetchone()[0]
+  if not row or not row[0]:
+    return 0, top
+  watermark, watermark_id = row
+  current = conn.execute("SELECT id FROM src.events WHERE rowid = ?", (watermark,)).fetchone()
+  if current is None or current[0] != watermark_id:
+    log(f"  {stand}: snapshot changed under its watermark; rescanning {path}")
+    return 0, top
+  return watermark, top
+
+
+def merge_source(conn, stand, path, start, top, chunk_rows=CHUNK_ROWS):
+  """Copy events ``start < rowid <= top`` from the attached source. Returns ``(scanned, inserted)``."""
+  scanned = inserted = 0
+  lo = start
+  while lo < top:
+    hi = min(top, lo + chunk_rows)
+    conn.execute("BEGIN")
+    before = conn.total_changes
+    conn.execute("""
+      INSERT OR IGNORE INTO main.events (id, sessionId, ts, type, stageId, domainId, appVersion, payload, standId)
+      SELECT id, sessionId, ts, type, stageId, domainId, appVersion, payload, ?
+      FROM src.events WHERE rowid > ? AND rowid <= ?
+    """, (stand, lo, hi))
+    inserted += conn.total_changes - before
+    count, last = conn.execute("SELECT COUNT(*), MAX(rowid) FROM src.events WHERE rowid > ? AND rowid <= ?",
+                               (lo, hi)).fetchone()
+    scanned += count
+    if last is not None:
+      last_id = conn.execute("SELECT id FROM src.events WHERE rowid = ?", (last,)).fetchone()[0]
+      conn.execute("""
+        INSERT INTO merge_sources (standId, path, watermark, watermarkId, events, mergedAt)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(standId) DO UPDATE SET
+          path = excluded.path, watermark = excluded.watermark, watermarkId = excluded.watermarkId,
+          events = events + excluded.events, mergedAt = excluded.mergedAt
+      """, (stand, str(path), last, last_id, conn.total_changes - before, int(time.time() * 1000)))
+    conn.execute("COMMIT")
+    lo = hi
+  return scanned, inserted
+
+
+def merge(fleet_db, sources, chunk_rows=CHUNK_ROWS, log=print):
+  """Merge ``[(stand_id, path)]`` into ``fleet_db``. Returns per-stand ``{stand: (scanned, inserted)}``."""
+  stands = [stand for stand, _ in sources]
+  duplicates = {s for s in stands if stands.count(s) > 1}
+  if duplicates:
+    raise AnalyticsError(f"stand id used for more than one source: {', '.join(sorted(duplicates))}")
+  for _, path in sources:
+    connect(path).close()
+
+  conn = open_fleet(fleet_db)
+  try:
+    existing = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+    plan = []
+    incoming = 0
+    for stand, path in sources:
+      conn.execute("ATTACH DATABASE ? AS src", (f"{path.resolve().as_uri()}?mode=ro",))
+      try:
+        start, top = _pending(conn, stand, path, log)
+        incoming += conn.execute("SELECT COUNT(*) FROM src.events WHERE rowid > ?", (start,)).fetchone()[0]
+      finally:
+        conn.execute("DETACH DATABASE src")
+      plan.append((stand, path, start, top))
+    bulk = incoming > REINDEX_RATIO * existing
+    if bulk:
+      drop_indexes(conn)
+
+    results = {}
+    for stand, path, start, top in plan:
+      started = time.perf_counter()
+      conn.execute("ATTACH DATABASE ? AS src", (f"{path.resolve().as_uri()}?mode=ro",))
+      try:
+        results[stand] = merge_source(conn, stand, path, start, top, chunk_rows)
+      finally:
+        conn.execute("DETACH DATABASE src")
+      scanned, inserted = results[stand]
+      log(f"  {stand:<16} {scanned:>10,} scanned {inserted:>10,} new "
+          f"{scanned - inserted:>8,} duplicate  {(time.perf_counter() - started) * 1000:7.0f} ms")
+
+    started = time.perf_counter()
+    create_indexes(conn, analyze=bulk)
+    if bulk:
+      log(f"  indexes rebuilt in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return results
+  finally:
+    conn.close()
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog="analytics merge", description="Merge stand analytics.db snapshots into a fleet database.")
+  parser.add_argument("fleet", type=pathlib.Path, help=f"fleet database (created if missing), e.g. {DEFAULT_FLEET_DB}")
+  parser.add_argument("sources", nargs="+", metavar="[STAND=]PATH", help="stand snapshots to merge")
+  parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+  args = parser.parse_args(argv)
+
+  sources = [parse_source(spec) for spec in args.sources]
+  started = time.perf_counter()
+  try:
+    results = merge(args.fleet, sources, args.chunk_rows)
+  except (AnalyticsError, sqlite3.Error) as e:
+    sys.exit(f"analytics: {e}")
+  inserted = sum(i for _, i in results.values())
+  print(f"Merged {len(results)} stand(s), {inserted:,} new event(s) in "
+        f"{(time.perf_counter() - started) * 1000:.0f} ms into {args.fleet}.")
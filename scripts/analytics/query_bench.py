@@ -0,0 +1,325 @@
+"""Time the dashboard queries on aged databases and track regressions.
+
+Seeds ``analytics.db`` files at fixed sizes (10k, 1M, 10M events by
+default) with ``synthetic`` traffic, using the server's schema and indexes.
+The seeds are cached under ``.bench-cache/analytics`` and reused until
+deleted. Timestamps are shifted so each seed's history ends at the moment
+it was built.
+
+Every dashboard endpoint is timed per seed and per ``sinceHours`` window
+(all time, 24h, 7d, 30d; ``daily`` over 7 and 30 days). By default the
+timed code is the equivalent SQL in ``summaries`` (run on a warm read-only
+connection, ``--repeat`` times, median reported); the raw CSV export is
+streamed to nowhere rather than held in memory. With ``--url`` the real
+endpoints of a running server are timed over HTTP instead; the server
+always reads its own ``server/analytics.db``, so copy a seed there first
+and pass the seed size with ``--sizes``.
+
+Results are written as JSON (``--out``). Passing an earlier result as
+``--baseline`` flags every case whose fastest run is slower than the
+baseline's by more than ``--threshold`` and ``--min-delta-ms``, and the run
+exits with status 1 if any regressed. Cases over ``--budget-ms`` are marked in the table: that is the
+point where the dashboard stops feeling interactive.
+
+Usage::
+
+  python scripts/analytics bench-queries --sizes 10k,1m --out bench/queries.json
+  python scripts/analytics bench-queries --sizes 10k,1m --baseline bench/queries.json
+"""
+import argparse
+import csv
+import datetime
+import json
+import os
+import pathlib
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from .db import FETCH_BATCH, ROOT, AnalyticsError, connect, since_cutoff, where
+from .summaries import REPORTS, daily, top_sessions
+from .synthetic import APP_VERSION, CONTENT_DIR, VERSION, Catalog, events
+
+SEED_DIR = ROOT / ".bench-cache" / "analytics"
+DEFAULT_SIZES = "10k,1m,10m"
+SEED_KIOSKS = 4
+WINDOWS = (None, 24, 168, 720)
+DAILY_DAYS = (7, 30)
+# The dashboard endpoints; domain-dwell/project-dwell are offline-only extras
+ENDPOINTS = ("summary", "stage-stats", "domain-stats", "project-stats", "question-stats", "quiz-skips", "screensaver")
+INSERT_BATCH = 50_000
+
+# server/index.js
+SCHEMA = """
+CREATE TABLE events (
+  id TEXT PRIMARY KEY,
+  sessionId TEXT NOT NULL,
+  ts INTEGER NOT NULL,
+  type TEXT NOT NULL,
+  stageId TEXT,
+  domainId TEXT,
+  appVersion TEXT,
+  payload TEXT
+);
+"""
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events(type, ts);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+CREATE INDEX IF NOT EXISTS idx_events_stage ON events(stageId);
+CREATE INDEX IF NOT EXISTS idx_events_domain ON events(domainId);
+"""
+
+
+def parse_size(text):
+  text = text.strip().lower().replace("_", "")
+  scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+  return int(float(text.rstrip("km")) * scale)
+
+
+def size_label(count):
+  for scale, suffix in ((1_000_000, "M"), (1_000, "k")):
+    if count >= scale and count % scale == 0:
+      return f"{count // scale}{suffix}"
+  return str(count)
+
+
+def window_label(hours):
+  if hours is None:
+    return "all"
+  return f"{hours // 24}d" if hours % 24 == 0 and hours >= 48 else f"{hours}h"
+
+
+def seed(path, count, catalog, kiosks=SEED_KIOSKS, seed=0, log=print):
+  """Write ``count`` synthetic events to a fresh database at ``path``."""
+  path = pathlib.Path(path)
+  path.parent.mkdir(parents=True, exist_ok=True)
+  tmp = path.with_name(f".{path.name}.tmp")
+  tmp.unlink(missing_ok=True)
+  started = time.perf_counter()
+  conn = sqlite3.connect(tmp, isolation_level=None)
+  try:
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executescript(SCHEMA)
+    rows = (
+      (e["id"], e["sessionId"], e["ts"], e["type"], e["stageId"], e["domainId"], APP_VERSION,
+       json.dumps(e["payload"], separators=(",", ":")) if "payload" in e else None)
+      for e in events(catalog, count, kiosks, seed, start_ms=0)
+    )
+    conn.execute("BEGIN")
+    while True:
+      batch = [row for _, row in zip(range(INSERT_BATCH), rows)]
+      if not batch:
+        break
+      conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+    # End the history now, so sinceHours windows cover the newest events
+    last = conn.execute("SELECT MAX(ts) FROM events").fetchone()[0] or 0
+    conn.execute("UPDATE events SET ts = ts + ?", (int(time.time() * 1000) - last,))
+    conn.execute("COMMIT")
+    conn.executescript(INDEXES)
+    conn.execute("ANALYZE")
+  finally:
+    conn.close()
+  os.replace(tmp, path)
+  log(f"  seeded    {path} ({count:,} events, {path.stat().st_size / 1e6:.1f} MB) "
+      f"in {time.perf_counter() - started:.1f} s")
+  return path
+
+
+def seed_path(seed_dir, count, kiosks, seed_value):
+  return pathlib.Path(seed_dir) / f"events-{size_label(count)}-k{kiosks}-s{seed_value}-v{VERSION}.db"
+
+
+def _export_raw(conn, since_hours, now_ms):
+  """``/export?kind=raw`` minus the network: every row in ``ts`` order, formatted as CSV."""
+  clause, params = where(cutoff=since_cutoff(since_hours, now_ms))
+  cur = conn.execute(f"""
+    SELECT id, sessionId, ts, type, stageId, domainId, appVersion, payload
+    FROM events {clause} ORDER BY ts ASC
+  """, params)
+  count = 0
+  with open(os.devnull, "w", newline="") as sink:
+    writer = csv.writer(sink)
+    while True:
+      batch = cur.fetchmany(FETCH_BATCH)
+      if not batch:
+        return count
+      writer.writerows(batch)
+      count += len(batch)
+
+
+def sql_cases(now_ms):
+  """``[(name, window, fn(conn) -> rows)]`` for the SQL equivalents of the endpoints."""
+  cases = []
+  for name in ENDPOINTS:
+    for hours in WINDOWS:
+      cases.append((name, window_label(hours),
+                    lambda conn, fn=REPORTS[name], h=hours: fn(conn, since_hours=h, now_ms=now_ms)))
+  for days in DAILY_DAYS:
+    cases.append(("daily", f"{days}d", lambda conn, d=days: daily(conn, days=d, now_ms=now_ms)))
+  cases.append(("top-sessions", "all", lambda conn: top_sessions(conn)))
+  for hours in WINDOWS:
+    cases.append(("export", window_label(hours), lambda conn, h=hours: _export_raw(conn, h, now_ms)))
+  return cases
+
+
+def http_cases(url, admin_key=None):
+  """The same cases as ``sql_cases``, as requests to a running server."""
+  base = url.rstrip("/") + "/api/analytics/"
+
+  def get(path, **query):
+    query = {k: v for k, v in query.items() if v is not None}
+    request = urllib.request.Request(base + path + ("?" + urllib.parse.urlencode(query) if query else ""))
+    if admin_key:
+      request.add_header("x-admin-key", admin_key)
+    with urllib.request.urlopen(request) as response:
+      return response.read()
+
+  cases = []
+  for name in ENDPOINTS:
+    for hours in WINDOWS:
+      cases.append((name, window_label(hours), lambda _, n=name, h=hours: get(n, sinceHours=h)))
+  for days in DAILY_DAYS:
+    cases.append(("daily", f"{days}d", lambda _, d=days: get("daily", days=d)))
+  cases.append(("top-sessions", "all", lambda _: get("top-sessions")))
+  for hours in WINDOWS:
+    cases.append(("export", window_label(hours), lambda _, h=hours: get("export", kind="raw", sinceHours=h)))
+  return cases
+
+
+def time_cases(cases, conn, repeat=5, log=print):
+  """Run each case once to warm up, then ``repeat`` times. Returns ``{"name@window": timing}``."""
+  results = {}
+  for name, window, fn in cases:
+    fn(conn)
+    samples = []
+    for _ in range(repeat):
+      started = time.perf_counter()
+      fn(conn)
+      samples.append((time.perf_counter() - started) * 1000)
+    results[f"{name}@{window}"] = {
+      "medianMs": round(statistics.median(samples), 3),
+      "minMs": round(min(samples), 3),
+      "maxMs": round(max(samples), 3),
+    }
+    log(f"  {name + '@' + window:<24} {results[f'{name}@{window}']['medianMs']:10.1f} ms")
+  return results
+
+
+def compare(current, baseline, threshold=0.25, min_delta_ms=5.0):
+  """Cases slower than the baseline: ``[(size, case, baseline_ms, current_ms)]``."""
+  regressions = []
+  for size, entry in current["results"].items():
+    base_cases = baseline.get("results", {}).get(size, {}).get("cases", {})
+    for case, timing in entry["cases"].items():
+      if case not in base_cases:
+        continue
+      # Best-of-N: scheduler noise only ever adds time
+      was, now = base_cases[case]["minMs"], timing["minMs"]
+      if now > was * (1 + threshold) and now - was > min_delta_ms:
+        regressions.append((size, case, was, now))
+  return regressions
+
+
+def print_table(report, budget_ms):
+  sizes = list(report["results"])
+  cases = list(dict.fromkeys(case for entry in report["results"].values() for case in entry["cases"]))
+  print(f"\n{'median ms':<24}" + "".join(f"{size:>12}" for size in sizes))
+  for case in cases:
+    cells = []
+    for size in sizes:
+      timing = report["results"][size]["cases"].get(case)
+      if timing is None:
+        cells.append(f"{'-':>12}")
+      else:
+        mark = "!" if timing["medianMs"] > budget_ms else " "
+        cells.append(f"{timing['medianMs']:11.1f}{mark}")
+    print(f"{case:<24}" + "".join(cells))
+  print(f"(! = over the {budget_ms:g} ms budget)")
+
+
+def run(sizes, seed_dir=SEED_DIR, content_dir=CONTENT_DIR, kiosks=SEED_KIOSKS, seed_value=0, repeat=5,
+        url=None, admin_key=None, log=print):
+  """Seed (if needed) and time every case for each size. Returns the report dict."""
+  report = {
+    "createdAt": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    "mode": "http" if url else "sql",
+    "python": platform.python_version(),
+    "sqlite": sqlite3.sqlite_version,
+    "platform": platform.platform(),
+    "repeat": repeat,
+    "results": {},
+  }
+  catalog = None
+  for count in sizes:
+    label = size_label(count)
+    log(f"{label} events")
+    if url:
+      report["results"][label] = {"events": count, "cases": time_cases(http_cases(url, admin_key), None, repeat, log)}
+      continue
+    path = seed_path(seed_dir, count, kiosks, seed_value)
+    if not path.exists():
+      catalog = catalog or Catalog.load(content_dir)
+      seed(path, count, catalog, kiosks, seed_value, log)
+    conn = connect(path)
+    try:
+      now_ms = conn.execute("SELECT MAX(ts) FROM events").fetchone()[0] + 1
+      cases = time_cases(sql_cases(now_ms), conn, repeat, log)
+    finally:
+      conn.close()
+    report["results"][label] = {"events": count, "dbBytes": path.stat().st_size, "cases": cases}
+  return report
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog="analytics bench-queries", description="Benchmark dashboard queries by history size.")
+  parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated event counts (default: %(default)s)")
+  parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (default: %(default)s)")
+  parser.add_argument("--seed-dir", type=pathlib.Path, default=SEED_DIR, help="default: %(default)s")
+  parser.add_argument("--kiosks", type=int, default=SEED_KIOSKS, help="sessions in the seeded history")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--content", type=pathlib.Path, default=CONTENT_DIR)
+  parser.add_argument("--url", default=None, help="time a running server's endpoints instead of the SQL")
+  parser.add_argument("--admin-key", default=os.environ.get("ANALYTICS_ADMIN_KEY"),
+                      help="x-admin-key for --url (default: $ANALYTICS_ADMIN_KEY)")
+  parser.add_argument("--out", type=pathlib.Path, default=None, help="write the results JSON here")
+  parser.add_argument("--baseline", type=pathlib.Path, default=None, help="earlier results to compare against")
+  parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown ratio (default: %(default)s)")
+  parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore slowdowns smaller than this")
+  parser.add_argument("--budget-ms", type=float, default=1000.0, help="mark cases slower than this")
+  args = parser.parse_args(argv)
+  try:
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+  except ValueError:
+    parser.error(f"bad --sizes {args.sizes!r}; use e.g. 10k,1m,10m")
+
+  baseline = None
+  if args.baseline:
+    try:
+      baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+      sys.exit(f"analytics: cannot read baseline {args.baseline}: {e}")
+  try:
+    report = run(sizes, args.seed_dir, args.content, args.kiosks, args.seed, args.repeat, args.url, args.admin_key)
+  except (AnalyticsError, urllib.error.URLError) as e:
+    sys.exit(f"analytics: {e}")
+
+  print_table(report, args.budget_ms)
+  if args.out:
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results written to {args.out}.")
+  if baseline is not None:
+    regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+    if baseline.get("mode") != report["mode"]:
+      print(f"warning: baseline was a {baseline.get('mode')} run, this is a {report['mode']} run", file=sys.stderr)
+    for size, case, was, now in regressions:
+      print(f"REGRESSION {size:>5} {case:<24} {was:10.1f} -> {now:10.1f} ms ({now / was - 1:+.0%})")
+    if regressions:
+      sys.exit(1)
+    print(f"No regressions against {args.baseline} (threshold {args.threshold:.0%}).")
@@ -0,0 +1,296 @@
+"""Quiz item analysis: choice distributions, difficulty and discrimination.
+
+Answers are joined with ``src/data/questions.json`` (as written by
+``build_json.py``). ``selectedOptionIndex`` indexes the choices the
+question screen displayed, i.e. the de-duplicated first four with the
+answer swapped in when it fell outside them (``displayed_choices``), so
+that is the list the counts are mapped onto. Answers logged with a
+different ``totalOptions`` were given to an older version of the question;
+they count towards difficulty, but not towards the choice distribution.
+
+For each question:
+
+- ``p``: difficulty index, the share of correct answers, with a 95% Wilson
+  interval (``pLo``/``pHi``);
+- ``counts``/``shares``: how often each displayed choice was picked;
+- ``rpb``: discrimination, the point-biserial correlation between answering
+  this question right and the visitor's score on the *other* questions of
+  the same visit, with a 95% Fisher-z interval. Each domain visit asks a
+  single random question, so only visits that answered two or more count
+  (``rpbN``);
+- ``flags`` when there are at least ``MIN_ANSWERS`` answers: ``too-easy``,
+  ``too-hard``, ``low-discrimination``, ``distractor-beats-answer`` and
+  ``unused-distractor``.
+
+The choice counts come from a single GROUP BY in SQL, and the
+discrimination from one streaming pass over the answers sorted by session,
+split into visits like ``sessions``. Memory scales with the number of
+questions, not answers.
+
+``--out`` writes the result as a compact JSON file (``server/quiz_stats.json``
+by default) that the server hands to the dashboard at
+``/api/analytics/quiz-stats`` without touching the events.
+"""
+import argparse
+import json
+import math
+import os
+import pathlib
+import sys
+import time
+
+from .db import DEFAULT_DB, FETCH_BATCH, ROOT, AnalyticsError, connect, since_cutoff, where
+from .report import to_csv
+from .sessions import GAP_MS
+from .summaries import payload_field
+
+QUESTIONS_JSON = ROOT / "src" / "data" / "questions.json"
+DEFAULT_STATS = DEFAULT_DB.with_name("quiz_stats.json")
+STATS_VERSION = 1
+# QuestionScreen shows at most this many choices
+MAX_CHOICES = 4
+Z95 = 1.959963984540054
+MIN_ANSWERS = 30
+EASY, HARD, LOW_DISCRIMINATION = 0.9, 0.2, 0.1
+VISIT_BOUNDARIES = ("enter_app", "exit_to_attract", "screensaver_shown")
+
+
+def displayed_choices(question):
+  """The choices as ``QuestionScreen`` lays them out."""
+  source = list(dict.fromkeys(question.get("choices") or []))
+  subset = source[:MAX_CHOICES]
+  answer = question.get("answer")
+  if answer not in subset and answer in source:
+    if len(subset) < MAX_CHOICES:
+      subset.append(answer)
+    else:
+      subset[-1] = answer
+  return subset
+
+
+def wilson(k, n, z=Z95):
+  """Wilson score interval for ``k`` successes out of ``n``."""
+  if not n:
+    return None, None
+  p = k / n
+  denom = 1 + z * z / n
+  centre = (p + z * z / (2 * n)) / denom
+  half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+  return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def fisher(r, n, z=Z95):
+  """Confidence interval for a correlation ``r`` over ``n`` pairs."""
+  if r is None or n < 4 or abs(r) >= 1:
+    return None, None
+  centre = math.atanh(r)
+  half = z / math.sqrt(n - 3)
+  return math.tanh(centre - half), math.tanh(centre + half)
+
+
+def choice_counts(conn, cutoff=None):
+  """``{questionId: {"total", "correct", "byOption": {(index, totalOptions): count}}}``."""
+  clause, params = where("type='question_answered'", f"{payload_field('questionId')} IS NOT NULL", cutoff=cutoff)
+  out = {}
+  for qid, index, total, correct, count in conn.execute(f"""
+    SELECT CAST({payload_field('questionId')} AS TEXT),
+           CAST({payload_field('selectedOptionIndex')} AS INTEGER),
+           CAST({payload_field('totalOptions')} AS INTEGER),
+           CASE WHEN {payload_field('correct')} THEN 1 ELSE 0 END,
+           COUNT(*)
+    FROM events
+    {clause}
+    GROUP BY 1, 2, 3, 4
+  """, params):
+    entry = out.setdefault(qid, {"total": 0, "correct": 0, "byOption": {}})
+    entry["total"] += count
+    entry["correct"] += count * correct
+    entry["byOption"][(index, total)] = entry["byOption"].get((index, total), 0) + count
+  return out
+
+
+class _Moments:
+  __slots__ = ("n", "sx", "sy", "sxx", "syy", "sxy")
+
+  def __init__(self):
+    self.n = self.sx = self.sy = self.sxx = self.syy = self.sxy = 0.0
+
+  def add(self, x, y):
+    self.n += 1
+    self.sx += x
+    self.sy += y
+    self.sxx += x * x
+    self.syy += y * y
+    self.sxy += x * y
+
+  def r(self):
+    n = self.n
+    var_x = n * self.sxx - self.sx * self.sx
+    var_y = n * self.syy - self.sy * self.sy
+    if n < 2 or var_x <= 0 or var_y <= 0:
+      return None
+    return (n * self.sxy - self.sx * self.sy) / math.sqrt(var_x * var_y)
+
+
+def discrimination(conn, cutoff=None, gap_ms=GAP_MS, batch_rows=FETCH_BATCH):
+  """``{questionId: (pairs, r)}``: item vs rest-of-visit score, in one sorted pass."""
+  kinds = ", ".join(f"'{k}'" for k in ("question_answered", *VISIT_BOUNDARIES))
+  clause, params = where(f"type IN ({kinds})", cutoff=cutoff)
+  cur = conn.execute(f"""
+    SELECT sessionId, ts, type,
+           CAST({payload_field('questionId')} AS TEXT),
+           CASE WHEN {payload_field('correct')} THEN 1 ELSE 0 END
+    FROM events
+    {clause}
+    ORDER BY sessionId, ts, rowid
+  """, params)
+  moments = {}
+  answers = []
+
+  def finish():
+    if len(answers) > 1:
+      score = sum(c for _, c in answers)
+      for qid, correct in answers:
+        moments.setdefault(qid, _Moments()).add(correct, (score - correct) / (len(answers) - 1))
+    answers.clear()
+
+  session = last = None
+  while True:
+    batch = cur.fetchmany(batch_rows)
+    if not batch:
+      break
+    for sid, ts, kind, qid, correct in batch:
+      if sid != session or kind != "question_answered" or ts - last > gap_ms:
+        finish()
+      session, last = sid, ts
+      if kind == "question_answered" and qid is not None:
+        answers.append((qid, correct))
+  finish()
+  return {qid: (int(m.n), m.r()) for qid, m in moments.items()}
+
+
+def _round(value, digits=4):
+  return None if value is None else round(value, digits)
+
+
+def quiz_stats(conn, questions, since_hours=None, now_ms=None, gap_ms=GAP_MS):
+  """One dict per question answered or defined, most answered first."""
+  cutoff = since_cutoff(since_hours, now_ms)
+  counts = choice_counts(conn, cutoff)
+  discrim = discrimination(conn, cutoff, gap_ms)
+  out = []
+  for qid in [*questions, *sorted(set(counts) - set(questions))]:
+    question = questions.get(qid)
+    entry = counts.get(qid, {"total": 0, "correct": 0, "byOption": {}})
+    n, correct = entry["total"], entry["correct"]
+    choices = displayed_choices(question) if question else []
+    tallies = [0] * len(choices)
+    stale = 0
+    for (index, total), count in entry["byOption"].items():
+      if question and total == len(choices) and index is not None and 0 <= index < len(choices):
+        tallies[index] += count
+      else:
+        stale += count
+    counted = sum(tallies)
+    p_lo, p_hi = wilson(correct, n)
+    pairs, r = discrim.get(qid, (0, None))
+    r_lo, r_hi = fisher(r, pairs)
+    answer = choices.index(question["answer"]) if question and question.get("answer") in choices else None
+
+    flags = []
+    if question is None:
+      flags.append("unknown-question")
+    if n >= MIN_ANSWERS:
+      p = correct / n
+      if p > EASY:
+        flags.append("too-easy")
+      elif p < HARD:
+        flags.append("too-hard")
+      if r is not None and pairs >= MIN_ANSWERS and r < LOW_DISCRIMINATION:
+        flags.append("low-discrimination")
+    if counted >= MIN_ANSWERS and answer is not None:
+      if any(c > tallies[answer] for i, c in enumerate(tallies) if i != answer):
+        flags.append("distractor-beats-answer")
+      if any(c == 0 for i, c in enumerate(tallies) if i != answer):
+        flags.append("unused-distractor")
+
+    out.append({
+      "id": qid,
+      "question": question.get("question") if question else None,
+      "choices": choices,
+      "answer": answer,
+      "n": n,
+      "correct": correct,
+      "p": _round(correct / n) if n else None,
+      "pLo": _round(p_lo),
+      "pHi": _round(p_hi),
+      "counts": tallies,
+      "shares": [_round(c / counted) for c in tallies] if counted else [None] * len(tallies),
+      "stale": stale,
+      "rpb": _round(r),
+      "rpbLo": _round(r_lo),
+      "rpbHi": _round(r_hi),
+      "rpbN": pairs,
+      "flags": flags,
+    })
+  out.sort(key=lambda q: q["n"], reverse=True)
+  return out
+
+
+def load_questions(path=QUESTIONS_JSON):
+  try:
+    questions = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+  except FileNotFoundError:
+    raise AnalyticsError(f"{path}: not found (run scripts/build_json.py)") from None
+  except (OSError, ValueError) as e:
+    raise AnalyticsError(f"{path}: {e}") from None
+  if not isinstance(questions, dict):
+    raise AnalyticsError(f"{path}: expected an object of questions")
+  return questions
+
+
+def write_stats(path, stats, since_hours=None):
+  """Write the compact stats file atomically."""
+  path = pathlib.Path(path)
+  doc = {"version": STATS_VERSION, "generatedAt": int(time.time() * 1000), "sinceHours": since_hours,
+         "questions": stats}
+  tmp = path.with_name(f".{path.name}.tmp")
+  tmp.write_text(json.dumps(doc, separators=(",", ":"), ensure_ascii=False), encoding="utf-8")
+  os.replace(tmp, path)
+  return path
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog="analytics quiz", description="Per-question difficulty, discrimination and choices.")
+  parser.add_argument("--db", type=pathlib.Path, default=DEFAULT_DB, help="default: %(default)s")
+  parser.add_argument("--questions", type=pathlib.Path, default=QUESTIONS_JSON, help="default: %(default)s")
+  parser.add_argument("--since-hours", type=float, default=None)
+  parser.add_argument("--out", type=pathlib.Path, nargs="?", const=DEFAULT_STATS, default=None,
+                      help=f"write the stats file for the dashboard (default path: {DEFAULT_STATS})")
+  parser.add_argument("--format", choices=("json", "csv"), default="json", help="printed output")
+  args = parser.parse_args(argv)
+
+  started = time.perf_counter()
+  try:
+    questions = load_questions(args.questions)
+    conn = connect(args.db)
+  except AnalyticsError as e:
+    sys.exit(f"analytics: {e}")
+  try:
+    stats = quiz_stats(conn, questions, args.since_hours)
+  finally:
+    conn.close()
+
+  if args.out:
+    write_stats(args.out, stats, args.since_hours)
+    print(f"Wrote stats for {len(stats)} question(s) to {args.out} "
+          f"in {(time.perf_counter() - started) * 1000:.0f} ms.", file=sys.stderr)
+  elif args.format == "json":
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+  else:
+    print(to_csv([{
+      "id": q["id"], "n": q["n"], "p": q["p"], "pLo": q["pLo"], "pHi": q["pHi"],
+      "rpb": q["rpb"], "rpbN": q["rpbN"], "stale": q["stale"],
+      **{f"choice{i}": q["shares"][i] if i < len(q["shares"]) else None for i in range(MAX_CHOICES)},
+      "flags": " ".join(q["flags"]),
+    } for q in stats]))
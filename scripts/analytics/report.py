@@ -0,0 +1,85 @@
+"""Print dashboard summaries from ``analytics.db`` as JSON or CSV.
+
+Usage::
+
+  python scripts/analytics report                       # every summary, JSON
+  python scripts/analytics report question-stats --since-hours 24 --format csv
+  python scripts/analytics report --timing              # per-query wall time on stderr
+"""
+import argparse
+import csv
+import io
+import json
+import pathlib
+import sys
+import time
+
+from .db import DEFAULT_DB, AnalyticsError, connect
+from .summaries import REPORTS, daily, top_sessions
+
+
+def to_csv(rows):
+  """CSV with the columns of the first row, like the server's ``toCsv``."""
+  if not rows:
+    return ""
+  out = io.StringIO()
+  writer = csv.DictWriter(out, fieldnames=list(rows[0]), lineterminator="\n", extrasaction="ignore")
+  writer.writeheader()
+  writer.writerows(rows)
+  return out.getvalue().rstrip("\n")
+
+
+def run(conn, names, since_hours=None, days=7, limit=10, timings=None):
+  results = {}
+  for name in names:
+    started = time.perf_counter()
+    if name == "daily":
+      results[name] = daily(conn, days=days)
+    elif name == "top-sessions":
+      results[name] = top_sessions(conn, limit=limit)
+    else:
+      results[name] = REPORTS[name](conn, since_hours=since_hours)
+    if timings is not None:
+      timings[name] = (time.perf_counter() - started) * 1000
+  return results
+
+
+def main(argv=None):
+  choices = [*REPORTS, "daily", "top-sessions"]
+  parser = argparse.ArgumentParser(prog="analytics report", description=__doc__.split("\n")[0])
+  parser.add_argument("reports", nargs="*", metavar="REPORT",
+                      help=f"one or more of: {', '.join(choices)} (default: all)")
+  parser.add_argument("--db", type=pathlib.Path, default=DEFAULT_DB, help="default: %(default)s")
+  parser.add_argument("--since-hours", type=float, default=None)
+  parser.add_argument("--days", type=int, default=7, help="window for 'daily' (default: %(default)s)")
+  parser.add_argument("--limit", type=int, default=10, help="rows for 'top-sessions' (default: %(default)s)")
+  parser.add_argument("--format", choices=("json", "csv"), default="json")
+  parser.add_argument("--timing", action="store_true", help="print per-report query time to stderr")
+  args = parser.parse_args(argv)
+  unknown = [name for name in args.reports if name not in choices]
+  if unknown:
+    parser.error(f"unknown report(s): {', '.join(unknown)}")
+
+  try:
+    conn = connect(args.db)
+  except AnalyticsError as e:
+    sys.exit(f"analytics: {e}")
+  timings = {} if args.timing else None
+  try:
+    results = run(conn, args.reports or choices, args.since_hours, args.days, args.limit, timings)
+  finally:
+    conn.close()
+
+  if args.format == "json":
+    doc = results if len(results) > 1 else next(iter(results.values()))
+    print(json.dumps(doc, indent=2, ensure_ascii=False))
+  else:
+    for name, result in results.items():
+      if len(results) > 1:
+        print(f"# {name}")
+      if name == "summary":
+        result = [{"type": "ALL", "c": result["totalEvents"]}, *result["byType"]]
+      print(to_csv(result))
+  if timings:
+    for name, ms in timings.items():
+      print(f"  {name:<16} {ms:8.1f} ms", file=sys.stderr)
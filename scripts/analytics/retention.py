@@ -0,0 +1,275 @@
+"""Archive old events out of ``analytics.db`` and compact what is left.
+
+The server holds ``analytics.db`` in memory (sql.js): it reads the whole
+file at startup and re-serialises all of it on every debounced save, so
+both costs grow with the history. This job caps them:
+
+1. folds every event into the rollups first, so the aggregates keep the
+   archived history (``--no-rollups`` to skip);
+2. writes events older than ``--keep-days`` to compressed, partitioned
+   archive files (``export``'s format and columns, named
+   ``archive-<cutoff>``) and checks the row count;
+3. builds a compacted copy of the database that holds only the remaining
+   events, with the rows reloaded in rowid order and the indexes rebuilt
+   after the load. That is what DELETE + VACUUM + REINDEX would produce,
+   but the original stays untouched until the copy atomically replaces it.
+   Rowids are preserved, so the rollup and export watermarks remain valid;
+4. reports the file size, event count and measured load/save times before
+   and after.
+
+The server must be stopped while this runs: it would otherwise write its
+in-memory copy back over the compacted file, restoring every archived
+event. The job refuses to start while ``--url`` answers its health check,
+and aborts if the database file changes underneath it.
+
+Usage::
+
+  python scripts/analytics retention --keep-days 180 --dry-run
+  python scripts/analytics retention --keep-days 180 --backup
+"""
+import argparse
+import os
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from . import rollups
+from .db import DEFAULT_DB, AnalyticsError, connect
+from .export import BATCH_ROWS, COLUMNS, PARTITIONS, SUFFIXES, PartWriter, _pyarrow
+
+DEFAULT_ARCHIVE = DEFAULT_DB.with_name("archive")
+KEEP_DAYS = 180
+SERVER_URL = "http://127.0.0.1:4000"
+
+
+def server_running(url, timeout=1.0):
+  try:
+    with urllib.request.urlopen(url.rstrip("/") + "/api/analytics/health", timeout=timeout):
+      return True
+  except (urllib.error.URLError, OSError):
+    return False
+
+
+def measure(path):
+  """File size, events, and the time to load and re-save it whole, as the server does."""
+  started = time.perf_counter()
+  data = pathlib.Path(path).read_bytes()
+  read_ms = (time.perf_counter() - started) * 1000
+  conn = sqlite3.connect(":memory:")
+  try:
+    started = time.perf_counter()
+    conn.deserialize(data)
+    events = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+    load_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    with tempfile.TemporaryFile(dir=pathlib.Path(path).parent) as fh:
+      fh.write(conn.serialize())
+      fh.flush()
+      os.fsync(fh.fileno())
+    save_ms = (time.perf_counter() - started) * 1000
+  finally:
+    conn.close()
+  return {"bytes": len(data), "events": events, "readMs": round(read_ms, 1),
+          "loadMs": round(read_ms + load_ms, 1), "saveMs": round(save_ms, 1)}
+
+
+def archive(conn, archive_dir, cutoff, fmt="csv", partition="month", batch_rows=BATCH_ROWS):
+  """Write events with ``ts < cutoff`` to partition files. Returns ``(rows, files)``."""
+  key, fmt_str = PARTITIONS[partition]
+  select = ", ".join(sql for _, sql, _ in COLUMNS)
+  cur = conn.execute(f"""
+    SELECT strftime('{fmt_str}', ts/1000, 'unixepoch'), {select}
+    FROM events WHERE ts < ?
+    ORDER BY ts, rowid
+  """, (cutoff,))
+  name = f"archive-{cutoff}{SUFFIXES[fmt]}"
+  files = []
+  total = 0
+  current = None
+  pending = []
+
+  def flush():
+    if pending:
+      current.write(pending)
+      pending.clear()
+
+  try:
+    while True:
+      batch = cur.fetchmany(batch_rows)
+      if not batch:
+        break
+      for part, *values in batch:
+        if current is None or current.partition != part:
+          if current is not None:
+            flush()
+            current.close()
+            files.append(current.path)
+          path = pathlib.Path(archive_dir) / f"{key}={part}" / name
+          if path.exists():
+            raise AnalyticsError(f"{path} already exists; was this cutoff archived before?")
+          current = PartWriter(fmt, path, part)
+        pending.append(values)
+        total += 1
+      flush()
+    if current is not None:
+      current.close()
+      files.append(current.path)
+  except BaseException:
+    if current is not None:
+      current.abort()
+    for path in files:
+      path.unlink(missing_ok=True)
+    raise
+  return total, files
+
+
+def compact(db, out, cutoff):
+  """Copy ``db`` to ``out`` without events older than ``cutoff``; returns the rows kept."""
+  out.unlink(missing_ok=True)
+  conn = sqlite3.connect(out, isolation_level=None)
+  try:
+    conn.execute("ATTACH DATABASE ? AS src", (f"{pathlib.Path(db).resolve().as_uri()}?mode=ro",))
+    page_size = conn.execute("PRAGMA src.page_size").fetchone()[0]
+    conn.execute(f"PRAGMA main.page_size={page_size}")
+    conn.execute("PRAGMA main.journal_mode=OFF")
+    conn.execute("PRAGMA main.synchronous=OFF")
+    schema = conn.execute("""
+      SELECT type, name, sql FROM src.sqlite_master
+      WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+    """).fetchall()
+    conn.execute("BEGIN")
+    for kind, _, sql in schema:
+      if kind == "table":
+        conn.execute(sql)
+    cols = ", ".join(row[1] for row in conn.execute("PRAGMA src.table_info(events)"))
+    conn.execute(f"""
+      INSERT INTO main.events (rowid, {cols})
+      SELECT rowid, {cols} FROM src.events WHERE ts >= ? ORDER BY rowid
+    """, (cutoff,))
+    for kind, name, _ in schema:
+      if kind == "table" and name != "events":
+        conn.execute(f'INSERT INTO main."{name}" SELECT * FROM src."{name}"')
+    # Indexes built after the load are packed, like a REINDEX
+    for kind, _, sql in schema:
+      if kind != "table":
+        conn.execute(sql)
+    conn.execute("COMMIT")
+    kept = conn.execute("SELECT COUNT(*) FROM main.events").fetchone()[0]
+    conn.execute("DETACH DATABASE src")
+    check = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    if check != "ok":
+      raise AnalyticsError(f"compacted copy failed its integrity check: {check}")
+  finally:
+    conn.close()
+  with open(out, "rb+") as fh:
+    os.fsync(fh.fileno())
+  return kept
+
+
+def _stamp(path):
+  st = os.stat(path)
+  return st.st_mtime_ns, st.st_size
+
+
+def run(db=DEFAULT_DB, archive_dir=DEFAULT_ARCHIVE, keep_days=KEEP_DAYS, fmt="csv", partition="month",
+        rollup_db=rollups.DEFAULT_ROLLUP_DB, dry_run=False, backup=False, url=SERVER_URL, now_ms=None, log=print):
+  """Archive, delete and compact. Returns ``{"before", "after", "archived", "files", "cutoff"}``."""
+  db = pathlib.Path(db)
+  if url and server_running(url):
+    raise AnalyticsError(f"the analytics server at {url} is running; stop it first, or it will write "
+                         "its in-memory database back over the compacted file")
+  if fmt != "csv":
+    _pyarrow()
+  now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+  cutoff = now_ms - int(keep_days * 86_400_000)
+
+  conn = connect(db)
+  try:
+    old = conn.execute("SELECT COUNT(*) FROM events WHERE ts < ?", (cutoff,)).fetchone()[0]
+  finally:
+    conn.close()
+  before = measure(db)
+  result = {"cutoff": cutoff, "before": before, "after": before, "archived": 0, "files": []}
+  if dry_run or not old:
+    result["archivable"] = old
+    return result
+
+  stamp = _stamp(db)
+  if rollup_db is not None:
+    folded = rollups.update(db, rollup_db, log=log)
+    log(f"  rollups   {folded['events']:,} new event(s) folded into {rollup_db}")
+
+  conn = connect(db)
+  try:
+    archived, files = archive(conn, archive_dir, cutoff, fmt, partition)
+  finally:
+    conn.close()
+  # The archive files only become the copy of record once the compacted
+  # database replaces the original; until then a failure removes them again
+  tmp = db.with_name(f".{db.name}.compact")
+  try:
+    if archived != old:
+      raise AnalyticsError(f"archived {archived:,} events but {old:,} were due; analytics.db changed during the run")
+    kept = compact(db, tmp, cutoff)
+    if kept != before["events"] - archived:
+      raise AnalyticsError(f"compacted copy has {kept:,} events, expected {before['events'] - archived:,}")
+    if _stamp(db) != stamp:
+      raise AnalyticsError(f"{db} was written during compaction (is the server running?); left unchanged")
+    if backup:
+      saved = db.with_name(f"{db.name}.{time.strftime('%Y%m%d-%H%M%S')}.bak")
+      os.link(db, saved)
+      log(f"  backup    {saved}")
+    os.replace(tmp, db)
+  except BaseException:
+    for path in files:
+      path.unlink(missing_ok=True)
+    raise
+  finally:
+    tmp.unlink(missing_ok=True)
+  result.update(archived=archived, files=files)
+  for path in files:
+    log(f"  archived  {path}")
+
+  if rollup_db is not None:
+    rollups.reanchor(db, rollup_db)
+  result["after"] = measure(db)
+  return result
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog="analytics retention", description="Archive old events and compact analytics.db.")
+  parser.add_argument("--db", type=pathlib.Path, default=DEFAULT_DB, help="default: %(default)s")
+  parser.add_argument("--keep-days", type=float, default=KEEP_DAYS, help="events newer than this stay (default: %(default)s)")
+  parser.add_argument("--archive", type=pathlib.Path, default=DEFAULT_ARCHIVE, help="default: %(default)s")
+  parser.add_argument("--format", choices=tuple(SUFFIXES), default="csv", help="archive format (default: %(default)s)")
+  parser.add_argument("--partition", choices=tuple(PARTITIONS), default="month")
+  parser.add_argument("--rollups", type=pathlib.Path, default=rollups.DEFAULT_ROLLUP_DB, help="default: %(default)s")
+  parser.add_argument("--no-rollups", action="store_true", help="do not update the rollups first")
+  parser.add_argument("--backup", action="store_true", help="keep the original file as analytics.db.<time>.bak")
+  parser.add_argument("--dry-run", action="store_true", help="only report what would be archived")
+  parser.add_argument("--url", default=SERVER_URL, help="server to check is stopped (default: %(default)s); '' to skip")
+  args = parser.parse_args(argv)
+
+  started = time.perf_counter()
+  try:
+    result = run(args.db, args.archive, args.keep_days, args.format, args.partition,
+                 None if args.no_rollups else args.rollups, args.dry_run, args.backup, args.url)
+  except (AnalyticsError, sqlite3.Error, OSError) as e:
+    sys.exit(f"analytics: {e}")
+
+  before, after = result["before"], result["after"]
+  cutoff = time.strftime("%Y-%m-%d %H:%M", time.gmtime(result["cutoff"] / 1000))
+  if "archivable" in result:
+    verb = "would archive" if args.dry_run else "nothing to archive;"
+    print(f"{verb} {result['archivable']:,} of {before['events']:,} event(s) older than {cutoff} UTC.")
+  measured = (("before", before), ("after", after)) if result["archived"] else (("current", before),)
+  for label, m in measured:
+    print(f"  {label:<8}  {m['bytes'] / 1e6:9.1f} MB  {m['events']:>11,} events  "
+          f"load ~{m['loadMs']:.0f} ms  save ~{m['saveMs']:.0f} ms")
+  if result["archived"]:
+    print(f"Archived {result['archived']:,} event(s) older than {cutoff} UTC into {len(result['files'])} file(s), "
+          f"{(before['bytes'] - after['bytes']) / 1e6:.1f} MB freed in {time.perf_counter() - started:.1f} s.")
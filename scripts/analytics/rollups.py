@@ -0,0 +1,334 @@
+"""Hourly and daily rollup tables, maintained incrementally.
+
+The rollups live in their own database (``server/analytics_rollups.db`` by
+default), not in ``analytics.db``: the server owns that file and rewrites it
+wholesale from its in-memory copy on every save, which would drop any table
+added behind its back. ``analytics.db`` is attached read-only.
+
+Each run folds in only the events past the stored watermark. The watermark
+is the events table's ``rowid``, not ``ts``: kiosks queue events while
+offline and upload them later with their original timestamps, and those
+late rows still get fresh rowids. The id of the row at the watermark is kept
+too. If that row is gone or different (the database was replaced, reset or
+VACUUMed, which renumbers rowids), the rollups are rebuilt from scratch.
+
+Tables, one per metric and grain (``hour`` / ``day``; ``bucket`` is the UTC
+bucket start in epoch ms, NULL keys stored as ``''``)::
+
+  events_<grain>          (bucket, type, count)
+  stage_views_<grain>     (bucket, stageId, views)
+  domain_dwell_<grain>    (bucket, stageId, domainId, closes, totalDurationMs)
+  project_dwell_<grain>   (bucket, stageId, domainId, projectId, closes, totalDurationMs)
+  question_answers_<grain>(bucket, questionId, correctCount, wrongCount)
+  quiz_skips_<grain>      (bucket, stageId, domainId, skips)
+  screensaver_<grain>     (bucket, type, count)
+
+Distinct-session counts are not additive across buckets and are not rolled
+up; ``analytics report`` still computes those from the events.
+"""
+import argparse
+import json
+import pathlib
+import sqlite3
+import sys
+import time
+
+from .db import DEFAULT_DB, AnalyticsError, connect, rows, since_cutoff
+from .summaries import DURATION, payload_field
+
+DEFAULT_ROLLUP_DB = DEFAULT_DB.with_name("analytics_rollups.db")
+GRAINS = {"hour": 3_600_000, "day": 86_400_000}
+CHUNK_ROWS = 500_000
+SCHEMA_VERSION = 1
+
+# name -> (key columns, {value column: SQL aggregate over the new events}, event filter)
+METRICS = {
+  "events": (("type",), {"count": "COUNT(*)"}, "1=1"),
+  "stage_views": (("stageId",), {"views": "COUNT(*)"}, "type='stage_view' AND stageId IS NOT NULL"),
+  "domain_dwell": (
+    ("stageId", "domainId"),
+    {"closes": "COUNT(*)", "totalDurationMs": f"SUM({DURATION})"},
+    "type='domain_view_end'",
+  ),
+  "project_dwell": (
+    ("stageId", "domainId", "projectId"),
+    {"closes": "COUNT(*)", "totalDurationMs": f"SUM({DURATION})"},
+    "type='project_view_end'",
+  ),
+  "question_answers": (
+    ("questionId",),
+    {
+      "correctCount": f"SUM(CASE WHEN {payload_field('correct')} THEN 1 ELSE 0 END)",
+      "wrongCount": f"SUM(CASE WHEN {payload_field('correct')} THEN 0 ELSE 1 END)",
+    },
+    f"type='question_answered' AND {payload_field('questionId')} IS NOT NULL",
+  ),
+  "quiz_skips": (("stageId", "domainId"), {"skips": "COUNT(*)"}, "type='quiz_skipped'"),
+  "screensaver": (("type",), {"count": "COUNT(*)"}, "type IN ('screensaver_shown','screensaver_exit')"),
+}
+
+# Key columns that come from the payload rather than an events column
+PAYLOAD_KEYS = {"projectId": payload_field("projectId"), "questionId": payload_field("questionId")}
+
+
+def _key_sql(column):
+  return f"COALESCE({PAYLOAD_KEYS.get(column, column)}, '')"
+
+
+def create_schema(conn):
+  conn.execute("CREATE TABLE IF NOT EXISTS rollup_state (key TEXT PRIMARY KEY, value TEXT)")
+  for name, (keys, values, _) in METRICS.items():
+    for grain in GRAINS:
+      cols = ", ".join([f"{k} TEXT NOT NULL" for k in keys] + [f"{v} INTEGER NOT NULL" for v in values])
+      conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {name}_{grain} (
+          bucket INTEGER NOT NULL, {cols},
+          PRIMARY KEY (bucket, {', '.join(keys)})
+        ) WITHOUT ROWID
+      """)
+
+
+def _state(conn):
+  return dict(conn.execute("SELECT key, value FROM rollup_state"))
+
+
+def _set_state(conn, **values):
+  conn.executemany(
+    "INSERT INTO rollup_state (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+    [(k, json.dumps(v)) for k, v in values.items()],
+  )
+
+
+def _fold(conn, lo, hi):
+  """Add events with ``lo < rowid <= hi`` into every rollup table."""
+  for name, (keys, values, condition) in METRICS.items():
+    key_sql = ", ".join(_key_sql(k) for k in keys)
+    agg_sql = ", ".join(values.values())
+    updates = ", ".join(f"{v} = {v} + excluded.{v}" for v in values)
+    for grain, size in GRAINS.items():
+      conn.execute(f"""
+        INSERT INTO {name}_{grain} (bucket, {', '.join(keys)}, {', '.join(values)})
+        SELECT ts - ts % {size}, {key_sql}, {agg_sql}
+        FROM src.events
+        WHERE rowid > ? AND rowid <= ? AND {condition}
+        GROUP BY 1, {', '.join(str(i + 2) for i in range(len(keys)))}
+        ON CONFLICT DO UPDATE SET {updates}
+      """, (lo, hi))
+
+
+def open_rollups(rollup_db=DEFAULT_ROLLUP_DB, events_db=None):
+  """Open (creating if needed) the rollup database, optionally attaching ``events_db`` read-only as ``src``."""
+  conn = sqlite3.connect(rollup_db, isolation_level=None)
+  conn.execute("PRAGMA journal_mode=WAL")
+  create_schema(conn)
+  if events_db is not None:
+    # Checks the file is readable and really an analytics database first
+    connect(events_db).close()
+    conn.execute("ATTACH DATABASE ? AS src", (f"{pathlib.Path(events_db).resolve().as_uri()}?mode=ro",))
+  return conn
+
+
+def _clear(conn):
+  conn.execute("BEGIN")
+  for name in METRICS:
+    for grain in GRAINS:
+      conn.execute(f"DELETE FROM {name}_{grain}")
+  conn.execute("DELETE FROM rollup_state")
+  conn.execute("COMMIT")
+
+
+def update(events_db=DEFAULT_DB, rollup_db=DEFAULT_ROLLUP_DB, rebuild=False, chunk_rows=CHUNK_ROWS, log=print):
+  """Fold events past the watermark into the rollups.
+
+  Works in rowid chunks of ``chunk_rows``, one transaction each (rollup rows
+  plus the new watermark), so an interrupted first run over months of events
+  resumes where it stopped. Returns ``{"events", "watermark", "rebuilt"}``.
+  """
+  conn = open_rollups(rollup_db, events_db)
+  try:
+    state = {k: json.loads(v) for k, v in _state(conn).items()}
+    watermark = state.get("watermark", 0)
+    if watermark and not rebuild:
+      row = conn.execute("SELECT id FROM src.events WHERE rowid = ?", (watermark,)).fetchone()
+      if state.get("schema") != SCHEMA_VERSION or row is None or row[0] != state.get("watermarkId"):
+        log("  events table changed under the watermark; rebuilding rollups")
+        rebuild = True
+    if rebuild:
+      _clear(conn)
+      watermark = 0
+
+    top = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM src.events").fetchone()[0]
+    folded = 0
+    while watermark < top:
+      hi = min(top, watermark + chunk_rows)
+      conn.execute("BEGIN")
+      _fold(conn, watermark, hi)
+      count, last = conn.execute(
+        "SELECT COUNT(*), MAX(rowid) FROM src.events WHERE rowid > ? AND rowid <= ?", (watermark, hi)
+      ).fetchone()
+      if last is not None:
+        last_id = conn.execute("SELECT id FROM src.events WHERE rowid = ?", (last,)).fetchone()[0]
+        _set_state(conn, schema=SCHEMA_VERSION, watermark=last, watermarkId=last_id,
+                   updatedAt=int(time.time() * 1000))
+      conn.execute("COMMIT")
+      folded += count
+      watermark = hi
+    return {"events": folded, "watermark": watermark, "rebuilt": rebuild}
+  finally:
+    conn.close()
+
+
+def reanchor(events_db=DEFAULT_DB, rollup_db=DEFAULT_ROLLUP_DB):
+  """Keep the rollups after old events were deleted with their rowids preserved.
+
+  Moves the watermark down to the newest surviving row at or below it, so
+  the next ``update`` neither rebuilds (which would drop the history of the
+  deleted rows) nor refolds anything. Returns the new watermark.
+  """
+  conn = open_rollups(rollup_db, events_db)
+  try:
+    state = {k: json.loads(v) for k, v in _state(conn).items()}
+    watermark = state.get("watermark", 0)
+    row = conn.execute("SELECT rowid, id FROM src.events WHERE rowid <= ? ORDER BY rowid DESC LIMIT 1",
+                       (watermark,)).fetchone()
+    last, last_id = row or (0, None)
+    if watermark and (last, last_id) != (watermark, state.get("watermarkId")):
+      conn.execute("BEGIN")
+      _set_state(conn, watermark=last, watermarkId=last_id, updatedAt=int(time.time() * 1000))
+      conn.execute("COMMIT")
+    return last
+  finally:
+    conn.close()
+
+
+# --- queries: the dashboard summaries from the rollups, O(buckets) ---
+
+def _bucket_where(since_hours, now_ms, grain):
+  cutoff = since_cutoff(since_hours, now_ms)
+  if cutoff is None:
+    return "", []
+  return "WHERE bucket >= ?", [cutoff - cutoff % GRAINS[grain]]
+
+
+def _query(conn, sql, since_hours=None, now_ms=None, keys=(), grain=None):
+  """Run ``sql`` (``{table}`` grain suffix, ``{where}`` bucket filter) on the cheapest grain.
+
+  Whole-history queries read the daily tables. ``since_hours`` windows read
+  the hourly ones, so the window starts at the top of the hour its cutoff
+  falls in (at most one extra hour of events, where the server is exact).
+  """
+  grain = grain or ("day" if since_hours is None else "hour")
+  clause, params = _bucket_where(since_hours, now_ms, grain)
+  result = rows(conn, sql.format(grain=grain, where=clause), params)
+  for row in result:
+    for key in keys:
+      if row[key] == "":
+        row[key] = None
+  return result
+
+
+def summary(conn, since_hours=None, now_ms=None):
+  by_type = _query(conn, """
+    SELECT type, SUM(count) AS c FROM events_{grain} {where} GROUP BY type ORDER BY c DESC
+  """, since_hours, now_ms)
+  return {"totalEvents": sum(r["c"] for r in by_type), "byType": by_type}
+
+
+def stage_stats(conn, since_hours=None, now_ms=None):
+  return _query(conn, """
+    SELECT stageId, SUM(views) AS stageViews FROM stage_views_{grain} {where}
+    GROUP BY stageId ORDER BY stageViews DESC
+  """, since_hours, now_ms, keys=("stageId",))
+
+
+def domain_stats(conn, since_hours=None, now_ms=None):
+  return _query(conn, """
+    SELECT stageId, domainId, SUM(closes) AS closes, SUM(totalDurationMs) AS totalDurationMs,
+           CAST(ROUND(1.0 * SUM(totalDurationMs) / SUM(closes)) AS INTEGER) AS avgDurationMs
+    FROM domain_dwell_{grain} {where}
+    GROUP BY stageId, domainId ORDER BY totalDurationMs DESC
+  """, since_hours, now_ms, keys=("stageId", "domainId"))
+
+
+def project_stats(conn, since_hours=None, now_ms=None):
+  return _query(conn, """
+    SELECT stageId, domainId, projectId, SUM(closes) AS closes, SUM(totalDurationMs) AS totalDurationMs,
+           CAST(ROUND(1.0 * SUM(totalDurationMs) / SUM(closes)) AS INTEGER) AS avgDurationMs
+    FROM project_dwell_{grain} {where}
+    GROUP BY stageId, domainId, projectId ORDER BY totalDurationMs DESC
+  """, since_hours, now_ms, keys=("stageId", "domainId", "projectId"))
+
+
+def question_stats(conn, since_hours=None, now_ms=None):
+  return _query(conn, """
+    SELECT questionId, SUM(correctCount) AS correctCount, SUM(wrongCount) AS wrongCount,
+           SUM(correctCount) + SUM(wrongCount) AS totalAnswers,
+           ROUND(1000.0 * SUM(correctCount) / (SUM(correctCount) + SUM(wrongCount))) / 10 AS percentCorrect
+    FROM question_answers_{grain} {where}
+    GROUP BY questionId ORDER BY percentCorrect DESC, totalAnswers DESC
+  """, since_hours, now_ms)
+
+
+def quiz_skips(conn, since_hours=None, now_ms=None):
+  return _query(conn, """
+    SELECT stageId, domainId, SUM(skips) AS skips FROM quiz_skips_{grain} {where}
+    GROUP BY stageId, domainId ORDER BY skips DESC
+  """, since_hours, now_ms, keys=("stageId", "domainId"))
+
+
+def screensaver(conn, since_hours=None, now_ms=None):
+  return _query(conn, """
+    SELECT type, SUM(count) AS c FROM screensaver_{grain} {where} GROUP BY type
+  """, since_hours, now_ms)
+
+
+def daily(conn, days=7, now_ms=None):
+  """Events per UTC day (no session counts: those are not additive)."""
+  return _query(conn, """
+    SELECT strftime('%Y-%m-%d', bucket/1000, 'unixepoch') AS day, SUM(count) AS events
+    FROM events_{grain} {where} GROUP BY bucket ORDER BY bucket
+  """, days * 24, now_ms, grain="day")
+
+
+REPORTS = {
+  "summary": summary,
+  "stage-stats": stage_stats,
+  "domain-stats": domain_stats,
+  "project-stats": project_stats,
+  "question-stats": question_stats,
+  "quiz-skips": quiz_skips,
+  "screensaver": screensaver,
+}
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(
+    prog="analytics rollup",
+    description="Fold new events into the hourly/daily rollup tables, then optionally print a summary from them.",
+  )
+  parser.add_argument("--db", type=pathlib.Path, default=DEFAULT_DB, help="events database (default: %(default)s)")
+  parser.add_argument("--rollups", type=pathlib.Path, default=DEFAULT_ROLLUP_DB, help="default: %(default)s")
+  parser.add_argument("--rebuild", action="store_true", help="drop the rollups and start from the first event")
+  parser.add_argument("--report", choices=[*REPORTS, "daily"], help="print this summary (JSON) after updating")
+  parser.add_argument("--since-hours", type=float, default=None)
+  parser.add_argument("--days", type=int, default=7, help="window for '--report daily' (default: %(default)s)")
+  args = parser.parse_args(argv)
+
+  started = time.perf_counter()
+  try:
+    result = update(args.db, args.rollups, rebuild=args.rebuild)
+  except AnalyticsError as e:
+    sys.exit(f"analytics: {e}")
+  print(f"Rolled up {result['events']:,} new event(s) up to rowid {result['watermark']} "
+        f"in {(time.perf_counter() - started) * 1000:.0f} ms{' (rebuilt)' if result['rebuilt'] else ''}.",
+        file=sys.stderr)
+  if args.report:
+    conn = open_rollups(args.rollups)
+    try:
+      if args.report == "daily":
+        doc = daily(conn, days=args.days)
+      else:
+        doc = REPORTS[args.report](conn, since_hours=args.since_hours)
+    finally:
+      conn.close()
+    print(json.dumps(doc, indent=2, ensure_ascii=False))
@@ -0,0 +1,305 @@
+"""Rebuild visitor paths from the event stream: funnels, drop-off and dwell.
+
+The client keeps one ``sessionId`` in localStorage for the life of the
+kiosk browser, so a session usually holds many visitors. Each session is cut
+into *visits*: a visit starts at ``enter_app`` (or at the first event after
+``gap`` of silence, e.g. after a reload) and is closed by
+``exit_to_attract`` (the exit button) or ``screensaver_shown`` (the idle
+timeout). Events that trail a close, like the ``domain_view_end`` flushed on
+unmount, stay with the visit they belong to. Screensaver events fire the
+idle timeout after the last touch, so they close the visit before them
+however long the silence, and never start one.
+
+Everything comes from one query sorted by ``sessionId, ts`` and consumed
+with ``fetchmany``: SQLite does the sort (spilling to a temp file when it is
+large) and Python only ever holds the current visit. The aggregates are
+keyed by content ids (stages, domains, projects), and the distributions are
+fixed log-bucket histograms, so memory does not grow with the number of
+events or visits.
+
+Funnel steps follow the app's screens::
+
+  entered  stage  domain  project  quiz  exit
+
+A visit reaches a step when it has that event and reached every earlier
+step, whatever the order (the quiz prompt comes before the project list
+in the app). Visits that end without ``exit_to_attract`` are drop-offs,
+reported by the furthest step and by the last stage/domain/project seen.
+
+Usage::
+
+  python scripts/analytics sessions                   # JSON summary
+  python scripts/analytics sessions --since-hours 24 --gap-minutes 5
+  python scripts/analytics sessions --format csv      # funnel and drop-off tables
+"""
+import argparse
+import json
+import math
+import pathlib
+import sys
+import time
+
+from .db import DEFAULT_DB, FETCH_BATCH, AnalyticsError, connect, since_cutoff, where
+from .report import to_csv
+from .summaries import DURATION, payload_field
+
+# Matches the ScreenSaver idle timeout (10 minutes)
+GAP_MS = 10 * 60 * 1000
+
+STEPS = ("entered", "stage", "domain", "project", "quiz", "exit")
+STEP_EVENTS = {
+  "enter_app": "entered",
+  "stage_view": "stage",
+  "domain_view_start": "domain",
+  "project_view_start": "project",
+  "question_answered": "quiz",
+  "quiz_skipped": "quiz",
+  "exit_to_attract": "exit",
+}
+CLOSING = {"exit_to_attract": "exit", "screensaver_shown": "idle"}
+# Fired the idle timeout after the last touch, so they never start a visit
+SCREENSAVER = {"screensaver_shown", "screensaver_exit"}
+
+
+class Histogram:
+  """Fixed log-scale buckets (~9% wide) with exact count, sum, min and max."""
+
+  PER_OCTAVE = 8
+
+  def __init__(self):
+    self.buckets = {}
+    self.count = 0
+    self.total = 0.0
+    self.min = math.inf
+    self.max = -math.inf
+
+  def add(self, value):
+    value = max(float(value), 0.0)
+    index = -1 if value < 1 else int(math.log2(value) * self.PER_OCTAVE)
+    self.buckets[index] = self.buckets.get(index, 0) + 1
+    self.count += 1
+    self.total += value
+    self.min = min(self.min, value)
+    self.max = max(self.max, value)
+
+  def _value(self, index):
+    if index < 0:
+      return 0.0
+    # Geometric middle of the bucket
+    return 2 ** ((index + 0.5) / self.PER_OCTAVE)
+
+  def quantile(self, q):
+    if not self.count:
+      return None
+    rank = q * (self.count - 1)
+    seen = 0
+    for index in sorted(self.buckets):
+      seen += self.buckets[index]
+      if seen > rank:
+        return min(max(self._value(index), self.min), self.max)
+    return self.max
+
+  def summary(self, quantiles=(0.5, 0.9, 0.99)):
+    if not self.count:
+      return {"count": 0}
+    out = {"count": self.count, "mean": round(self.total / self.count), "min": round(self.min)}
+    for q in quantiles:
+      out[f"p{round(q * 100)}"] = round(self.quantile(q))
+    out["max"] = round(self.max)
+    return out
+
+
+class Visit:
+  """The state kept for the visit currently being read."""
+
+  __slots__ = ("session", "start", "last", "end", "entered", "closed", "events", "seen", "stage", "domain", "project")
+
+  def __init__(self, session, ts, entered):
+    self.session = session
+    self.start = self.last = self.end = ts
+    self.entered = entered
+    self.closed = None
+    self.events = 0
+    self.seen = set()
+    self.stage = self.domain = self.project = None
+
+
+class SessionStats:
+  """Aggregates fed one event at a time, in ``sessionId, ts`` order."""
+
+  def __init__(self, gap_ms=GAP_MS):
+    self.gap_ms = gap_ms
+    self.sessions = 0
+    self.visits = 0
+    self.closed = {"exit": 0, "idle": 0, None: 0}
+    self.no_entry = 0
+    self.idle_events = 0
+    self.funnel = dict.fromkeys(STEPS, 0)
+    self.dropoff_step = {}
+    self.dropoff_at = {}
+    self.stage_visits = {}
+    self.visit_ms = Histogram()
+    self.visit_events = Histogram()
+    self.domain_dwell = Histogram()
+    self.project_dwell = Histogram()
+    self.to_step = {step: Histogram() for step in STEPS[1:]}
+    self.visit = None
+
+  def add(self, session, ts, kind, stage, domain, project, duration):
+    visit = self.visit
+    if visit is None or visit.session != session:
+      if visit is not None:
+        self._finish(visit)
+      self.sessions += 1
+      visit = self.visit = None
+    elif kind == "enter_app" or (ts - visit.last > self.gap_ms and kind not in SCREENSAVER):
+      self._finish(visit)
+      visit = self.visit = None
+    if visit is None:
+      if kind in SCREENSAVER:
+        # The screensaver also runs over the attract loop, with nobody there
+        self.idle_events += 1
+        return
+      visit = self.visit = Visit(session, ts, kind == "enter_app")
+
+    visit.events += 1
+    if visit.closed is None and kind not in SCREENSAVER:
+      # Active time ends at the exit or the last touch before the screensaver
+      visit.end = ts
+    visit.last = ts
+    step = STEP_EVENTS.get(kind)
+    if step and step not in visit.seen:
+      visit.seen.add(step)
+      if step in self.to_step:
+        self.to_step[step].add(ts - visit.start)
+    if kind in CLOSING and visit.closed is None:
+      visit.closed = CLOSING[kind]
+    elif visit.closed is None:
+      # Location is what the visitor was looking at before leaving
+      if stage is not None:
+        visit.stage = stage
+      if kind.startswith("domain_view"):
+        visit.domain, visit.project = domain, None
+      elif kind.startswith("project_view"):
+        visit.domain, visit.project = domain, project
+      elif kind == "stage_view":
+        visit.domain = visit.project = None
+    if kind == "domain_view_end":
+      self.domain_dwell.add(duration)
+    elif kind == "project_view_end":
+      self.project_dwell.add(duration)
+
+  def _finish(self, visit):
+    self.visits += 1
+    self.closed[visit.closed] += 1
+    if not visit.entered:
+      self.no_entry += 1
+    self.visit_ms.add(visit.end - visit.start)
+    self.visit_events.add(visit.events)
+    if visit.stage is not None:
+      self.stage_visits[visit.stage] = self.stage_visits.get(visit.stage, 0) + 1
+
+    furthest = None
+    for step in STEPS:
+      if step not in visit.seen:
+        break
+      self.funnel[step] += 1
+      furthest = step
+    if "exit" in visit.seen:
+      return
+    self.dropoff_step[furthest] = self.dropoff_step.get(furthest, 0) + 1
+    key = (visit.stage, visit.domain, visit.project, visit.closed or "open")
+    self.dropoff_at[key] = self.dropoff_at.get(key, 0) + 1
+
+  def finish(self):
+    if self.visit is not None:
+      self._finish(self.visit)
+      self.visit = None
+
+  def result(self, limit=20):
+    funnel = []
+    previous = self.visits
+    for step in STEPS:
+      count = self.funnel[step]
+      funnel.append({
+        "step": step,
+        "visits": count,
+        "ofVisits": round(count / self.visits, 4) if self.visits else 0,
+        "ofPrevious": round(count / previous, 4) if previous else 0,
+      })
+      previous = count
+    dropoff = sorted(self.dropoff_at.items(), key=lambda item: item[1], reverse=True)
+    return {
+      "sessions": self.sessions,
+      "visits": self.visits,
+      "visitsWithoutEntry": self.no_entry,
+      "screensaverWithoutVisit": self.idle_events,
+      "closedBy": {"exit": self.closed["exit"], "idle": self.closed["idle"], "open": self.closed[None]},
+      "funnel": funnel,
+      "dropoffByStep": [{"furthestStep": step or "none", "visits": count}
+                        for step, count in sorted(self.dropoff_step.items(), key=lambda i: i[1], reverse=True)],
+      "dropoffAt": [{"stageId": s, "domainId": d, "projectId": p, "closedBy": c, "visits": n}
+                    for (s, d, p, c), n in dropoff[:limit]],
+      "stageVisits": [{"stageId": s, "visits": n}
+                      for s, n in sorted(self.stage_visits.items(), key=lambda i: i[1], reverse=True)],
+      "distributions": {
+        "visitDurationMs": self.visit_ms.summary(),
+        "eventsPerVisit": self.visit_events.summary(),
+        "domainDwellMs": self.domain_dwell.summary(),
+        "projectDwellMs": self.project_dwell.summary(),
+        "msToStep": {step: hist.summary() for step, hist in self.to_step.items()},
+      },
+    }
+
+
+def analyze(conn, since_hours=None, now_ms=None, gap_ms=GAP_MS, limit=20, batch_rows=FETCH_BATCH):
+  """One streaming pass over the events; returns the ``SessionStats.result`` dict."""
+  clause, params = where(cutoff=since_cutoff(since_hours, now_ms))
+  cur = conn.execute(f"""
+    SELECT sessionId, ts, type, stageId, domainId,
+           CASE WHEN type LIKE 'project_view_%' THEN CAST({payload_field('projectId')} AS TEXT) END,
+           CASE WHEN type IN ('domain_view_end', 'project_view_end') THEN {DURATION} END
+    FROM events
+    {clause}
+    ORDER BY sessionId, ts, rowid
+  """, params)
+  stats = SessionStats(gap_ms)
+  add = stats.add
+  while True:
+    batch = cur.fetchmany(batch_rows)
+    if not batch:
+      break
+    for row in batch:
+      add(*row)
+  stats.finish()
+  return stats.result(limit)
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog="analytics sessions", description="Visitor funnels, drop-off and dwell.")
+  parser.add_argument("--db", type=pathlib.Path, default=DEFAULT_DB, help="default: %(default)s")
+  parser.add_argument("--since-hours", type=float, default=None)
+  parser.add_argument("--gap-minutes", type=float, default=GAP_MS / 60000,
+                      help="idle time that starts a new visit (default: %(default)s)")
+  parser.add_argument("--limit", type=int, default=20, help="rows in the drop-off location table (default: %(default)s)")
+  parser.add_argument("--format", choices=("json", "csv"), default="json")
+  args = parser.parse_args(argv)
+
+  started = time.perf_counter()
+  try:
+    conn = connect(args.db)
+  except AnalyticsError as e:
+    sys.exit(f"analytics: {e}")
+  try:
+    result = analyze(conn, args.since_hours, gap_ms=args.gap_minutes * 60000, limit=args.limit)
+  finally:
+    conn.close()
+
+  if args.format == "json":
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+  else:
+    for name in ("funnel", "dropoffByStep", "dropoffAt", "stageVisits"):
+      print(f"# {name}")
+      print(to_csv(result[name]))
+  print(f"  {result['visits']:,} visit(s) in {result['sessions']:,} session(s), "
+        f"{(time.perf_counter() - started) * 1000:.0f} ms", file=sys.stderr)
@@ -0,0 +1,194 @@
+"""The dashboard summaries, computed in SQL instead of per-row ``JSON.parse``.
+
+Each function returns the same rows (field names, rounding and ordering) as
+the matching ``/api/analytics/*`` endpoint in ``server/index.js``. Payload
+fields are read with JSON1 (``json_extract``) inside the GROUP BY, so only
+the aggregated rows ever reach Python. Malformed payloads count as empty,
+like the server's ``try { JSON.parse } catch {}``.
+
+``dwell_percentiles`` goes beyond the endpoints: SQL returns the durations
+sorted within each group as columnar arrays, and the percentiles are index
+lookups on those runs.
+"""
+from .db import columns, rows, since_cutoff, where
+
+
+def payload_field(name):
+  """SQL for ``payload.<name>``; NULL when the payload is missing or not valid JSON."""
+  return f"(CASE WHEN json_valid(payload) THEN json_extract(payload, '$.{name}') END)"
+
+
+# Number(x) || 0 in the server: numeric strings count, anything else is 0
+DURATION = f"COALESCE(CAST({payload_field('durationMs')} AS NUMERIC), 0)"
+
+
+def summary(conn, since_hours=None, now_ms=None):
+  clause, params = where(cutoff=since_cutoff(since_hours, now_ms))
+  total, sessions = conn.execute(
+    f"SELECT COUNT(*), COUNT(DISTINCT sessionId) FROM events {clause}", params
+  ).fetchone()
+  by_type = rows(conn, f"SELECT type, COUNT(*) c FROM events {clause} GROUP BY type ORDER BY c DESC", params)
+  return {"totalEvents": total, "distinctSessions": sessions, "byType": by_type}
+
+
+def stage_stats(conn, since_hours=None, now_ms=None):
+  clause, params = where("stageId IS NOT NULL", cutoff=since_cutoff(since_hours, now_ms))
+  return rows(conn, f"""
+    SELECT
+      stageId,
+      SUM(CASE WHEN type='stage_view' THEN 1 ELSE 0 END) AS stageViews,
+      COUNT(DISTINCT CASE WHEN type='stage_view' THEN sessionId END) AS uniqueStageSessions
+    FROM events
+    {clause}
+    GROUP BY stageId
+    ORDER BY stageViews DESC
+  """, params)
+
+
+def domain_stats(conn, since_hours=None, now_ms=None):
+  clause, params = where("type='domain_view_end'", cutoff=since_cutoff(since_hours, now_ms))
+  return rows(conn, f"""
+    SELECT stageId, domainId, COUNT(*) AS closes, SUM({DURATION}) AS totalDurationMs,
+           CAST(ROUND(1.0 * SUM({DURATION}) / COUNT(*)) AS INTEGER) AS avgDurationMs
+    FROM events
+    {clause}
+    GROUP BY stageId, domainId
+    ORDER BY totalDurationMs DESC
+  """, params)
+
+
+def project_stats(conn, since_hours=None, now_ms=None):
+  clause, params = where("type='project_view_end'", cutoff=since_cutoff(since_hours, now_ms))
+  return rows(conn, f"""
+    SELECT stageId, domainId, {payload_field('projectId')} AS projectId,
+           COUNT(*) AS closes, SUM({DURATION}) AS totalDurationMs,
+           CAST(ROUND(1.0 * SUM({DURATION}) / COUNT(*)) AS INTEGER) AS avgDurationMs
+    FROM events
+    {clause}
+    GROUP BY stageId, domainId, projectId
+    ORDER BY totalDurationMs DESC
+  """, params)
+
+
+def question_stats(conn, since_hours=None, now_ms=None):
+  question_id = payload_field("questionId")
+  clause, params = where("type='question_answered'", f"{question_id} IS NOT NULL",
+                         cutoff=since_cutoff(since_hours, now_ms))
+  correct = f"(CASE WHEN {payload_field('correct')} THEN 1 ELSE 0 END)"
+  return rows(conn, f"""
+    SELECT {question_id} AS questionId,
+           SUM({correct}) AS correctCount,
+           COUNT(*) - SUM({correct}) AS wrongCount,
+           COUNT(*) AS totalAnswers,
+           ROUND(1000.0 * SUM({correct}) / COUNT(*)) / 10 AS percentCorrect
+    FROM events
+    {clause}
+    GROUP BY questionId
+    ORDER BY percentCorrect DESC, totalAnswers DESC
+  """, params)
+
+
+def quiz_skips(conn, since_hours=None, now_ms=None):
+  clause, params = where("type='quiz_skipped'", cutoff=since_cutoff(since_hours, now_ms))
+  return rows(conn, f"""
+    SELECT stageId, domainId, COUNT(*) AS skips
+    FROM events
+    {clause}
+    GROUP BY stageId, domainId
+    ORDER BY skips DESC
+  """, params)
+
+
+def screensaver(conn, since_hours=None, now_ms=None):
+  clause, params = where("type IN ('screensaver_shown','screensaver_exit')", cutoff=since_cutoff(since_hours, now_ms))
+  return rows(conn, f"SELECT type, COUNT(*) AS c FROM events {clause} GROUP BY type", params)
+
+
+def daily(conn, days=7, now_ms=None):
+  clause, params = where(cutoff=since_cutoff(days * 24, now_ms))
+  return rows(conn, f"""
+    SELECT
+      strftime('%Y-%m-%d', ts/1000, 'unixepoch') AS day,
+      COUNT(*) AS events,
+      COUNT(DISTINCT sessionId) AS sessions
+    FROM events
+    {clause}
+    GROUP BY day
+    ORDER BY day ASC
+  """, params)
+
+
+def top_sessions(conn, limit=10):
+  return rows(conn, """
+    SELECT sessionId, COUNT(*) AS events
+    FROM events
+    GROUP BY sessionId
+    ORDER BY events DESC
+    LIMIT ?
+  """, (limit,))
+
+
+def _percentile(values, lo, hi, q):
+  """Linearly interpolated percentile of the sorted run ``values[lo:hi]``."""
+  pos = (hi - lo - 1) * q
+  i = int(pos)
+  if lo + i + 1 >= hi:
+    return values[lo + i]
+  return values[lo + i] + (values[lo + i + 1] - values[lo + i]) * (pos - i)
+
+
+def dwell_percentiles(conn, kind="domain", since_hours=None, now_ms=None, quantiles=(0.5, 0.9)):
+  """Median / p90 / max dwell per stage+domain (``kind="domain"``) or per project.
+
+  Durations come back from SQL as one ``array("d")`` sorted by group then
+  duration, so each group is a contiguous sorted run and no Python sort is
+  needed.
+  """
+  if kind == "domain":
+    event, keys = "domain_view_end", ("stageId", "domainId")
+    select = "stageId, domainId"
+  elif kind == "project":
+    event, keys = "project_view_end", ("stageId", "domainId", "projectId")
+    select = f"stageId, domainId, {payload_field('projectId')} AS projectId"
+  else:
+    raise ValueError(f"unknown dwell kind {kind!r}")
+  clause, params = where(f"type='{event}'", cutoff=since_cutoff(since_hours, now_ms))
+  cols = columns(conn, f"""
+    SELECT {select}, {DURATION} AS durationMs
+    FROM events
+    {clause}
+    ORDER BY {', '.join(keys)}, durationMs
+  """, params, typecodes={"durationMs": "d"})
+
+  durations = cols["durationMs"]
+  key_cols = [cols[k] for k in keys]
+  out = []
+  start = 0
+  n = len(durations)
+  while start < n:
+    key = tuple(col[start] for col in key_cols)
+    end = start + 1
+    while end < n and all(col[end] == k for col, k in zip(key_cols, key)):
+      end += 1
+    row = dict(zip(keys, key))
+    row["closes"] = end - start
+    for q in quantiles:
+      row[f"p{round(q * 100)}DurationMs"] = round(_percentile(durations, start, end, q))
+    row["maxDurationMs"] = round(durations[end - 1])
+    out.append(row)
+    start = end
+  out.sort(key=lambda r: r["closes"], reverse=True)
+  return out
+
+
+REPORTS = {
+  "summary": summary,
+  "stage-stats": stage_stats,
+  "domain-stats": domain_stats,
+  "project-stats": project_stats,
+  "question-stats": question_stats,
+  "quiz-skips": quiz_skips,
+  "screensaver": screensaver,
+  "domain-dwell": lambda conn, **kw: dwell_percentiles(conn, "domain", **kw),
+  "project-dwell": lambda conn, **kw: dwell_percentiles(conn, "project", **kw),
+}
@@ -0,0 +1,180 @@
+"""Synthetic kiosk traffic shaped by the real content.
+
+Visitors walk the stages, domains, projects and questions that
+``build_json.py`` would publish from ``content/``, and emit the same events
+as ``src/analytics`` with the same payload fields: ``enter_app``,
+``stage_view``, ``domain_view_start``/``end``, ``question_answered`` or
+``quiz_skipped``, ``project_view_start``/``end`` and finally
+``exit_to_attract`` or the idle screensaver. Dwell times are log-normal,
+and answers are right more often on some questions than others, so the
+summaries have something to show.
+
+Everything is drawn from one seeded ``random.Random`` (event ids included),
+so the same seed gives the same stream. Streams are generators and never
+materialise more than one visit per kiosk.
+"""
+import heapq
+import math
+import pathlib
+import random
+import uuid
+
+from .db import ROOT
+from .quiz import displayed_choices
+
+CONTENT_DIR = ROOT / "content"
+# Bump when the generated traffic changes, so cached seeds are rebuilt
+VERSION = 2
+APP_VERSION = "synthetic"
+# Mirrors the ScreenSaver idleMs default
+IDLE_MS = 10 * 60 * 1000
+
+# Visitor behaviour; rough guesses, tweak to shape the traffic
+P_EXIT_BUTTON = 0.55     # leave with the exit button instead of walking away
+P_TAKE_QUIZ = 0.6        # answer the quiz when it is offered
+P_CORRECT = (0.35, 0.9)  # range of per-question success rates
+ABILITY = (0.4, 1.4)     # per-visitor multiplier on those rates
+STAGES_PER_VISIT = (1, 3)
+DOMAINS_PER_STAGE = (0, 2)
+PROJECTS_PER_DOMAIN = (0, 3)
+DWELL_MS = {            # (median, spread) of log-normal dwell times
+  "transition": (4_000, 0.3),
+  "stage": (6_000, 0.6),
+  "question": (12_000, 0.5),
+  "project": (35_000, 0.8),
+  "between_visits": (240_000, 1.2),
+}
+
+
+class Catalog:
+  """The ids a visitor can reach: ``stages[stage] = {domain: (projects, questions)}``."""
+
+  def __init__(self, stages, choices):
+    self.stages = stages
+    self.choices = choices
+
+  @classmethod
+  def load(cls, content_dir=CONTENT_DIR):
+    """Read ``content_dir`` with the build's loader (``scripts/`` must be importable)."""
+    import content_loader
+
+    content = content_loader.load_content(pathlib.Path(content_dir))
+    stages = {}
+    for stage in content["life_stages"]:
+      domains = content["blurbs"].get(stage["id"], {}).get("domains", {})
+      stages[stage["id"]] = {
+        domain_id: ([p["id"] for p in blurb.get("projects", [])], list(blurb.get("questions", [])))
+        for domain_id, blurb in domains.items()
+      }
+    choices = {}
+    for qid, question in content["questions"].items():
+      options = displayed_choices(question)
+      answer = options.index(question["answer"]) if question.get("answer") in options else 0
+      choices[qid] = (len(options), answer)
+    return cls(stages, choices)
+
+
+def _uuid(rng):
+  return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _dwell(rng, kind):
+  median, spread = DWELL_MS[kind]
+  return int(rng.lognormvariate(math.log(median), spread))
+
+
+class Visitor:
+  """One kiosk's stream of visits, as client event dicts in ``ts`` order."""
+
+  def __init__(self, catalog, rng, session_id, start_ms):
+    self.catalog = catalog
+    self.rng = rng
+    self.session_id = session_id
+    self.now = start_ms
+    # Per-question success rate, fixed for the life of the stream
+    self.skill = {qid: rng.uniform(*P_CORRECT) for qid in sorted(catalog.choices)}
+    self.ability = 1.0
+
+  def _event(self, kind, stage=None, domain=None, payload=None):
+    event = {"id": _uuid(self.rng), "sessionId": self.session_id, "ts": self.now, "type": kind,
+             "stageId": stage, "domainId": domain}
+    if payload:
+      event["payload"] = payload
+    return event
+
+  def _domain(self, stage, domain):
+    rng = self.rng
+    projects, questions = self.catalog.stages[stage][domain]
+    opened = self.now
+    yield self._event("domain_view_start", stage, domain)
+    if questions:
+      if rng.random() < P_TAKE_QUIZ:
+        # The question screen asks one random question of the domain
+        qid = rng.choice(questions)
+        self.now += _dwell(rng, "question")
+        total, answer = self.catalog.choices.get(qid, (0, 0))
+        correct = rng.random() < self.skill.get(qid, 0.5) * self.ability
+        if correct or total < 2:
+          selected = answer
+        else:
+          selected = rng.choice([i for i in range(total) if i != answer])
+        yield self._event("question_answered", stage, domain, {
+          "questionId": qid, "correct": correct, "selectedOptionIndex": selected, "totalOptions": total,
+        })
+      else:
+        self.now += _dwell(rng, "transition")
+        yield self._event("quiz_skipped", stage, domain)
+    viewed = 0
+    if projects:
+      for _ in range(rng.randint(*PROJECTS_PER_DOMAIN)):
+        index = rng.randrange(len(projects))
+        yield self._event("project_view_start", stage, domain, {"projectId": projects[index], "index": index})
+        duration = _dwell(rng, "project")
+        self.now += duration
+        yield self._event("project_view_end", stage, domain, {"projectId": projects[index], "durationMs": duration})
+        viewed += 1
+    self.now += _dwell(rng, "transition")
+    yield self._event("domain_view_end", stage, domain, {"durationMs": self.now - opened, "projectsViewed": viewed})
+
+  def visit(self):
+    """Yield one visit's events and advance the clock to the next visitor."""
+    rng = self.rng
+    # Some visitors know more than others, which the discrimination index picks up
+    self.ability = rng.uniform(*ABILITY)
+    yield self._event("enter_app")
+    self.now += _dwell(rng, "transition")
+    stage_ids = list(self.catalog.stages)
+    for _ in range(rng.randint(*STAGES_PER_VISIT)):
+      stage = rng.choice(stage_ids)
+      yield self._event("stage_view", stage)
+      self.now += _dwell(rng, "stage")
+      domains = list(self.catalog.stages[stage])
+      if domains:
+        for _ in range(rng.randint(*DOMAINS_PER_STAGE)):
+          yield from self._domain(stage, rng.choice(domains))
+    if rng.random() < P_EXIT_BUTTON:
+      yield self._event("exit_to_attract", payload={"reason": "button"})
+    else:
+      self.now += IDLE_MS
+      yield self._event("screensaver_shown")
+      self.now += _dwell(rng, "between_visits")
+      yield self._event("screensaver_exit")
+    self.now += _dwell(rng, "between_visits")
+
+  def __iter__(self):
+    while True:
+      yield from self.visit()
+
+
+def kiosks(catalog, count, seed=0, start_ms=1_700_000_000_000):
+  """``count`` independent ``Visitor`` streams, each with its own session id."""
+  rng = random.Random(seed)
+  return [Visitor(catalog, random.Random(rng.getrandbits(64)), _uuid(rng), start_ms) for _ in range(count)]
+
+
+def events(catalog, total, kiosk_count=4, seed=0, start_ms=1_700_000_000_000):
+  """``total`` events from ``kiosk_count`` kiosks, interleaved in ``ts`` order."""
+  streams = [iter(v) for v in kiosks(catalog, kiosk_count, seed, start_ms)]
+  merged = heapq.merge(*streams, key=lambda e: e["ts"])
+  for _, event in zip(range(total), merged):
+    yield event
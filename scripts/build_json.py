@@ -1,518 +1,287 @@
-import json, pathlib
-pathlib.Path("src/data").mkdir(parents=True, exist_ok=True)
-
-life_stages = [
-  {
-    "id": "early",
-    "title": "Childhood",
-    "icon": "/childhood.png",
-    "domains": [
-      "wellbeing",
-      "education",
-      "poverty"
-    ],
-    "color": "#4FC3F7"
-  },
-  {
-    "id": "adult",
-    "title": "Adult Life",
-    "icon": "/adult.png",
-    "domains": [
-      "family",
-      "inequality"
-    ],
-    "color": "#2A9D8F"
-  },
-  {
-    "id": "senior",
-    "title": "Senior Life",
-    "icon": "/senior.png",
-    "domains": [
-      "health",
-      "wellbeing",
-      "pension"
-    ],
-    "color": "#D4A373"
-  },
-  {
-    "id": "ai_future",
-    "title": "and the Future",
-    "icon": "",
-    "domains": [
-      "technology",
-    ],
-    "color": "#264653"
-  }
-]
-
-blurbs = {
-  "early": {
-    "stage": "early",
-    "domains": {
-      "wellbeing": {
-        "projects": [
-          {
-            "id": "ch_wel_ggd",
-            "title": "GUIDE Growing Up in Digital Europe: EuroCohort",
-            "introduction": "Recent OECD reports stress that to truly understand children’s well-being, it is essential to collect data directly from them. Beyond income, housing, or school results, what really matters is how children perceive their daily lives, opportunities, and challenges. \nGUIDE will be the first large-scale comparative study to follow children across Europe from birth to young adulthood. By regularly gathering both objective indicators and children’s own voices, GUIDE will provide unique insights into how well-being evolves over time. \nWith its strong experience in surveying children in Luxembourg, LISER plays an active role in this pioneering project, supporting healthier, fairer, and more fulfilling lives for future generations.",
-            "conclusion": "In 2023, child well-being in Luxembourg is 8.1 on average, but this figure varies with age (younger children tend to be more satisfied with their lives than older children), gender (boys are generally more satisfied than girls), and family status (children from single-parent families are less satisfied). \nThese figures are comparable to neighboring countries (Belgium, France, and Germany).",
-            "image": {
-                      "src": "/project_images/child_wellbeing.png",
-                      "cite": ""
-                      },  
-            "qrCode": ["/project_qr_codes/ch_well_ggde_qr_1.svg"],
-            "author": ["Audrey Bousselin", "Denisa Sologon", "Eugenio Peluso"]
-          },
-          {
-            "id": "ch_wel_ppc",
-            "title": "Parental perceptions of child wellbeing",
-            "introduction": "Parents spend time, money, and emotional resources to support their children, but they may not have all the information needed to make the best choices. This project looks at whether parents’ views of their children’s wellbeing match what children themselves say, across areas like emotions and friendships. We then measure how much of any gap comes from differences in opinions versus parents lacking accurate or complete information.",
-            "conclusion": "Parents in Luxembourg systematically underestimate the socio-emotional difficulties reported by their children across a variety of dimensions. About half of this difference seems to happen because parents don’t have the full picture of what their children are going through. Using an experimental design, we find that giving parents better information can help close this gap and guide them to support their children in more effective ways.",
-            "image": {
-                "src": "/project_images/ch_well_ppc.png",
-                "cite": ""
-            },
-            "qrCode": ["/project_qr_codes/ch_well_ppc_qr_1.svg"],
-            "author": ["Giorgia Menta", "Audrey Bousselin"]
-        }
-      ],
-      "questions":["ch_wel_ggd_1","ch_wel_ggd_2","ch_wel_ppc_1"]
-      },
-      "education": {
-          "projects": [
-              {
-                "id": "ch_edu_esse",
-                "title": "Evolution of Social Segregation in Education",
-                "introduction": "Between 2009 and 2023, inequalities in Luxembourg’s secondary schools increased across all four dimensions. The share of students not speaking Luxembourgish or German at home rose from 35% to over 54%, those from precarious work households from 10% to over 13%, while poverty grew slightly from 8% to 9%. Children from single-parent families more than doubled, from 3% to over 7%. However, more concerning are the disparities at school level: in 2023, poverty ranged from 2% to nearly 20%, work precarity from under 4% to almost 20%, and linguistic diversity from fewer than 5% to over 80%. Inequalities are thus not only rising but also highly unevenly distributed across schools – a trend requiring close attention.",
-                "conclusion": "The concentration of disadvantage in certain schools is a critical concern, as it risks reinforcing unequal opportunities and undermining cohesion. Some schools face combined pressures of poverty, work precarity, linguistic diversity, and family fragility, making them particularly vulnerable. Addressing this requires research and policy cooperation: joint efforts are needed to better understand the drivers and consequences of unequal distribution, and to identify the most effective solutions. Targeted school-level measures—for instance, language support, additional teaching resources, and social services—are essential, while broader contextual factors such as housing patterns, labour market conditions, taxation, and social policy should not be ignored. Preventing excessive concentrations of disadvantage is key to ensuring equitable opportunities across Luxembourg’s schools.",
-                "image": {
-                    "src": "/project_images/inequalities.gif",
-                    "cite": ""
-                },
-                "qrCode": ["project_qr_codes/ch_edu_esse_qr_1.svg", "project_qr_codes/ch_edu_esse_qr_2.svg"],
-                "author": ["Eugenio Peluso", "Philippe Van Kerm", "Aigul Alieva", "Thiago Brant", "Mariagrazia Cavallo"]
-              }     
-          ],
-           "questions":["ch_edu_esse_1","ch_edu_esse_2"]
-      },
-      "poverty": {
-          "projects": [
-              {
-                  "id": "ch_pov_ecg",
-                  "title": "European Child Guarantee (ECG)-LUX",
-                  "introduction": "The European Child Guarantee (ECG) Council Recommendation requires each Member State to guarantee access for children in need to free childcare, education, healthcare and school meals, as well as adequate housing and healthy nutrition. Exploiting administrative and survey data, LISER assesses progress and challenges towards the ECG objectives in Luxembourg in biannual reports to the European Commission.",
-                  "conclusion": "Luxembourg has developed numerous policies to ensure free access for all children to the services covered by the European Child Guarantee. However, challenges remain in securing effective access for the most vulnerable children and guaranteeing equal opportunities for all children.",
-                  "image":{
-                      "src": "project_images/ch_pov_ecg.png",
-                      "cite": ""
-                  },
-                  "qrCode": ["project_qr_codes/ch_pov_ecg_qr_1.svg"],
-                  "author": ["Anne-Catherine Guio", "Eric Marlier"]
-              },
-              {
-                  "id": "ch_pov_cpp",
-                  "title": "Children’s poverty perception",
-                  "introduction": "Growing up in poverty can limit children’s opportunities and affect how they learn, feel, and plan for the future. Policies often focus on reducing measurable inequalities like low income or lack of resources. But there’s another side: how children see their own situation. Feeling poor can impact confidence, well-being, and life choices—sometimes as much as actual poverty. Our project asks: Do children who feel poor actually live in poverty?  By comparing perceptions with reality, we aim to understand this gap and design policies that address both material and emotional needs.",
-                  "conclusion": "Many children worry about money more than their family’s income would suggest. Poverty and financial concerns are linked, but perceptions are shaped by deprivation, parental stress, and peer comparisons. One in three children feel poor without actually being poor, while one in ten are poor but don’t feel that way. Girls, and those reporting a lack of family leisure activities, are most at risk—highlighting the need to address both material resources and perceptions.",
-                  "image": {
-                      "src": "project_images/poverty_perceptions.png",
-                      "cite": ""
-                  },
-                  "qrCode": ["project_qr_codes/ch_pov_cpp_qr_1.svg"],
-                  "author": ["Audrey Bousselin"]
-              }
-              
-          ],
-           "questions":["ch_pov_cpp_1","ch_pov_cpp_2","ch_pov_ecg_1","ch_pov_ecg_2"]
-      }
-      
-    }
-  },
-  "adult": {
-    "stage": "adult",
-    "domains": {
-      "family": {
-        "projects": [
-          {
-            "id": "ad_fam_efp",
-            "title": "Evaluation of family policies: focus on parental leave policy take-up and its determinants and outcomes",
-            "introduction": "The arrival of children affects the personal and professional lives of parents, as well as the division of paid and unpaid work within a couple. Parental leave is one of the policies designed to reduce the negative consequences of parenthood and to promote gender equality in the division of labour between women and men. A major reform of the parental leave policy took place in Luxembourg in 2016. LISER research, using administrative IGSS data, analysed leave take-up according to various socio-economic characteristics such as nationality, country of residence, gender, work experience, wage, work position, as well as parents’ workplace characteristics, including company size and sector. LISER also evaluated the impact of the parental leave reform on leave take-up.",
-            "conclusion": "Key takeaway / policy relevance: \nAnalyses have shown an increase in the uptake of parental leave following the 2016 parental leave reform, particularly among fathers. However, despite this development, inequalities in leave take-up remain. Women and employees in certain economic sectors and larger companies are still more likely to benefit from the policy, and hence to be engaged in childcare and to develop stronger relationships with their children, compared to their male counterparts and parents in other sectors. Evaluating parental leave take-up helps us understand how different groups of the eligible parents respond to the policy and which groups of parents benefit most from it. It uncovers “leave-poor” groups within the parent population, and help policymakers target and design further policy interventions.",
-            "image": {
-                      "src": "project_images/ad_fam_efp.png",
-                      "cite": ""
-                      },  
-            "qrCode": ["project_qr_codes/ad_fam_efp_qr-1.svg", "project_qr_codes/ad_fam_efp_qr-2.svg"],
-            "author": ["Marie Valentova", "Anne-Sophie Genevois", "Kristell Leduc"]
-          }
-        ],
-        "questions":["ad_fam_efp_1","ad_fam_efp_2"]
-      },
-      "inequality": {
-          "projects": [
-              {
-                "id": "ad_ine_gicc",
-                "title": "Gender inequality and contemporary challenges",
-                "introduction": "In a collaboration with the MEGA, following up on a past project on the gendered effects of the pandemic (COGEL-19), we have examined three interconnected challenges through the lenses of gender: the housing cost crisis, the surge in inflation, and the shift toward sustainable consumption. Housing costs and inflation weigh more heavily on households led by women, particularly low-income renters and single-parent families. Beyond these pressures, gender also shapes sustainable consumption: women generally adopt more eco-responsible behaviours but face more barriers, whereas men are more influenced by information about what others do, especially for easily changeable consumption habits (ex. meat consumption). ",
-                "conclusion": "Women in Luxembourg are disproportionately affected by housing costs and inflation, yet they also lead in adopting eco-responsible behaviours. Targeted, gender-sensitive policies can reduce the barriers they face and harness their role as drivers of sustainable change, strengthening both equality and resilience in times of transition.",
-                "image": {
-                    "src": "project_images/ad_ine_gicc.png",
-                    "cite": ""
-                },
-                "qrCode": ["project_qr_codes/ad_ine_gicc_qr_1.svg", "project_qr_codes/ad_ine_gicc_qr_2.svg"],
-                "author": ["Eugenio Peluso", "Giorgia Menta", "Nizamul Islam", "Kristell Leduc", "Nathalie Lorentz", "Denisa M. Sologon", "Philippe Van Kerm", "Bertrand Verheyden"]
-              },
-              {
-                "id": "ad_ine_iti",
-                "title": "Intergenerational transmission of inequality",
-                "introduction": "Some studies suggest that inheritance taxes can reduce the intergenerational transmission of inequality and promote equality of opportunity. Public views on this tax, however, are divided. For some, inheritances represent an unearned advantage for children who did not generate the wealth themselves, while others regard them as a fair transfer within families. From a policy perspective, inheritance taxation receives mixed support among academics and policymakers alike. Its successful implementation ultimately depends on broad public acceptance, which is why research has increasingly focused on understanding attitudes and preferences toward this form of taxation.",
-                "conclusion": "Our results show a clear divide in public opinion on taxation. There is relatively strong support for new wealth and inheritance taxes, but little support for increases in VAT or income taxes. For example, 58% of respondents agree or strongly agree with a one-time tax on net worth, compared with only 24% who support even a small rise in VAT. We also find that support for any tax declines as the expected revenue increases. Overall, our findings suggest that a one-time wealth tax could generate substantial revenue while still enjoying broad public backing.",
-                "image": {
-                    "src": "project_images/ad_ine_iti.png",
-                    "cite": ""
-                },
-                "qrCode": ["project_qr_codes/ad_ine_iti_qr_1.svg"],
-                "author": ["Javier Olivera", "Philippe Van Kerm"]
-              }
-            ],
-          "questions":["ad_ine_gicc_1","ad_ine_gicc_2"]
-          }
-    }
-  },
-  "senior": {
-    "stage": "senior", 
-    "domains": {
-      "health": {
-        "projects": [
-          {
-            "id": "sn_hea_papf",
-            "title": "Population ageing and public finance burden of dementia",
-            "introduction": "Dementia represents a global health challenge that will continue to grow for decades to come. The progressive ageing of the EU population (21% aged over 65 in 2021) and the increase in life expectancy make dementia, a major contributor to disability among the older population. The consistent feature of the dementia syndrome is that patients depend on caregivers as well as health services. Therefore, dementia has a significant impact on public expenditure for healthcare and for long-term care. \nIn this paper, we extended a dynamic model adapted to the specificities of the healthcare system in Luxembourg to estimate the long-term effect of dementia prevalence among individuals aged 50+ on public expenditure for healthcare and long-term care in the country under different scenarios.",
-            "conclusion": "The prevalence of dementia is expected to grow from 3.8% in 2025 to 5.3% in 2070. \nThe prevalence of Alzheimer, the most common type of dementia, is expected to grow from 2.8% in 2025 to 4.1% in 2070.\nPublic expenditure on healthcare for individuals affected by dementia in 2070 is projected to be three times its value in 2025.\nPublic expenditure on long-term care for these patients in 2070 is projected to be almost eight times its value in 2025.\nFrom a public health policy perspective, our results could contribute to ex-ante evaluation of preventive strategies to reduce the incidence of dementia. From an economic perspective, our results could contribute to identifying the priorities to limit the impact of an ageing population on public finances.",
-            "image": {
-                      "src": "project_images/sn_hea_pap.png",
-                      "cite": ""
-                      },  
-            "qrCode": ["project_qr_codes/sn_hea_papf_qr_1.svg"],
-            "author": ["Maria Noel Pi Alperin"]
-          },
-          {
-            "id": "sn_hea_share",
-            "title": "Survey of Health, Ageing and Retirement in Europe (SHARE)",
-            "introduction": "The population ageing process represents one of the most important demographic processes of the last decades in Europe and beyond. As people are getting older, while birth rate is declining and life expectancy increasing, the ageing of the population is expected to accelerate. The same applies for Luxembourg, which has one of the highest life expectancies in Europe. The ageing of the population will have a high impact on the economy and the way our society will be organised. \nSHARE, the Survey of Health, Ageing and Retirement in Europe, is a research infrastructure for studying the effects of health, social, economic and environmental policies over the life-course of European citizens and beyond.",
-            "conclusion": "<p>Since its creation in 2004:</p><ul class=\"list-disc list-inside\"><li>SHARE has set new standards in research and scientific data collection</li><li>SHARE has provided policymakers with reliable and comparable data on which they can base their decisions to address socio-economic and public health challenges using scientific evidence and thus contribute to improving the living conditions of European citizens.</li></ul> <br/> <p>More than 20 years of existence:</p><ul class=\"list-disc list-inside\"><li>28 country teams, 160.000 participants, more than 600.000 interviews collected</li></ul><br/><p>Luxembourg joined the SHARE project in 2013:</p><ul class=\"list-disc list-inside\"><li>Six waves of data already collected</li><li>More than 3000 participants</li><li>More than 80 scientific publications using the Luxembourgish data of SHARE</li></ul>",
-            "image": {
-                "src": "project_images/sn_hea_share.png",
-                "cite": ""
-            },
-            "qrCode": ["project_qr_codes/sn_hea_shar_qr_1.svg", "project_qr_codes/sn_hea_shar_qr_2.svg"],
-            "author": ["Maria Noel Pi Alperin", "Gaetan de Lanchy", "Jordane Segura"]
-          }
-        ],
-        "questions":["sn_hea_shar_1","sn_hea_shar_2","sn_hea_papf_1","sn_hea_papf_2"]
-      },
-      "wellbeing": {
-        "projects": [
-            {
-                "id": "sn_wel_saa",
-                "title":"Studying Active Ageing",
-                "introduction":"Defined by the World Health Organization, <strong>Active Ageing</strong> allows people to realize their potential for physical, social, and mental wellbeing throughout the life course and to participate in society according to their needs, desires and capacities, while providing them with adequate protection, security and care when they require assistance.\nThe <strong>Active Ageing Index (AAI)</strong> measures ongoing participation in social, economic, cultural, spiritual, and civic activities, as well as wellbeing, autonomy, and independence.",
-                "conclusion": "Luxembourg ranks very well in active ageing with respect to other European countries. However, Luxembourg’s Gini index for the AAI is relatively high, suggesting scope for policies that foster more equitable well-being among older adults.",
-                "image":{
-                    "src": "/project_images/sn_wel_saa.bmp",
-                    "cite": ""
-                },
-                "qrCode": ["project_qr_codes/sn_wel_saa_qr_1.svg"],
-                "author": ["Javier Olivera"]
-            }          
-        ],
-        "questions":["sn_wel_saa_1","sn_wel_saa_2"] 
-      },
-      "pension": {
-        "projects": [
-            {
-                "id": "sn_wel_ppp",
-                "title":"Portability of pension plans",
-                "introduction":"In April 2024, LISER conducted a discrete choice experiment to explore how willing people are to join a portable voluntary pension plan that can move with them across the EU. The study was inspired by the <strong>Pan-European Personal Pension Product (PEPP)</strong>, an EU initiative designed to make supplementary pensions more flexible and transferable between member states. Participants compared alternative pension plans, some with portability and others without, while also facing varying potential losses in pension balance due to management fees. The research reveals how portability and costs influence people’s decisions to save for retirement across borders.",
-                "conclusion": "The study shows that, on average, people are willing to give up 3.6% of their pension savings to have a plan that is portable across EU countries. For example, someone might prefer a portable pension with a 1% annual fee over a non-portable one with a 0.65% fee (assuming a 20-year plan and 5% return). Portability matters most to people who are likely to move for work—such as non-homeowners, those planning to work abroad, those with past work experience abroad, and people under 40. Offering flexible, portable pensions can help individuals build personal retirement savings while reducing pressure on public pensions. This is particularly relevant for Luxembourg, where many workers have international careers.",
-                "image":{
-                    "src": "/project_images/sn_wel_ppp.png",
-                    "cite": ""
-                },
-                "qrCode": ["project_qr_codes/sn_wel_ppp_qr_1.svg", "project_qr_codes/sn_wel_ppp_qr_2.svg"],
-                "author": ["Javier Olivera", "Uyen Nguyen-Thi", "Ludivine Martin"]
-            }
-        ],
-        "questions":["sn_wel_ppp_1","sn_wel_ppp_2"]
-      }
-    }
+import argparse, functools, json, pathlib, sys, time
+
+from build_report import BudgetError, Profiler, build_report, check_budgets, load_budgets, print_report, print_violations
+from content_loader import ContentError, assemble, iter_source_paths, load_content, load_stage_files, parse_file
+from incremental import IncrementalWriter, atomic_write
+from normalize import build_content_index
+from optimize_assets import OUTPUT_SUBDIR, collect_assets, optimize_assets
+from precache import build_precache_manifest, build_prefetch_plan, precache_inputs
+from search_index import DEFAULT_LANGUAGES, build_search_index, dump_index, language_rules, search_inputs
+from shards import SHARD_DIR, index_entry, plan_shards, shard_index
+from validate_content import report, validate_cached
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+CONTENT_DIR = ROOT / "content"
+DATA_DIR = ROOT / "src" / "data"
+PUBLIC_DIR = ROOT / "public"
+MANIFEST_PATH = ROOT / ".build-cache" / "build_json.manifest.json"
+ASSET_MANIFEST = DATA_DIR / "assetManifest.json"
+ASSET_CACHE = ROOT / ".build-cache" / "assets"
+VALIDATE_CACHE = ROOT / ".build-cache" / "validate.json"
+BUDGETS_PATH = ROOT / "build-budgets.json"
+REPORT_PATH = ROOT / ".build-cache" / "build-report.json"
+SHARD_INDEX = f"{SHARD_DIR}/index.json"
+SEARCH_INDEX = "searchIndex.json"
+PREFETCH_PLAN = "prefetchPlan.json"
+PRECACHE_MANIFEST = "precache-manifest.json"
+# Outputs that do not live under src/data
+OUTPUT_PATHS = {PRECACHE_MANIFEST: PUBLIC_DIR / PRECACHE_MANIFEST}
+
+
+def load_asset_manifest():
+  try:
+    return json.loads(ASSET_MANIFEST.read_text(encoding="utf-8"))
+  except FileNotFoundError:
+    return {}
+
+
+def plan_outputs(content, shards=True, assets=None, languages=DEFAULT_LANGUAGES):
+  """Map each generated file (except the shard index) to ``(inputs, make)``.
+
+  ``make()`` returns the document and ``inputs`` is everything it is derived
+  from, so watch mode only rebuilds documents whose inputs changed. A question
+  edit, for example, touches ``questions.json`` and the shards quizzing it.
+  """
+  blurbs, question_projects = content["blurbs"], content["question_projects"]
+  # The prefetch plan carries the manifest hash the service worker is registered with
+  precache = precache_inputs(content, PUBLIC_DIR, assets)
+  manifest = functools.cache(lambda: build_precache_manifest(content, PUBLIC_DIR, assets))
+  plan = {
+    "lifeStages.json": (content["life_stages"], lambda: content["life_stages"]),
+    "blurbs.json": (blurbs, lambda: blurbs),
+    "questions.json": (content["questions"], lambda: content["questions"]),
+    "domains.json": (content["domains"], lambda: content["domains"]),
+    "contentIndex.json": ((blurbs, question_projects), lambda: build_content_index(blurbs, question_projects)),
+    SEARCH_INDEX: (search_inputs(content, languages), lambda: build_search_index(content, languages)),
+    PREFETCH_PLAN: (precache, lambda: build_prefetch_plan(content, assets, manifest()["hash"])),
+    PRECACHE_MANIFEST: (precache, manifest),
   }
-}
-
-questions= {
-    "ch_wel_ggd_1":{
-        "question": "On average, how much do children aged 8 to 16 in Luxembourg agree with the statement “All is well in my life”, on a scale from 0 to 10?",
-        "choices": [
-            "8.1",
-            "6.5",
-            "9.8",
-            "4.5"
-        ],
-        "answer": "8.1"
-    },
-    "ch_wel_ggd_2":{
-        "question": "On average, girls are more satisfied with their lives than boys?",
-        "choices": [
-            "Boys and girls report similar level of well-being.",
-            "Yes, girls report higher level of well-being.",
-            "No, girls report lower level of well-being."
-        ],
-        "answer": "No, girls report lower level of well-being."
-    },
-    "ch_wel_ppc_1":{
-        "question": "Parents are often the people who know their children best. In Luxembourg, do you think parents on average overstate, understate or are able to correctly estimate their children’s wellbeing?",
-        "choices": [
-            "Parents understate their children's wellbeing (as compared to what children self-report)",
-            "Parents overstate their children's wellbeing (as compared to what children self-report)",
-            "Parents and children report similar levels of child wellbeing",
-            "I’m not sure, but I’d like to find out"
-        ],
-        "answer": "Parents understate their children's wellbeing (as compared to what children self-report)"
-    },
-    "ad_fam_efp_1":{
-        "question":"A major parental leave policy reform took place in Luxembourg in 2016. LISER evaluated the effect of the reform on parental leave take-up behaviour. Whose parental leave take-up increased the most after the reform?",
-        "choices": [
-            "Mothers",
-            "Fathers",
-            "None",
-            "Both equally"
-        ],
-        "answer": "Fathers"
-    },
-    "ad_fam_efp_2":{
-        "question":"LISER studies have analysed the factors that affect parental leave take-up among parents, including how employers’ characteristics influence uptake. In which type of firms is the take-up lowest?",
-        "choices": [
-            "The take-up does not differ depending on employer size",
-            "Employers with fewer than 50 employees",
-            "Employers with 50 to 100 employees",
-            "Employers with more than 100 employees"
-        ],
-        "answer": "Employers with fewer than 50 employees"
-    },
-    "ch_pov_cpp_1":{
-        "question": "According to our data, a child can feel poor…",
-        "choices": [
-            "Only if their family income is below the poverty line",
-            "Even if their family income is not below the poverty line",
-            "Only if they are materially deprived (ex. lack of clothes in good conditions, things needed for sport and leisure activities, books…)"
-        ],
-        "answer": "Even if their family income is not below the poverty line"
-    },
-    "ch_pov_cpp_2":{
-        "question": "Which factor is a strong predictor of children feeling poor, even when they are not?",
-        "choices": [
-            "Age",
-            "Number of siblings",
-            "Gender"
-        ],
-        "answer": "Gender"
-    },
-    "ch_pov_ecg_1":{
-        "question": "In 2024, Luxembourg ranks in terms of child poverty and social exclusion among:",
-        "choices": [
-            "The 8 EU best performers",
-            "The 8 EU worst performers"
-        ],
-        "answer": "The 8 EU worst performers"
-    },
-    "ch_pov_ecg_2":{
-        "question": "In 2024, In Luxembourg the vast majority of children “at risk of poverty or social exclusion” live:",
-        "choices": [
-            "In a low-income household",
-            "With jobless parents",
-            "In a severely deprived household"
-        ],
-        "answer": "In a low-income household"
-    },
-    "ad_ine_gicc_1":{
-        "question": "Which of these hypothetical green policies is supported by more women than men?",
-        "choices": [
-            "Increasing the VAT on red meat from 3% to 17%",
-            "Introducing a 5-euro highway toll",
-            "Rationing on fossil energy sources",
-            "None of the above"
-        ],
-        "answer": "Rationing on fossil energy sources"
-    },
-    "ad_ine_gicc_2":{
-        "question": "Why are women more vulnerable to the impacts of inflation in Luxembourg?",
-        "choices": [
-            "Women typically have less access to financial resources like savings to manage unexpected expenses",
-            "Women tend to allocate a larger share of their income to essential goods and services, such as food and heating",
-            "Single parents, who typically face lower average incomes and reduced capacity to absorb rising costs, are predominantly women",
-            "All of the above"
-        ],
-        "answer": "All of the above"
-    },
-
-    "ch_edu_esse_1":{
-        "question": "Which region in Luxembourg has the least number of secondary schools?",
-        "choices": [
-            "Région Centre",
-            "Région Sud",
-            "Région Nord",
-            "Région Est"
-        ],
-        "answer": "Région Est"
-    },
-    "ch_edu_esse_2":{
-        "question": "In what year did the law first require schools to consider parents’ preferences for secondary-track placement (ESC, ESG, ESG-VO) after primary school?",
-        "choices": [
-            "2003",
-            "2009",
-            "2015",
-            "2023"
-        ],
-        "answer": "2009"
-    },
-    "sn_hea_shar_1":{
-        "question": "The percentage of the total population that are over 50 years old in Luxembourg is",
-        "choices": [
-            "25%",
-            "35%",
-            "45%"
-        ],
-        "answer": "35%"
-    },
-    "sn_hea_shar_2":{
-        "question": "The percentage of the total population that are over 65 years old in Luxembourg is",
-        "choices": [
-            "Less than 10%",
-            "More than 14%",
-            "More than 20%"
-        ],
-        "answer": "More than 14%"
-    },
-    "sn_hea_papf_1":{
-        "question": "In Luxembourg, more than 1.25% of the total population is affected by dementia. This share is projected to...",
-        "choices": [
-            "Be the same in 2050",
-            "Reach 2.04% of the population",
-            "Reach 2.44% of the total population"
-        ],
-        "answer": "Reach 2.44% of the total population"
-    },
-    "sn_hea_papf_2":{
-        "question": "Luxembourg has similar dementia prevalence rates than",
-        "choices": [
-            "Belgium",
-            "Cyprus",
-            "France"
-        ],
-        "answer": "Cyprus"
-    },
-    "sn_wel_ppp_1":{
-        "question": "On average, what additional share of their pension savings did participants in our study say they would give up for a pension plan fully portable across the European Union?",
-        "choices": [
-            "1.2%",
-            "3.6%",
-            "5.2%",
-            "2.4%"
-        ],
-        "answer": "3.6%"
-    },
-    "sn_wel_ppp_2":{
-        "question": "In our study, which group was more willing to pay extra for a pension plan fully portable across the European Union?",
-        "choices": [
-            "People over 40",
-            "Cross-border workers living in Belgium",
-            "People who are not homeowners",
-            "Women"
-        ],
-        "answer": "People over 40"
-    },
-    "sn_wel_saa_1":{
-        "question": "Looking beyond the average score, the <strong>Active Ageing Index (AAI)</strong> also tells us how evenly older adults benefit from active ageing opportunities. Greater inequality in AAI scores means weaker overall performance.<br><br>Where do you think <strong>Luxembourg</strong> ranks among 28 European countries for <strong>AAI equality</strong>?",
-        "choices": [
-            "3rd",
-            "10th",
-            "6th",
-            "15th"
-        ],
-        "answer": "6th"
-    },
-    "sn_wel_saa_2":{
-        "question": "Where do you think Luxembourg ranks among 28 European countries in terms of both the average level and the equality of the AAI?",
-        "choices": [
-            "12th",
-            "5th",
-            "18th",
-            "2nd"
-        ],
-        "answer": "5th"
-    }
-}
-
-domains = [
-  {
-    "id": "family",
-    "label": "Family",
-    "color": "#38a169",
-    "icon": "/family.png"
-  },
-  {
-    "id": "education",
-    "label": "Education",
-    "color": "#3182ce",
-    "icon": "/education.png"
-  },
-  {
-    "id": "health",
-    "label": "Health",
-    "color": "#d69e2e",
-    "icon": "/health.png"
-  },
-  {
-    "id": "work",
-    "label": "Work",
-    "color": "#e53e3e",
-    "icon": "/work.gif"
-  },
-  {
-    "id": "wellbeing",
-    "label": "Wellbeing",
-    "color": "#3182ce",
-    "icon": "/wellbeing.png"
-  },
-   {
-    "id": "poverty",
-    "label": "Poverty",
-    "color": "#3182ce",
-    "icon": "/poverty.png"
-  },
-    {
-      "id": "inequality",
-      "label": "Inequality",
-      "color": "#38a169",
-      "icon": "/inequality.png"
-    },
-    {
-      "id": "technology",
-      "label": "Technology",
-      "color": "#805ad5",
-      "icon": "/technology.png"
-    },
-    {
-      "id": "pension",
-      "label": "Pension",
-      "color": "#805ad5",
-      "icon": "/pension.png"
-    }
-]
-
-
-json.dump(life_stages, open("src/data/lifeStages.json", "w", encoding="utf-8"), indent=2, ensure_ascii=False)
-json.dump(blurbs, open("src/data/blurbs.json", "w", encoding="utf-8"), indent=2, ensure_ascii=False)
-json.dump(questions, open("src/data/questions.json", "w", encoding="utf-8"), indent=2, ensure_ascii=False)
-json.dump(domains, open("src/data/domains.json", "w", encoding="utf-8"), indent=2, ensure_ascii=False)
-print("Synthetic data written.")
+  if shards:
+    for name, inputs, make in plan_shards(blurbs, content["questions"], assets):
+      plan[name] = (inputs, make)
+  return plan
+
+
+def outputs(content, shards=True, assets=None, languages=DEFAULT_LANGUAGES):
+  """Map each generated file to the document it holds."""
+  docs = {name: make() for name, (_, make) in plan_outputs(content, shards, assets, languages).items()}
+  if shards:
+    docs[SHARD_INDEX] = shard_index(
+      (doc, index_entry(doc)) for name, doc in docs.items() if name.startswith(f"{SHARD_DIR}/")
+    )
+  return docs
+
+
+def output_path(name):
+  """Where an output of ``plan_outputs`` goes: src/data unless listed in ``OUTPUT_PATHS``."""
+  return OUTPUT_PATHS.get(name, DATA_DIR / name)
+
+
+def write_output(writer, name, doc):
+  """Write one output; the search index is packed, everything else indented."""
+  if name == SEARCH_INDEX:
+    return writer.write_bytes(output_path(name), dump_index(doc))
+  return writer.write_json(output_path(name), doc)
+
+
+def check(content, strict=False):
+  """Run the content validator; returns False (after reporting) when the build must stop."""
+  issues = validate_cached(content, PUBLIC_DIR, VALIDATE_CACHE)
+  report(issues)
+  if issues.errors or (strict and issues.warnings):
+    print(f"build_json: content validation failed ({len(issues.errors)} error(s), "
+          f"{len(issues.warnings)} warning(s)); nothing written", file=sys.stderr)
+    return False
+  return True
+
+
+def print_summary(writer):
+  for key in writer.written:
+    print(f"  wrote     {key}")
+  for key in writer.removed:
+    print(f"  removed   {key}")
+  print(f"Synthetic data written ({len(writer.written)} changed, {len(writer.unchanged)} unchanged).")
+
+
+class WatchSession:
+  """Rebuild state kept between change batches in ``--watch`` mode.
+
+  Project files are re-parsed only when their ``(mtime, size)`` changed, and
+  each output is regenerated only when its ``plan_outputs`` inputs differ
+  from the previous build. Untouched outputs are recorded with
+  ``IncrementalWriter.keep``, so the writer neither re-serializes nor
+  rewrites them and Vite sees just the files that really changed.
+  """
+
+  def __init__(self, args):
+    self.args = args
+    self.records = {}
+    self.built = {}
+
+  def load(self):
+    life_stages, domains = load_stage_files(self.args.content)
+    records = {}
+    for path in iter_source_paths(self.args.content / "projects"):
+      st = path.stat()
+      stamp = (st.st_mtime_ns, st.st_size)
+      cached = self.records.get(path)
+      records[path] = cached if cached and cached[0] == stamp else (stamp, parse_file(path))
+    self.records = records
+    return assemble(life_stages, domains, ((path, record) for path, (_, record) in records.items()))
+
+  def build(self, assets_changed=True):
+    args = self.args
+    try:
+      content = self.load()
+    except (ContentError, OSError) as e:
+      print(f"build_json: {e}", file=sys.stderr)
+      return
+    if args.validate and not check(content, args.strict):
+      return
+
+    writer = IncrementalWriter(ROOT, MANIFEST_PATH, force=args.force)
+    if args.assets and assets_changed:
+      assets = optimize_assets(collect_assets(content), ROOT, ASSET_CACHE, jobs=args.jobs, force=args.force)
+      writer.write_json(ASSET_MANIFEST, assets)
+    else:
+      assets = load_asset_manifest()
+
+    built = {}
+    index = []
+    plan = plan_outputs(content, shards=args.shards, assets=assets, languages=args.search_languages)
+    for name, (inputs, make) in plan.items():
+      previous = self.built.get(name)
+      if previous and previous[0] == inputs and writer.keep(output_path(name)):
+        built[name] = previous
+      else:
+        doc = make()
+        write_output(writer, name, doc)
+        built[name] = (inputs, doc, index_entry(doc) if name.startswith(f"{SHARD_DIR}/") else None)
+      if built[name][2] is not None:
+        index.append((built[name][1], built[name][2]))
+    if args.shards:
+      writer.write_json(DATA_DIR / SHARD_INDEX, shard_index(index))
+      writer.prune(DATA_DIR / SHARD_DIR)
+    writer.save()
+    self.built = built
+    args.force = False
+    print_summary(writer)
+
+  def run(self):
+    from watcher import batches, make_watcher
+
+    args = self.args
+    self.build()
+    roots = [args.content, PUBLIC_DIR]
+    watcher = make_watcher(roots, polling=args.poll, exclude=[PUBLIC_DIR / OUTPUT_SUBDIR, *OUTPUT_PATHS.values()])
+    print(f"Watching {', '.join(str(r) for r in roots)} ({type(watcher).__name__}); Ctrl+C to stop.")
+    try:
+      for changed in batches(watcher, debounce=args.debounce):
+        started = time.perf_counter()
+        for path in sorted(changed)[:10]:
+          print(f"  changed   {path.relative_to(ROOT) if path.is_relative_to(ROOT) else path}")
+        if len(changed) > 10:
+          print(f"  ... and {len(changed) - 10} more")
+        self.build(assets_changed=any(p.is_relative_to(PUBLIC_DIR) for p in changed))
+        print(f"Rebuilt in {(time.perf_counter() - started) * 1000:.0f} ms.")
+    except KeyboardInterrupt:
+      pass
+    finally:
+      watcher.close()
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Generate the kiosk content JSON under src/data.")
+  parser.add_argument("--force", action="store_true",
+                      help="rewrite every output even if its content hash is unchanged")
+  parser.add_argument("--content", type=pathlib.Path, default=CONTENT_DIR,
+                      help="content source directory (default: %(default)s)")
+  parser.add_argument("--jobs", type=int, default=None,
+                      help="worker processes for parsing large content trees (default: CPU count, 1 = inline)")
+  parser.add_argument("--no-shards", dest="shards", action="store_false",
+                      help="skip the per stage/domain shards under src/data/shards")
+  parser.add_argument("--assets", action="store_true",
+                      help="run the asset optimization stage (scripts/optimize_assets.py) first")
+  parser.add_argument("--strict", action="store_true",
+                      help="fail the build on validation warnings too")
+  parser.add_argument("--no-validate", dest="validate", action="store_false",
+                      help="skip the schema / reference checks (scripts/validate_content.py)")
+  parser.add_argument("--search-languages", type=lambda s: tuple(s.split(",")), default=DEFAULT_LANGUAGES,
+                      help="comma-separated stemming / stop word rules for the search index (default: en)")
+  parser.add_argument("--profile", type=pathlib.Path, nargs="?", const=REPORT_PATH, default=None,
+                      help=f"print phase timings and output sizes and write them as JSON (default path: {REPORT_PATH})")
+  parser.add_argument("--budgets", type=pathlib.Path, default=BUDGETS_PATH,
+                      help="size budgets that fail the build when exceeded; the default file is optional, "
+                           "an explicit one must exist (default: %(default)s)")
+  parser.add_argument("--no-budgets", dest="budgets", action="store_const", const=None,
+                      help="skip the size budget check")
+  parser.add_argument("--watch", action="store_true",
+                      help="keep running and rebuild affected outputs when content/ or public/ change")
+  parser.add_argument("--poll", action="store_true",
+                      help="with --watch: poll for changes instead of using inotify")
+  parser.add_argument("--debounce", type=float, default=0.2,
+                      help="with --watch: seconds of quiet before rebuilding (default: %(default)s)")
+  args = parser.parse_args(argv)
+  try:
+    language_rules(args.search_languages)
+  except ValueError as e:
+    parser.error(str(e))
+
+  if args.watch:
+    WatchSession(args).run()
+    return
+
+  try:
+    # argparse leaves the default object as is, so identity tells an explicit --budgets apart
+    budgets = load_budgets(args.budgets, required=args.budgets is not BUDGETS_PATH) if args.budgets else None
+  except BudgetError as e:
+    sys.exit(f"build_json: {e}")
+
+  profiler = Profiler()
+  try:
+    with profiler.phase("load"):
+      content = load_content(args.content, jobs=args.jobs)
+  except ContentError as e:
+    sys.exit(f"build_json: {e}")
+
+  if args.validate:
+    with profiler.phase("validate"):
+      ok = check(content, args.strict)
+    if not ok:
+      sys.exit(1)
+
+  writer = IncrementalWriter(ROOT, MANIFEST_PATH, force=args.force)
+  with profiler.phase("assets"):
+    if args.assets:
+      assets = optimize_assets(collect_assets(content), ROOT, ASSET_CACHE, jobs=args.jobs, force=args.force)
+      writer.write_json(ASSET_MANIFEST, assets)
+    else:
+      assets = load_asset_manifest()
+
+  with profiler.phase("render"):
+    docs = outputs(content, shards=args.shards, assets=assets, languages=args.search_languages)
+  with profiler.phase("write"):
+    for name, doc in docs.items():
+      write_output(writer, name, doc)
+    if args.shards:
+      writer.prune(DATA_DIR / SHARD_DIR)
+    writer.save()
+  print_summary(writer)
+
+  if args.profile is None and budgets is None:
+    return
+  report = build_report(ROOT, writer.written + writer.unchanged, content, PUBLIC_DIR, profiler,
+                        assets=assets, precache=docs[PRECACHE_MANIFEST])
+  violations = check_budgets(report, budgets) if budgets else []
+  report["budgets"] = {"file": str(args.budgets) if budgets else None, "violations": violations}
+  if args.profile is not None:
+    print_report(report)
+    atomic_write(args.profile, json.dumps(report, indent=2, sort_keys=True).encode("utf-8") + b"\n")
+    print(f"Wrote build profile to {args.profile}.")
+  if violations:
+    print_violations(violations)
+    sys.exit(f"build_json: {len(violations)} size budget(s) exceeded ({args.budgets})")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,271 @@
+"""Profiling report and size budgets for ``build_json.py``.
+
+``build_json.py --profile`` writes a JSON report of one build:
+
+- ``phases``: wall time per build phase (load, validate, assets, render,
+  write) in ms;
+- ``outputs``: every generated file (shards included) with its ``raw``,
+  ``gzip`` and ``brotli`` size in bytes, plus ``totals``. Brotli needs the
+  ``brotli`` package and is ``null`` without it;
+- ``projects``: per project, the bytes of its text (title, authors,
+  introduction, conclusion and its questions) and of the assets it renders
+  (image or its optimized variants, QR codes);
+- ``precache``: file count and bytes the service worker downloads;
+- ``budgets``: the limits checked and any ``violations``.
+
+Keys are sorted, so reports of two commits diff cleanly;
+``python scripts/build_report.py diff OLD NEW`` prints what grew or shrank.
+
+Budgets live in ``build-budgets.json`` at the repo root (``--budgets`` for
+another file, which must then exist) and are checked on every build; an
+unknown section or metric is an error rather than a silently unchecked limit. When any is exceeded, the
+build exits 1. Brotli limits are skipped when ``brotli`` is not installed::
+
+  {
+    "outputs": {"src/data/shards/*/*.json": {"gzip": 20000}, ...},  fnmatch on the path
+    "total": {"gzip": 400000},                                        all outputs together
+    "project": {"text": 16000, "assets": 2000000},                    each project
+    "precache": {"bytes": 25000000}
+  }
+"""
+import argparse
+import contextlib
+import fnmatch
+import gzip
+import json
+import pathlib
+import subprocess
+import sys
+import time
+
+from normalize import attach_assets, normalize_project
+from precache import project_urls
+
+REPORT_VERSION = 1
+METRICS = ("raw", "gzip", "brotli")
+# Metrics each budgets section may limit
+BUDGET_METRICS = {"outputs": METRICS, "total": METRICS, "project": ("text", "assets"), "precache": ("bytes",)}
+GZIP_LEVEL = 9
+
+
+class BudgetError(ValueError):
+  """The budgets file is unreadable or malformed."""
+
+
+def _brotli():
+  try:
+    import brotli
+  except ImportError:
+    return None
+  return brotli
+
+
+class Profiler:
+  """Collects wall time per named phase."""
+
+  def __init__(self):
+    self.phases = {}
+
+  @contextlib.contextmanager
+  def phase(self, name):
+    started = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+
+def sizes(data, brotli=None):
+  """``{"raw", "gzip", "brotli"}`` byte counts of ``data``."""
+  return {
+    "raw": len(data),
+    "gzip": len(gzip.compress(data, GZIP_LEVEL, mtime=0)),
+    "brotli": len(brotli.compress(data)) if brotli else None,
+  }
+
+
+def project_weights(content, public_dir, assets=None):
+  """``{project_id: {"stage", "domain", "text", "assets", "missing"}}`` in content order."""
+  questions = {}
+  for qid, project_id in content["question_projects"].items():
+    if qid in content["questions"]:
+      questions.setdefault(project_id, {})[qid] = content["questions"][qid]
+  out = {}
+  for stage_id, stage_entry in content["blurbs"].items():
+    for domain_id, entry in (stage_entry.get("domains") or {}).items():
+      for idx, raw in enumerate(entry.get("projects") or []):
+        project = normalize_project(raw, stage_id, domain_id, idx)
+        text = "".join(str(project.get(f) or "") for f in ("title", "author", "introduction", "conclusion"))
+        text_bytes = len(text.encode("utf-8"))
+        if project["id"] in questions:
+          text_bytes += len(json.dumps(questions[project["id"]], ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        asset_bytes = 0
+        missing = []
+        for url in project_urls(attach_assets(project, assets or {})):
+          try:
+            asset_bytes += (public_dir / url.lstrip("/")).stat().st_size
+          except FileNotFoundError:
+            missing.append(url)
+        out[project["id"]] = {"stage": stage_id, "domain": domain_id, "text": text_bytes,
+                              "assets": asset_bytes, "missing": missing}
+  return out
+
+
+def _check_limits(path, where, limits, metrics):
+  if not isinstance(limits, dict):
+    raise BudgetError(f"{path}: {where}: expected an object of limits")
+  for metric, limit in limits.items():
+    if metric not in metrics:
+      raise BudgetError(f"{path}: {where}: unknown metric '{metric}' (expected {', '.join(metrics)})")
+    if isinstance(limit, bool) or not isinstance(limit, (int, float)) or limit < 0:
+      raise BudgetError(f"{path}: {where}.{metric}: expected a number of bytes, got {limit!r}")
+
+
+def load_budgets(path, required=True):
+  """The budgets document; None when ``path`` does not exist and is not ``required``."""
+  try:
+    budgets = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+  except FileNotFoundError:
+    if required:
+      raise BudgetError(f"{path}: no such file") from None
+    return None
+  except (OSError, ValueError) as e:
+    raise BudgetError(f"{path}: {e}") from None
+  if not isinstance(budgets, dict):
+    raise BudgetError(f"{path}: expected an object")
+  for section, value in budgets.items():
+    if section not in BUDGET_METRICS:
+      raise BudgetError(f"{path}: unknown section '{section}' (expected {', '.join(BUDGET_METRICS)})")
+    if section != "outputs":
+      _check_limits(path, section, value, BUDGET_METRICS[section])
+    elif not isinstance(value, dict):
+      raise BudgetError(f"{path}: outputs: expected an object of path patterns")
+    else:
+      for pattern, limits in value.items():
+        _check_limits(path, f"outputs['{pattern}']", limits, METRICS)
+  return budgets
+
+
+def check_budgets(report, budgets):
+  """``[{"target", "metric", "limit", "actual"}]`` for every limit ``report`` exceeds."""
+  violations = []
+
+  def over(target, metric, limit, actual):
+    if actual is not None and actual > limit:
+      violations.append({"target": target, "metric": metric, "limit": limit, "actual": actual})
+
+  for pattern, limits in (budgets.get("outputs") or {}).items():
+    for key, measured in report["outputs"].items():
+      if fnmatch.fnmatchcase(key, pattern):
+        for metric, limit in limits.items():
+          over(key, metric, limit, measured.get(metric))
+  for metric, limit in (budgets.get("total") or {}).items():
+    over("total", metric, limit, report["totals"].get(metric))
+  for metric, limit in (budgets.get("project") or {}).items():
+    for project_id, weights in report["projects"].items():
+      over(f"project {project_id}", metric, limit, weights.get(metric))
+  for metric, limit in (budgets.get("precache") or {}).items():
+    over("precache", metric, limit, report["precache"].get(metric))
+  return violations
+
+
+def _commit(root):
+  try:
+    out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True, text=True, timeout=5)
+  except (OSError, subprocess.SubprocessError):
+    return None
+  return out.stdout.strip() or None
+
+
+def build_report(root, output_keys, content, public_dir, profiler, assets=None, precache=None):
+  """The report for a finished build; ``output_keys`` are paths relative to ``root``."""
+  brotli = _brotli()
+  outputs = {key: sizes((root / key).read_bytes(), brotli) for key in sorted(output_keys)}
+  totals = {m: sum(o[m] for o in outputs.values()) if brotli or m != "brotli" else None for m in METRICS}
+  precache = precache or {"assets": []}
+  return {
+    "version": REPORT_VERSION,
+    "commit": _commit(root),
+    "brotli": brotli is not None,
+    "phases": {name: round(ms, 1) for name, ms in profiler.phases.items()},
+    "totalMs": round(sum(profiler.phases.values()), 1),
+    "outputs": outputs,
+    "totals": totals,
+    "projects": project_weights(content, public_dir, assets),
+    "precache": {"files": len(precache["assets"]), "bytes": sum(a["bytes"] for a in precache["assets"])},
+  }
+
+
+def _kb(n):
+  return "-" if n is None else f"{n / 1024:,.1f}"
+
+
+def print_report(report, limit=10, out=sys.stdout):
+  phases = "  ".join(f"{name} {ms:,.0f}" for name, ms in report["phases"].items())
+  print(f"Build profile: {report['totalMs']:,.0f} ms ({phases} ms)", file=out)
+  print(f"  {'output':<48} {'raw KB':>9} {'gzip KB':>9} {'br KB':>9}", file=out)
+  largest = sorted(report["outputs"].items(), key=lambda item: -item[1]["gzip"])
+  for key, s in largest[:limit]:
+    print(f"  {key:<48} {_kb(s['raw']):>9} {_kb(s['gzip']):>9} {_kb(s['brotli']):>9}", file=out)
+  if len(largest) > limit:
+    print(f"  ... and {len(largest) - limit} more", file=out)
+  t = report["totals"]
+  print(f"  {'total (' + str(len(largest)) + ' files)':<48} {_kb(t['raw']):>9} {_kb(t['gzip']):>9} {_kb(t['brotli']):>9}", file=out)
+  heaviest = sorted(report["projects"].items(), key=lambda item: -(item[1]["assets"] + item[1]["text"]))
+  print(f"  {'project':<48} {'text KB':>9} {'asset KB':>9}", file=out)
+  for project_id, w in heaviest[:limit]:
+    print(f"  {project_id:<48} {_kb(w['text']):>9} {_kb(w['assets']):>9}", file=out)
+  p = report["precache"]
+  print(f"  precache: {p['files']} files, {p['bytes'] / 1e6:.1f} MB", file=out)
+
+
+def print_violations(violations, out=sys.stderr):
+  for v in violations:
+    print(f"  budget    {v['target']}: {v['metric']} {v['actual']:,} B > {v['limit']:,} B", file=out)
+
+
+def diff(old, new, out=sys.stdout):
+  """Print outputs, totals and projects whose sizes changed between two reports."""
+  rows = []
+  for key in sorted(set(old["outputs"]) | set(new["outputs"])):
+    a, b = old["outputs"].get(key, {}), new["outputs"].get(key, {})
+    if a.get("gzip") != b.get("gzip") or a.get("raw") != b.get("raw"):
+      rows.append((key, a.get("raw"), b.get("raw"), a.get("gzip"), b.get("gzip")))
+  rows.append(("total", old["totals"]["raw"], new["totals"]["raw"], old["totals"]["gzip"], new["totals"]["gzip"]))
+  print(f"{old.get('commit') or 'old'} -> {new.get('commit') or 'new'}", file=out)
+  print(f"  {'output':<48} {'raw':>12} {'gzip':>12}", file=out)
+
+  def delta(a, b):
+    if a is None:
+      return "new"
+    if b is None:
+      return "removed"
+    return f"{b - a:+,}"
+
+  for key, raw_a, raw_b, gz_a, gz_b in rows:
+    print(f"  {key:<48} {delta(raw_a, raw_b):>12} {delta(gz_a, gz_b):>12}", file=out)
+  for project_id in sorted(set(old["projects"]) | set(new["projects"])):
+    a, b = old["projects"].get(project_id), new["projects"].get(project_id)
+    if a is None or b is None or (a["text"], a["assets"]) != (b["text"], b["assets"]):
+      text = delta(a and a["text"], b and b["text"])
+      asset = delta(a and a["assets"], b and b["assets"])
+      print(f"  project {project_id:<40} text {text:>10}  assets {asset:>12}", file=out)
+  print(f"  time {old['totalMs']:,.0f} -> {new['totalMs']:,.0f} ms", file=out)
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Compare two build_json.py --profile reports.")
+  sub = parser.add_subparsers(dest="command", required=True)
+  cmd = sub.add_parser("diff", help="print the size changes between two reports")
+  cmd.add_argument("old", type=pathlib.Path)
+  cmd.add_argument("new", type=pathlib.Path)
+  args = parser.parse_args(argv)
+  try:
+    old, new = (json.loads(p.read_text(encoding="utf-8")) for p in (args.old, args.new))
+  except (OSError, ValueError) as e:
+    sys.exit(f"build_report: {e}")
+  diff(old, new)
+
+
+if __name__ == "__main__":
+  main()
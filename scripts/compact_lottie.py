@@ -0,0 +1,296 @@
+"""Compact Lottie animation JSON for the kiosk.
+
+Lossless by default (the rendered animation is unchanged):
+
+- minified output, editor ``meta`` block dropped, integral floats written as ints;
+- unused assets removed (nothing references their ``refId``);
+- identical assets deduplicated, e.g. a precomp exported twice, with
+  ``refId`` rewritten to the surviving copy;
+- layers that can never render removed: hidden (``hd``) layers that are not a
+  parent or matte source, and layers whose in/out range lies outside every
+  time window their composition is shown in;
+- hidden shape items removed.
+
+Opt-in lossy passes: ``--precision N`` rounds floats to N decimals and
+``--strip-names`` drops ``nm``/``mn``/``ln`` (breaks expressions or code that
+looks layers up by name).
+
+Prints a size / parse-time report per file (``--report`` writes it as JSON).
+Parse time is measured with ``json.loads`` as a proxy for the main-thread
+``JSON.parse`` the player does when the attract loop starts.
+
+Usage::
+
+  python scripts/compact_lottie.py src/assets/animations/*.json public/animations/*.json --in-place
+  python scripts/compact_lottie.py --check public/animations/*.json   # build step: exit 1 if not compacted
+"""
+import argparse
+import copy
+import gzip
+import json
+import pathlib
+import statistics
+import sys
+import time
+
+from incremental import atomic_write
+
+NAME_KEYS = ("nm", "mn", "ln")
+PARSE_RUNS = 15
+
+
+class LottieError(ValueError):
+  """The input is not a Lottie animation."""
+
+
+# --- passes ---
+
+def _walk_layers(doc):
+  """Yield every layer list: the root one and each precomp asset's."""
+  yield None, doc.get("layers", [])
+  for asset in doc.get("assets", []):
+    if "layers" in asset:
+      yield asset["id"], asset["layers"]
+
+
+def dedupe_assets(doc):
+  """Merge byte-identical assets (ignoring their id) and rewrite ``refId``."""
+  seen = {}
+  alias = {}
+  kept = []
+  for asset in doc.get("assets", []):
+    body = json.dumps({k: v for k, v in asset.items() if k != "id"}, sort_keys=True)
+    if body in seen:
+      alias[asset["id"]] = seen[body]
+      continue
+    seen[body] = asset["id"]
+    kept.append(asset)
+  if alias:
+    doc["assets"] = kept
+    for _, layers in _walk_layers(doc):
+      for layer in layers:
+        if layer.get("refId") in alias:
+          layer["refId"] = alias[layer["refId"]]
+  return len(alias)
+
+
+def _layer_windows(doc):
+  """Map composition id (None = root) to the time windows it is shown in.
+
+  A window is ``(start, end)`` in that composition's own frame time. A
+  composition reached through a time-remapped (``tm``) layer maps to None,
+  which disables pruning inside it.
+  """
+  comps = dict(_walk_layers(doc))
+  referrers = {}
+  for comp_id, layers in comps.items():
+    for layer in layers:
+      if layer.get("ty") == 0 and layer.get("refId") in comps:
+        referrers.setdefault(layer["refId"], []).append((comp_id, layer))
+  memo = {None: [(doc.get("ip", 0), doc.get("op", 0))]}
+
+  def windows(comp_id, stack=()):
+    if comp_id in memo:
+      return memo[comp_id]
+    if comp_id in stack:
+      return None
+    result = []
+    for parent_id, layer in referrers.get(comp_id, []):
+      parent_windows = windows(parent_id, stack + (comp_id,))
+      if parent_windows is None or "tm" in layer:
+        result = None
+        break
+      sr = layer.get("sr", 1) or 1
+      st = layer.get("st", 0)
+      for start, end in parent_windows:
+        lo, hi = max(start, layer.get("ip", start)), min(end, layer.get("op", end))
+        if lo < hi:
+          result.append(((lo - st) / sr, (hi - st) / sr))
+    memo[comp_id] = result
+    return result
+
+  return {comp_id: windows(comp_id) for comp_id in comps}
+
+
+def prune_layers(doc):
+  """Drop layers that can never be drawn. Returns the number removed."""
+  windows = _layer_windows(doc)
+  removed = 0
+  for comp_id, layers in _walk_layers(doc):
+    referenced = {layer[key] for layer in layers for key in ("parent", "tp") if key in layer}
+    comp_windows = windows.get(comp_id, [])
+    keep = []
+    for i, layer in enumerate(layers):
+      # Parents and matte sources shape other layers even when not drawn themselves
+      if layer.get("ind") in referenced or layer.get("td") or (i + 1 < len(layers) and layers[i + 1].get("tt")):
+        keep.append(layer)
+        continue
+      if comp_windows is None:
+        visible = True
+      else:
+        ip, op = layer.get("ip", float("-inf")), layer.get("op", float("inf"))
+        visible = any(ip < end and op > start for start, end in comp_windows)
+      if visible and layer.get("hd") is not True:
+        keep.append(layer)
+      else:
+        removed += 1
+    layers[:] = keep
+  return removed
+
+
+def prune_assets(doc):
+  """Drop assets no remaining layer points at (precomps are followed transitively)."""
+  assets = {a["id"]: a for a in doc.get("assets", [])}
+  used = set()
+  pending = [layer.get("refId") for layer in doc.get("layers", [])]
+  while pending:
+    ref = pending.pop()
+    if ref in used or ref not in assets:
+      continue
+    used.add(ref)
+    pending.extend(layer.get("refId") for layer in assets[ref].get("layers", []))
+  before = len(assets)
+  if "assets" in doc:
+    doc["assets"] = [a for a in doc["assets"] if a["id"] in used]
+  return before - len(used)
+
+
+def _prune_hidden_shapes(shapes):
+  removed = 0
+  keep = []
+  for shape in shapes:
+    if shape.get("hd") is True:
+      removed += 1
+      continue
+    if shape.get("ty") == "gr" and "it" in shape:
+      removed += _prune_hidden_shapes(shape["it"])
+    keep.append(shape)
+  shapes[:] = keep
+  return removed
+
+
+def prune_hidden_shapes(doc):
+  return sum(
+    _prune_hidden_shapes(layer["shapes"])
+    for _, layers in _walk_layers(doc)
+    for layer in layers
+    if "shapes" in layer
+  )
+
+
+def _numbers(value, precision):
+  if isinstance(value, float):
+    if precision is not None:
+      value = round(value, precision)
+    return int(value) if value.is_integer() else value
+  if isinstance(value, list):
+    return [_numbers(v, precision) for v in value]
+  if isinstance(value, dict):
+    return {k: _numbers(v, precision) for k, v in value.items()}
+  return value
+
+
+def _strip_names(value):
+  if isinstance(value, list):
+    return [_strip_names(v) for v in value]
+  if isinstance(value, dict):
+    return {k: _strip_names(v) for k, v in value.items() if k not in NAME_KEYS}
+  return value
+
+
+def compact(doc, precision=None, strip_names=False):
+  """Return ``(compacted_doc, stats)``; ``doc`` is left untouched."""
+  if not isinstance(doc, dict) or "layers" not in doc:
+    raise LottieError("not a Lottie animation (no 'layers')")
+  doc = copy.deepcopy(doc)
+  doc.pop("meta", None)
+  stats = {
+    "dedupedAssets": dedupe_assets(doc),
+    "removedLayers": prune_layers(doc),
+    "removedAssets": prune_assets(doc),
+    "removedShapes": prune_hidden_shapes(doc),
+  }
+  doc = _numbers(doc, precision)
+  if strip_names:
+    doc = _strip_names(doc)
+  return doc, stats
+
+
+def serialize(doc):
+  return json.dumps(doc, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+# --- report ---
+
+def parse_ms(data):
+  """Median ``json.loads`` time in milliseconds."""
+  text = data.decode("utf-8")
+  runs = []
+  for _ in range(PARSE_RUNS):
+    start = time.perf_counter()
+    json.loads(text)
+    runs.append((time.perf_counter() - start) * 1000)
+  return round(statistics.median(runs), 3)
+
+
+def measure(data):
+  return {"bytes": len(data), "gzipBytes": len(gzip.compress(data, 9)), "parseMs": parse_ms(data)}
+
+
+def compact_file(path, precision=None, strip_names=False):
+  """Compact one file. Returns ``(new_bytes, report_entry)``; new_bytes is None if skipped."""
+  raw = path.read_bytes()
+  try:
+    doc = json.loads(raw)
+    new_doc, stats = compact(doc, precision=precision, strip_names=strip_names)
+  except (ValueError, LottieError) as e:
+    return None, {"file": str(path), "skipped": str(e)}
+  data = serialize(new_doc)
+  return data, {"file": str(path), "before": measure(raw), "after": measure(data), **stats}
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Losslessly compact Lottie JSON animations.")
+  parser.add_argument("files", nargs="+", type=pathlib.Path)
+  group = parser.add_mutually_exclusive_group()
+  group.add_argument("--in-place", action="store_true", help="overwrite the inputs (only when smaller)")
+  group.add_argument("-o", "--out-dir", type=pathlib.Path, help="write compacted copies here")
+  group.add_argument("--check", action="store_true", help="exit 1 if any file is not already compacted")
+  parser.add_argument("--precision", type=int, default=None, help="lossy: round floats to N decimals")
+  parser.add_argument("--strip-names", action="store_true", help="lossy: drop nm/mn/ln name fields")
+  parser.add_argument("--report", type=pathlib.Path, help="write the report as JSON")
+  args = parser.parse_args(argv)
+
+  report = []
+  stale = []
+  for path in args.files:
+    data, entry = compact_file(path, precision=args.precision, strip_names=args.strip_names)
+    report.append(entry)
+    if data is None:
+      print(f"{path}: skipped ({entry['skipped']})")
+      continue
+    before, after = entry["before"], entry["after"]
+    print(
+      f"{path}: {before['bytes']:,} -> {after['bytes']:,} B "
+      f"(gzip {before['gzipBytes']:,} -> {after['gzipBytes']:,}), "
+      f"parse {before['parseMs']} -> {after['parseMs']} ms, "
+      f"-{entry['removedLayers']} layers, -{entry['removedAssets']} assets, "
+      f"{entry['dedupedAssets']} deduped, -{entry['removedShapes']} hidden shapes"
+    )
+    if after["bytes"] >= before["bytes"]:
+      continue
+    if args.check:
+      stale.append(path)
+    elif args.in_place:
+      atomic_write(path, data)
+    elif args.out_dir:
+      atomic_write(args.out_dir / path.name, data)
+
+  if args.report:
+    atomic_write(args.report, json.dumps(report, indent=2).encode("utf-8"))
+  if stale:
+    sys.exit(f"{len(stale)} animation(s) not compacted; run scripts/compact_lottie.py --in-place")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,192 @@
+"""Streaming loader for the kiosk content sources under ``content/``.
+
+Layout::
+
+  content/
+    life_stages.json       ordered list of stages (id, title, icon, domains, color)
+    domains.json           ordered list of domains (id, label, color, icon)
+    projects/**/<id>.json  one file per project (also .yaml/.yml/.md)
+
+A project file holds the project record exactly as it appears in
+``blurbs.json`` plus three routing keys that are stripped on output:
+``stage``, ``domain`` and ``order`` (sort key within the domain). Its quiz
+questions live under ``questions`` as ``{question_id: {question, choices,
+answer}}``.
+
+Markdown sources carry the record as front matter (YAML, or JSON when the
+block starts with ``{``); ``## Introduction`` / ``## Conclusion`` sections in
+the body fill the matching fields. YAML needs PyYAML, which is only imported
+when such a file is actually found.
+"""
+import json
+import os
+import pathlib
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+SOURCE_SUFFIXES = (".json", ".yaml", ".yml", ".md")
+ROUTING_KEYS = ("stage", "domain", "order", "questions")
+
+# Below this many files the process pool costs more than it saves.
+PARALLEL_THRESHOLD = 64
+
+_FRONT_MATTER_RE = re.compile(r"\A---[ \t]*\n(.*?)\n---[ \t]*(?:\n|\Z)(.*)\Z", re.DOTALL)
+_SECTION_RE = re.compile(r"^##\s+(\w+)\s*$", re.MULTILINE)
+
+
+class ContentError(ValueError):
+  """A content source file is missing, malformed or inconsistent."""
+
+
+def _load_yaml(text, path):
+  try:
+    import yaml
+  except ImportError:
+    raise ContentError(f"{path}: PyYAML is required to read YAML content (pip install pyyaml)") from None
+  try:
+    return yaml.safe_load(text)
+  except yaml.YAMLError as e:
+    raise ContentError(f"{path}: {e}") from None
+
+
+def _parse_front_matter(text, path):
+  match = _FRONT_MATTER_RE.match(text)
+  if not match:
+    raise ContentError(f"{path}: Markdown sources must start with a '---' front matter block")
+  header, body = match.group(1).strip(), match.group(2)
+  record = json.loads(header) if header.startswith("{") else _load_yaml(header, path)
+  if not isinstance(record, dict):
+    raise ContentError(f"{path}: front matter must be a mapping")
+  parts = _SECTION_RE.split(body)
+  for name, section in zip(parts[1::2], parts[2::2]):
+    record[name.lower()] = section.strip()
+  return record
+
+
+def parse_file(path, expect=dict):
+  """Parse one source file into a plain dict (or ``expect``). Runs inside pool workers."""
+  path = pathlib.Path(path)
+  try:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+      record = json.loads(text)
+    elif path.suffix in (".yaml", ".yml"):
+      record = _load_yaml(text, path)
+    else:
+      record = _parse_front_matter(text, path)
+  except ValueError as e:
+    if isinstance(e, ContentError):
+      raise
+    raise ContentError(f"{path}: {e}") from None
+  if not isinstance(record, expect):
+    raise ContentError(f"{path}: expected {'an object' if expect is dict else 'a list'}")
+  return record
+
+
+def iter_source_paths(directory):
+  """Yield project source paths under ``directory`` in a stable order, lazily per directory."""
+  try:
+    entries = sorted(os.scandir(directory), key=lambda e: e.name)
+  except FileNotFoundError:
+    return
+  for entry in entries:
+    if entry.name.startswith((".", "_")):
+      continue
+    if entry.is_dir():
+      yield from iter_source_paths(entry.path)
+    elif entry.name.endswith(SOURCE_SUFFIXES):
+      yield pathlib.Path(entry.path)
+
+
+def iter_projects(directory, jobs=None):
+  """Yield ``(path, record)`` for every project source, in path order.
+
+  Small trees are parsed inline; once there are ``PARALLEL_THRESHOLD`` files
+  or more they are parsed across a process pool (``jobs`` workers, default
+  ``os.cpu_count()``). ``jobs=1`` forces inline parsing.
+  """
+  paths = list(iter_source_paths(directory))
+  if jobs == 1 or len(paths) < PARALLEL_THRESHOLD:
+    for path in paths:
+      yield path, parse_file(path)
+    return
+  chunksize = max(1, len(paths) // ((jobs or os.cpu_count() or 1) * 4))
+  with ProcessPoolExecutor(max_workers=jobs) as pool:
+    yield from zip(paths, pool.map(parse_file, paths, chunksize=chunksize))
+
+
+def _project_output(record):
+  return {k: v for k, v in record.items() if k not in ROUTING_KEYS}
+
+
+def load_stage_files(content_dir):
+  """Return ``(life_stages, domains)`` parsed from ``content_dir``."""
+  content_dir = pathlib.Path(content_dir)
+  try:
+    return parse_file(content_dir / "life_stages.json", list), parse_file(content_dir / "domains.json", list)
+  except FileNotFoundError as e:
+    raise ContentError(f"missing content file: {e.filename}") from None
+
+
+def load_content(content_dir, jobs=None):
+  """Load all sources and assemble the four documents written to ``src/data``.
+
+  Returns a dict with ``life_stages``, ``blurbs``, ``questions`` and
+  ``domains`` in the exact shapes the app imports, plus
+  ``question_projects`` (question id -> id of the project that owns it).
+  """
+  content_dir = pathlib.Path(content_dir)
+  life_stages, domains = load_stage_files(content_dir)
+  return assemble(life_stages, domains, iter_projects(content_dir / "projects", jobs=jobs))
+
+
+def assemble(life_stages, domains, projects):
+  """Build the ``load_content`` result from parsed stage/domain lists and ``(path, record)`` pairs."""
+  grouped = {}
+  seen = {}
+  for path, record in projects:
+    for key in ("id", "stage", "domain"):
+      if not record.get(key):
+        raise ContentError(f"{path}: project is missing '{key}'")
+    if record["id"] in seen:
+      raise ContentError(f"{path}: duplicate project id '{record['id']}' (also in {seen[record['id']]})")
+    seen[record["id"]] = path
+    grouped.setdefault((record["stage"], record["domain"]), []).append(record)
+
+  blurbs = {}
+  questions = {}
+  question_projects = {}
+  for stage in life_stages:
+    stage_domains = {}
+    for domain_id in stage["domains"]:
+      records = grouped.pop((stage["id"], domain_id), None)
+      if not records:
+        continue
+      records.sort(key=lambda r: r.get("order", 0))
+      question_ids = []
+      for record in records:
+        for qid, question in (record.get("questions") or {}).items():
+          if qid in questions:
+            raise ContentError(f"{seen[record['id']]}: duplicate question id '{qid}'")
+          questions[qid] = question
+          question_projects[qid] = record["id"]
+          question_ids.append(qid)
+      stage_domains[domain_id] = {
+        "projects": [_project_output(r) for r in records],
+        "questions": question_ids,
+      }
+    if stage_domains:
+      blurbs[stage["id"]] = {"stage": stage["id"], "domains": stage_domains}
+
+  for (stage_id, domain_id), records in grouped.items():
+    raise ContentError(
+      f"{seen[records[0]['id']]}: stage '{stage_id}' has no domain '{domain_id}' in life_stages.json"
+    )
+
+  return {
+    "life_stages": life_stages,
+    "blurbs": blurbs,
+    "questions": questions,
+    "domains": domains,
+    "question_projects": question_projects,
+  }
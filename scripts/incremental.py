@@ -0,0 +1,184 @@
+"""Content-hashed, atomic output writer for the build scripts.
+
+Every generated document is serialized to bytes, hashed, and compared with
+the hash recorded in a small build manifest. A file is only rewritten when
+its bytes actually changed, so Vite sees no mtime churn (no HMR reload, no
+chunk hash bust) for documents that did not change.
+"""
+import hashlib
+import json
+import os
+import pathlib
+import stat
+import tempfile
+
+MANIFEST_VERSION = 1
+
+
+def sha256(data):
+  return hashlib.sha256(data).hexdigest()
+
+
+def dump_json(doc, indent=2):
+  """Serialize exactly like the historical ``json.dump(..., indent=2)`` calls."""
+  return json.dumps(doc, indent=indent, ensure_ascii=False).encode("utf-8")
+
+
+def _umask():
+  mask = os.umask(0)
+  os.umask(mask)
+  return mask
+
+
+# Mode of a file created by open(); os.umask can only be read by setting it
+FILE_MODE = 0o666 & ~_umask()
+
+
+def atomic_write(path, data):
+  """Write ``data`` to ``path`` via a sibling temp file and ``os.replace``.
+
+  ``mkstemp`` creates the temp file as 0600; it gets ``FILE_MODE`` instead,
+  what a plain ``open()`` would give, so outputs stay readable by the web
+  server and the kiosk user.
+  """
+  path = pathlib.Path(path)
+  path.parent.mkdir(parents=True, exist_ok=True)
+  fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+  try:
+    with os.fdopen(fd, "wb") as fh:
+      os.fchmod(fh.fileno(), FILE_MODE)
+      fh.write(data)
+      fh.flush()
+      os.fsync(fh.fileno())
+    os.replace(tmp, path)
+  except BaseException:
+    try:
+      os.unlink(tmp)
+    except FileNotFoundError:
+      pass
+    raise
+
+
+class IncrementalWriter:
+  """Writes build outputs only when their content hash changes.
+
+  The manifest maps each output (relative to ``root``) to its sha256, size
+  and mtime. When the on-disk size/mtime still match the manifest, the file
+  is trusted without being read back, which keeps no-op rebuilds to a
+  handful of ``stat`` calls. Pass ``force=True`` to rewrite everything.
+  """
+
+  def __init__(self, root, manifest_path, force=False):
+    self.root = pathlib.Path(root)
+    self.manifest_path = pathlib.Path(manifest_path)
+    self.force = force
+    self.entries = self._load_manifest()
+    self.written = []
+    self.unchanged = []
+    self.removed = []
+
+  def _load_manifest(self):
+    try:
+      data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+      return {}
+    if data.get("version") != MANIFEST_VERSION:
+      return {}
+    return data.get("files", {})
+
+  def _key(self, path):
+    path = pathlib.Path(path)
+    if not path.is_absolute():
+      path = self.root / path
+    return path.relative_to(self.root).as_posix()
+
+  def _is_current(self, path, digest, size):
+    entry = self.entries.get(self._key(path))
+    try:
+      st = path.stat()
+    except FileNotFoundError:
+      return False
+    # Also rewrite outputs left owner-only (0600) by older builds
+    if st.st_size != size or stat.S_IMODE(st.st_mode) != FILE_MODE:
+      return False
+    if entry and entry["sha256"] == digest and entry["mtime_ns"] == st.st_mtime_ns:
+      return True
+    # Manifest is missing or stale (e.g. file touched by hand): compare bytes.
+    return sha256(path.read_bytes()) == digest
+
+  def write_bytes(self, path, data):
+    """Write ``data`` to ``path`` if it differs. Returns True when written."""
+    path = pathlib.Path(path)
+    if not path.is_absolute():
+      path = self.root / path
+    key = self._key(path)
+    digest = sha256(data)
+    changed = self.force or not self._is_current(path, digest, len(data))
+    if changed:
+      atomic_write(path, data)
+      self.written.append(key)
+    else:
+      self.unchanged.append(key)
+    self.entries[key] = {
+      "sha256": digest,
+      "size": len(data),
+      "mtime_ns": path.stat().st_mtime_ns,
+    }
+    return changed
+
+  def keep(self, path):
+    """Record ``path`` as current without serializing it again.
+
+    For callers that know the document is unchanged since this manifest was
+    written. Returns False (nothing recorded) when the file or its manifest
+    entry is gone, in which case the caller should write it.
+    """
+    path = pathlib.Path(path)
+    if not path.is_absolute():
+      path = self.root / path
+    key = self._key(path)
+    entry = self.entries.get(key)
+    try:
+      st = path.stat()
+    except FileNotFoundError:
+      return False
+    if (not entry or entry["size"] != st.st_size or entry["mtime_ns"] != st.st_mtime_ns
+        or stat.S_IMODE(st.st_mode) != FILE_MODE):
+      return False
+    self.unchanged.append(key)
+    return True
+
+  def write_json(self, path, doc, indent=2):
+    return self.write_bytes(path, dump_json(doc, indent=indent))
+
+  def prune(self, directory):
+    """Delete outputs under ``directory`` written by an earlier run but not this one.
+
+    Only files recorded in the manifest are considered, so hand-made files
+    next to generated ones are never touched.
+    """
+    prefix = self._key(directory).rstrip("/") + "/"
+    current = set(self.written) | set(self.unchanged)
+    for key in [k for k in self.entries if k.startswith(prefix) and k not in current]:
+      path = self.root / key
+      try:
+        path.unlink()
+      except FileNotFoundError:
+        pass
+      del self.entries[key]
+      self.removed.append(key)
+      parent = path.parent
+      while parent != self.root and parent.is_dir() and not any(parent.iterdir()):
+        parent.rmdir()
+        parent = parent.parent
+
+  def save(self):
+    """Persist the manifest (itself written atomically, only if changed)."""
+    payload = {"version": MANIFEST_VERSION, "files": dict(sorted(self.entries.items()))}
+    data = json.dumps(payload, indent=2).encode("utf-8")
+    try:
+      if self.manifest_path.read_bytes() == data:
+        return
+    except FileNotFoundError:
+      pass
+    atomic_write(self.manifest_path, data)
@@ -0,0 +1,100 @@
+"""Build-time normalization of the content and its lookup indexes.
+
+The client used to reshape ``blurbs.json`` on every mount (``normalizeBlurbs``
+in ``DomainScreen``) and walk it again to find question ids. Everything here
+runs once in ``build_json.py`` instead, so the app only does O(1) lookups.
+"""
+
+
+def normalize_project(project, stage_id, domain_id, idx):
+  """Mirror of the old client-side ``normalizeBlurbs`` for one project.
+
+  ``image`` may be a string or ``{src, cite}``; ``qrCode`` a string or a
+  list (kept to at most two non-empty entries); ``author`` a string or a
+  list (joined with ", "). Missing fields are omitted rather than null.
+  """
+  image = project.get("image")
+  if isinstance(image, dict):
+    image_src, image_source = image.get("src"), image.get("cite")
+  else:
+    image_src, image_source = image, None
+
+  qr = project.get("qrCode")
+  if isinstance(qr, list):
+    qr = [q for q in qr if q][:2]
+  elif isinstance(qr, str) and qr.strip():
+    qr = [qr]
+  else:
+    qr = None
+
+  author = project.get("author")
+  if isinstance(author, list):
+    author = ", ".join(author)
+
+  normalized = {
+    "id": project.get("id") or f"{stage_id}:{domain_id}:{idx}",
+    "title": project.get("title"),
+    "introduction": project.get("introduction"),
+    "conclusion": project.get("conclusion"),
+    "image": image_src,
+    "image_source": image_source,
+    "qrCode": qr,
+    "author": author,
+  }
+  return {k: v for k, v in normalized.items() if v is not None}
+
+
+def _asset_key(ref):
+  if not isinstance(ref, str) or not ref.strip():
+    return None
+  return "/" + ref.strip().lstrip("/")
+
+
+def asset_refs(project):
+  """Asset manifest keys a normalized project looks up (its image and QR codes)."""
+  keys = [_asset_key(project.get("image"))] + [_asset_key(code) for code in project.get("qrCode") or []]
+  return [key for key in keys if key]
+
+
+def attach_assets(project, assets):
+  """Merge ``optimize_assets`` results into a normalized project.
+
+  Adds ``imageWidth``/``imageHeight``, ``imagePlaceholder`` (blurred data
+  URI), ``imageSources`` (``<picture>`` sources) and ``imageVideo`` (for
+  animated GIFs), and swaps QR codes for their compacted SVGs. Fields are
+  only added when the manifest has them, so the original paths keep working.
+  """
+  record = assets.get(_asset_key(project.get("image")))
+  if record:
+    for field, key in (("imageWidth", "width"), ("imageHeight", "height"),
+                       ("imagePlaceholder", "placeholder"), ("imageSources", "sources"),
+                       ("imageVideo", "video")):
+      if record.get(key):
+        project[field] = record[key]
+  if project.get("qrCode"):
+    project["qrCode"] = [assets.get(_asset_key(code), {}).get("src", code) for code in project["qrCode"]]
+  return project
+
+
+def build_content_index(blurbs, question_projects):
+  """Precomputed lookups written to ``src/data/contentIndex.json``.
+
+  - ``stages``: stage -> domain -> ``{projects: [ids], questions: [ids]}``
+  - ``questions``: question id -> ``{stage, domain, project}``
+  - ``domainStages``: domain -> stages that have content for it, in stage order
+  """
+  stages = {}
+  located = {}
+  domain_stages = {}
+  for stage_id, stage_entry in blurbs.items():
+    for domain_id, entry in (stage_entry.get("domains") or {}).items():
+      projects = [
+        normalize_project(p, stage_id, domain_id, idx)["id"]
+        for idx, p in enumerate(entry.get("projects") or [])
+      ]
+      question_ids = list(entry.get("questions") or [])
+      stages.setdefault(stage_id, {})[domain_id] = {"projects": projects, "questions": question_ids}
+      for qid in question_ids:
+        located[qid] = {"stage": stage_id, "domain": domain_id, "project": question_projects.get(qid)}
+      domain_stages.setdefault(domain_id, []).append(stage_id)
+  return {"version": 1, "stages": stages, "questions": located, "domainStages": domain_stages}
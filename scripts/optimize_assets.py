@@ -0,0 +1,443 @@
+"""Asset optimization stage for the kiosk build.
+
+Every image, QR code and icon referenced from the content is processed once
+per source hash:
+
+- raster images (PNG/JPEG/BMP) are transcoded to WebP (and AVIF when the
+  installed Pillow supports it) at the kiosk display widths, and a tiny
+  blurred placeholder is recorded;
+- animated GIFs are converted to MP4/WebM with ffmpeg;
+- QR code SVGs exported by online generators (one ``<rect>`` per module) are
+  rebuilt from their module grid as a single-path SVG, a few KB instead
+  of 60-160 KB.
+
+Width and height are always recorded (read from the file header), so the app
+can reserve layout space before decode. Pillow and ffmpeg are optional: the
+steps that need them are skipped with a notice when they are unavailable. A
+file that fails to decode or transcode is reported and used unoptimized.
+
+Outputs go to ``public/optimized/`` and the per-asset records to
+``src/data/assetManifest.json``, which ``build_json.py`` uses to annotate the
+shards. Results are cached under ``.build-cache/assets/`` by source hash.
+
+Usage::
+
+  python scripts/optimize_assets.py [--jobs N] [--force]
+  python scripts/build_json.py --assets
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import pathlib
+import re
+import shutil
+import struct
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from incremental import atomic_write
+
+PIPELINE_VERSION = 1
+
+# Rendered widths on the kiosk (1080p landscape): card, half screen, full-screen zoom
+DISPLAY_WIDTHS = (480, 960, 1920)
+WEBP_QUALITY = 80
+AVIF_QUALITY = 55
+PLACEHOLDER_WIDTH = 16
+
+OUTPUT_SUBDIR = "optimized"
+RASTER_SUFFIXES = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+# Shipped in public/ but not referenced from content/
+EXTRA_ASSETS = ("/landing_page.jpg",)
+
+
+def public_ref(ref):
+  """Normalize a content reference (``/x.png`` or ``x.png``) to ``/x.png``."""
+  if not isinstance(ref, str) or not ref.strip():
+    return None
+  return "/" + ref.strip().lstrip("/")
+
+
+def collect_assets(content):
+  """Return the sorted public paths referenced by stages, domains and projects."""
+  refs = set(EXTRA_ASSETS)
+  for record in list(content["life_stages"]) + list(content["domains"]):
+    refs.add(public_ref(record.get("icon")))
+  for stage_entry in content["blurbs"].values():
+    for entry in stage_entry.get("domains", {}).values():
+      for project in entry.get("projects") or []:
+        image = project.get("image")
+        refs.add(public_ref(image.get("src") if isinstance(image, dict) else image))
+        qr = project.get("qrCode")
+        for code in qr if isinstance(qr, list) else [qr]:
+          refs.add(public_ref(code))
+  refs.discard(None)
+  return sorted(refs)
+
+
+# --- header-only image dimensions (no Pillow needed) ---
+
+def image_size(path):
+  """Return ``(width, height)`` from the file header, or None if unknown."""
+  with open(path, "rb") as fh:
+    head = fh.read(32)
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+      return struct.unpack(">II", head[16:24])
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+      return struct.unpack("<HH", head[6:10])
+    if head.startswith(b"BM"):
+      width, height = struct.unpack("<ii", head[18:26])
+      return width, abs(height)
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+      return _webp_size(head + fh.read(32))
+    if head.startswith(b"\xff\xd8"):
+      fh.seek(2)
+      return _jpeg_size(fh)
+  if str(path).endswith(".svg"):
+    return _svg_size(pathlib.Path(path).read_text(encoding="utf-8", errors="replace"))
+  return None
+
+
+def _webp_size(data):
+  chunk = data[12:16]
+  if chunk == b"VP8X":
+    return 1 + int.from_bytes(data[24:27], "little"), 1 + int.from_bytes(data[27:30], "little")
+  if chunk == b"VP8 ":
+    width, height = struct.unpack("<HH", data[26:30])
+    return width & 0x3FFF, height & 0x3FFF
+  if chunk == b"VP8L":
+    bits = int.from_bytes(data[21:25], "little")
+    return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+  return None
+
+
+def _jpeg_size(fh):
+  while True:
+    marker = fh.read(2)
+    if len(marker) < 2 or marker[0] != 0xFF:
+      return None
+    if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+      continue
+    (length,) = struct.unpack(">H", fh.read(2))
+    if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+      height, width = struct.unpack(">xHH", fh.read(5))
+      return width, height
+    fh.seek(length - 2, os.SEEK_CUR)
+
+
+def _svg_size(text):
+  match = re.search(r'viewBox="\s*[-\d.]+[\s,]+[-\d.]+[\s,]+([\d.]+)[\s,]+([\d.]+)\s*"', text)
+  if match:
+    return round(float(match.group(1))), round(float(match.group(2)))
+  return None
+
+
+def is_animated_gif(path):
+  """True when a GIF has more than one graphic control block (cheap byte scan)."""
+  data = pathlib.Path(path).read_bytes()
+  return data.count(b"\x21\xf9\x04") > 1
+
+
+# --- QR codes ---
+
+_QR_GROUP_RE = re.compile(
+  r'<g transform="translate\(([-\d.]+),\s*([-\d.]+)\) scale\(([\d.]+),\s*[\d.]+\)">'
+)
+
+
+def qr_modules(svg_text):
+  """Recover the module grid from a generator SVG.
+
+  Each group is ``translate(x, y) scale(s)`` around a 100x100 unit shape: the
+  smallest scale is a single module, 7x is a finder frame and 3x a finder
+  centre. Returns a square list of rows of bools, or None when the file does
+  not look like such an export (the caller then keeps the original).
+  """
+  groups = [(float(x), float(y), float(s)) for x, y, s in _QR_GROUP_RE.findall(svg_text)]
+  if len(groups) < 50:
+    return None
+  unit = min(s for _, _, s in groups)
+  module = unit * 100
+  cells = []
+  for x, y, s in groups:
+    span = round(s / unit)
+    if span not in (1, 3, 7) or abs(s / unit - span) > 0.05:
+      return None
+    cells.append((round(x / module), round(y / module), span))
+  size = max(cx + span for cx, _, span in cells)
+  if size < 21 or (size - 17) % 4:
+    return None
+  grid = [[False] * size for _ in range(size)]
+  for cx, cy, span in cells:
+    for dy in range(span):
+      for dx in range(span):
+        # 7x7 finder frames are a one-module ring
+        if span == 7 and 0 < dx < 6 and 0 < dy < 6:
+          continue
+        grid[cy + dy][cx + dx] = True
+  # Timing patterns must alternate; anything else means we misread the file.
+  if any(grid[6][i] != (i % 2 == 0) for i in range(8, size - 8)):
+    return None
+  if any(grid[i][6] != (i % 2 == 0) for i in range(8, size - 8)):
+    return None
+  return grid
+
+
+def qr_svg(grid, quiet=4):
+  """Render a module grid as one run-length encoded path."""
+  size = len(grid) + 2 * quiet
+  parts = []
+  for y, row in enumerate(grid):
+    x = 0
+    while x < len(row):
+      if not row[x]:
+        x += 1
+        continue
+      start = x
+      while x < len(row) and row[x]:
+        x += 1
+      parts.append(f"M{start + quiet} {y + quiet}h{x - start}v1h-{x - start}z")
+  return (
+    f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+    f'<path fill="#fff" d="M0 0h{size}v{size}H0z"/><path d="{"".join(parts)}"/></svg>\n'
+  )
+
+
+# --- worker ---
+
+def _capabilities():
+  caps = {"pillow": False, "avif": False, "ffmpeg": bool(shutil.which("ffmpeg"))}
+  try:
+    from PIL import features
+  except ImportError:
+    return caps
+  caps["pillow"] = True
+  try:
+    caps["avif"] = bool(features.check("avif"))
+  except (ValueError, KeyError):
+    caps["avif"] = False
+  if not caps["avif"]:
+    try:
+      import pillow_avif  # noqa: F401  (plugin registers the AVIF codec)
+      caps["avif"] = True
+    except ImportError:
+      pass
+  return caps
+
+
+def _output_name(ref, digest, suffix):
+  rel = pathlib.PurePosixPath(ref.lstrip("/"))
+  return rel.with_name(f"{rel.stem}.{digest[:8]}{suffix}").as_posix()
+
+
+def _placeholder(img):
+  from PIL import ImageFilter
+  small = img.copy()
+  small.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH * 4))
+  small = small.filter(ImageFilter.GaussianBlur(1))
+  buf = io.BytesIO()
+  small.save(buf, "WEBP", quality=40)
+  return "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def _transcode_raster(source, ref, digest, out_root, caps, record, outputs):
+  from PIL import Image
+  with Image.open(source) as img:
+    img.load()
+    if img.mode not in ("RGB", "RGBA"):
+      img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "P") else "RGB")
+    record["placeholder"] = _placeholder(img)
+    widths = sorted({w for w in DISPLAY_WIDTHS if w < img.width} | {min(img.width, DISPLAY_WIDTHS[-1])})
+    formats = [("image/avif", ".avif", "AVIF", AVIF_QUALITY)] if caps["avif"] else []
+    formats.append(("image/webp", ".webp", "WEBP", WEBP_QUALITY))
+    sources = []
+    for mime, suffix, fmt, quality in formats:
+      srcset = []
+      for width in widths:
+        height = round(img.height * width / img.width)
+        name = _output_name(ref, digest, f".{width}{suffix}")
+        target = out_root / name
+        if not target.exists():
+          resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+          target.parent.mkdir(parents=True, exist_ok=True)
+          options = {"quality": quality, "method": 6} if fmt == "WEBP" else {"quality": quality}
+          try:
+            resized.save(target, fmt, **options)
+          except (OSError, ValueError):
+            target.unlink(missing_ok=True)
+            raise
+        outputs.append(name)
+        srcset.append(f"/{OUTPUT_SUBDIR}/{name} {width}w")
+      sources.append({"type": mime, "srcset": ", ".join(srcset)})
+    record["sources"] = sources
+
+
+def _transcode_gif(source, ref, digest, out_root, record, outputs):
+  videos = []
+  for mime, suffix, codec_args in (
+    ("video/webm", ".webm", ["-c:v", "libvpx-vp9", "-b:v", "0", "-crf", "36"]),
+    ("video/mp4", ".mp4", ["-c:v", "libx264", "-crf", "26", "-preset", "slow", "-movflags", "+faststart"]),
+  ):
+    name = _output_name(ref, digest, suffix)
+    target = out_root / name
+    if not target.exists():
+      target.parent.mkdir(parents=True, exist_ok=True)
+      try:
+        subprocess.run(
+          ["ffmpeg", "-y", "-loglevel", "error", "-i", str(source), "-an", "-pix_fmt", "yuv420p",
+           "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2", *codec_args, str(target)],
+          check=True,
+        )
+      except subprocess.CalledProcessError:
+        # A partial output would otherwise be reused as finished next time
+        target.unlink(missing_ok=True)
+        raise
+    outputs.append(name)
+    videos.append({"type": mime, "src": f"/{OUTPUT_SUBDIR}/{name}"})
+  record["video"] = videos
+
+
+def _optimize(source, ref, digest, out_root, caps, record, outputs, notes):
+  size = image_size(source)
+  if size:
+    record["width"], record["height"] = size
+  suffix = source.suffix.lower()
+
+  if suffix == ".svg":
+    grid = qr_modules(source.read_text(encoding="utf-8", errors="replace"))
+    if grid:
+      name = _output_name(ref, digest, ".svg")
+      data = qr_svg(grid).encode("utf-8")
+      target = out_root / name
+      if not target.exists():
+        atomic_write(target, data)
+      outputs.append(name)
+      record["src"] = f"/{OUTPUT_SUBDIR}/{name}"
+      record["optimizedBytes"] = len(data)
+  elif suffix == ".gif" and is_animated_gif(source):
+    if caps["ffmpeg"]:
+      _transcode_gif(source, ref, digest, out_root, record, outputs)
+    else:
+      notes.append("ffmpeg not found; animated GIF left as-is")
+    if caps["pillow"]:
+      from PIL import Image
+      with Image.open(source) as img:
+        record["placeholder"] = _placeholder(img.convert("RGB"))
+  elif suffix in RASTER_SUFFIXES:
+    if caps["pillow"]:
+      _transcode_raster(source, ref, digest, out_root, caps, record, outputs)
+    else:
+      notes.append("Pillow not installed; no WebP/AVIF variants or placeholder")
+
+
+def process_asset(job):
+  """Optimize one asset. Runs inside pool workers; returns ``(ref, record, outputs, notes, error)``.
+
+  An asset that cannot be decoded or transcoded is recorded like one without
+  variants (size only, served as-is); ``error`` says why, otherwise None.
+  """
+  ref, source, digest, out_root, caps = job
+  source = pathlib.Path(source)
+  record = {"bytes": source.stat().st_size}
+  outputs = []
+  notes = []
+  try:
+    _optimize(source, ref, digest, pathlib.Path(out_root), caps, record, outputs, notes)
+  except (OSError, ValueError, struct.error, subprocess.CalledProcessError) as e:
+    # PIL.UnidentifiedImageError and truncated-image errors are OSErrors; struct.error is a cut-off header
+    fallback = {key: record[key] for key in ("bytes", "width", "height") if key in record}
+    return ref, fallback, [], notes, str(e) or type(e).__name__
+  return ref, record, outputs, notes, None
+
+
+# --- driver ---
+
+def _file_digest(path):
+  h = hashlib.sha256()
+  with open(path, "rb") as fh:
+    for block in iter(lambda: fh.read(1 << 20), b""):
+      h.update(block)
+  return h.hexdigest()
+
+
+def optimize_assets(refs, root, cache_dir, jobs=None, force=False, log=print):
+  """Optimize ``refs`` (public paths) and return ``{ref: record}``.
+
+  A result is reused from ``cache_dir`` when the source hash, pipeline
+  settings and tool capabilities match and all its output files exist.
+  """
+  root = pathlib.Path(root)
+  public_dir = root / "public"
+  out_root = public_dir / OUTPUT_SUBDIR
+  cache_dir = pathlib.Path(cache_dir)
+  caps = _capabilities()
+  settings = json.dumps([PIPELINE_VERSION, DISPLAY_WIDTHS, WEBP_QUALITY, AVIF_QUALITY, caps], sort_keys=True)
+
+  manifest = {}
+  pending = []
+  for ref in refs:
+    source = public_dir / ref.lstrip("/")
+    if not source.is_file():
+      log(f"  missing   {ref}")
+      continue
+    digest = hashlib.sha256((_file_digest(source) + settings).encode()).hexdigest()
+    cache_file = cache_dir / f"{digest}.json"
+    if not force and cache_file.is_file():
+      cached = json.loads(cache_file.read_text(encoding="utf-8"))
+      if all((out_root / name).is_file() for name in cached["outputs"]):
+        manifest[ref] = cached["record"]
+        continue
+    pending.append((ref, str(source), digest, str(out_root), caps))
+
+  if jobs == 1 or len(pending) <= 1:
+    results = [process_asset(job) for job in pending]
+  else:
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+      results = list(pool.map(process_asset, pending))
+  digests = {job[0]: job[2] for job in pending}
+  for ref, record, outputs, notes, error in results:
+    manifest[ref] = record
+    for note in notes:
+      log(f"  skipped   {ref}: {note}")
+    if error:
+      # Not cached, so the asset is retried once the file or the tools are fixed
+      log(f"  failed    {ref} ({public_dir / ref.lstrip('/')}): {error}; left unoptimized")
+      continue
+    atomic_write(cache_dir / f"{digests[ref]}.json",
+                 json.dumps({"record": record, "outputs": outputs}).encode("utf-8"))
+    log(f"  processed {ref}")
+  return dict(sorted(manifest.items()))
+
+
+def main(argv=None):
+  sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+  from build_json import ASSET_MANIFEST, CONTENT_DIR, MANIFEST_PATH, ROOT
+  from content_loader import ContentError, load_content
+  from incremental import IncrementalWriter
+
+  parser = argparse.ArgumentParser(description="Transcode and compact the images referenced by the content.")
+  parser.add_argument("--content", type=pathlib.Path, default=CONTENT_DIR)
+  parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+  parser.add_argument("--force", action="store_true", help="ignore cached results")
+  args = parser.parse_args(argv)
+
+  try:
+    content = load_content(args.content, jobs=args.jobs)
+  except ContentError as e:
+    sys.exit(f"optimize_assets: {e}")
+  manifest = optimize_assets(collect_assets(content), ROOT, ROOT / ".build-cache" / "assets",
+                             jobs=args.jobs, force=args.force)
+  writer = IncrementalWriter(ROOT, MANIFEST_PATH)
+  writer.write_json(ASSET_MANIFEST, manifest)
+  writer.save()
+  before = sum(r["bytes"] for r in manifest.values())
+  print(f"{len(manifest)} assets recorded in {ASSET_MANIFEST.relative_to(ROOT)} ({before / 1e6:.1f} MB of sources).")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,142 @@
+"""Precache manifest and per-screen prefetch plan for the kiosk assets.
+
+The content fully defines which public files each screen shows: stage icons
+on the stage picker, a stage's domain icons once it is selected, and the
+project images and QR codes of a domain screen. ``build_json.py`` writes two
+documents from it:
+
+- ``public/precache-manifest.json`` for the service worker (``public/sw.js``):
+  every asset with a content-hash ``revision``, in first-needed order, so the
+  worker downloads everything at install and only re-fetches files whose
+  revision changed::
+
+    {"version": 1, "hash": "…", "assets": [{"url", "revision", "bytes"}, ...]}
+
+- ``src/data/prefetchPlan.json`` for ``src/content/prefetch.ts``: per screen,
+  the assets to warm while it is shown, ordered by navigation distance. That
+  means the screen's own assets first, then the screens one tap away (on a
+  stage: its domains, in button order, then the other stages), then those
+  two taps away, up to ``PREFETCH_DEPTH``. URLs are stored once and referenced
+  by index. ``precache`` is the manifest's ``hash``: ``src/main.tsx``
+  registers ``/sw.js?v=<precache>``, so a build that changes any revision
+  changes the worker URL and the browser installs it again::
+
+    {"version": 1, "precache": "…", "assets": [url, ...], "screens": {"stages": [0, 1, ...],
+     "stage:adult": [...], "domain:adult/family": [...]}}
+
+Screen keys match ``screenKey`` in ``src/content/prefetch.ts``. Optimized
+images (``optimize_assets``) are listed by the variants the browser actually
+loads: every width of the first ``<picture>`` source, or the first video of
+an animated GIF.
+"""
+import hashlib
+
+from normalize import attach_assets, normalize_project
+from optimize_assets import public_ref
+
+PREFETCH_DEPTH = 2
+ROOT_SCREEN = "stages"
+
+
+def project_urls(project):
+  """Public URLs a normalized project (with assets attached) renders."""
+  if project.get("imageVideo"):
+    urls = [project["imageVideo"][0]["src"]]
+  elif project.get("imageSources"):
+    urls = [candidate.split()[0] for candidate in project["imageSources"][0]["srcset"].split(",")]
+  else:
+    urls = [project.get("image")]
+  return [ref for ref in map(public_ref, urls + list(project.get("qrCode") or [])) if ref]
+
+
+def screens(content, assets=None):
+  """``{screen: (urls, [neighbour screens, nearest first])}`` for the content."""
+  stage_ids = [s["id"] for s in content["life_stages"]]
+  stage_icons = [public_ref(s.get("icon")) for s in content["life_stages"]]
+  domain_icons = {d["id"]: public_ref(d.get("icon")) for d in content["domains"]}
+  graph = {ROOT_SCREEN: ([u for u in stage_icons if u], [f"stage:{s}" for s in stage_ids])}
+  graph["attract"] = ([], [ROOT_SCREEN])
+  for stage in content["life_stages"]:
+    stage_id = stage["id"]
+    blurb_domains = (content["blurbs"].get(stage_id) or {}).get("domains") or {}
+    domain_ids = [d for d in stage.get("domains") or [] if d in blurb_domains]
+    icons = [domain_icons.get(d) for d in stage.get("domains") or []]
+    others = [f"stage:{s}" for s in stage_ids if s != stage_id]
+    neighbours = [f"domain:{stage_id}/{d}" for d in domain_ids] + others
+    graph[f"stage:{stage_id}"] = ([u for u in icons if u], neighbours)
+    for i, domain_id in enumerate(domain_ids):
+      urls = []
+      for idx, raw in enumerate(blurb_domains[domain_id].get("projects") or []):
+        urls += project_urls(attach_assets(normalize_project(raw, stage_id, domain_id, idx), assets or {}))
+      # Siblings by distance along the domain buttons: next, previous, next but one, ...
+      siblings = sorted((d for d in domain_ids if d != domain_id),
+                        key=lambda d: (abs(domain_ids.index(d) - i), domain_ids.index(d) < i))
+      neighbours = [f"domain:{stage_id}/{d}" for d in siblings] + [f"stage:{stage_id}"]
+      graph[f"domain:{stage_id}/{domain_id}"] = (urls, neighbours)
+  return graph
+
+
+def prefetch_order(graph, start, depth=PREFETCH_DEPTH):
+  """URLs to warm on ``start``: its own, then breadth-first by navigation distance."""
+  seen_screens = {start}
+  frontier = [start]
+  order = {}
+  for _ in range(depth + 1):
+    following = []
+    for screen in frontier:
+      for url in graph[screen][0]:
+        order.setdefault(url, None)
+      for neighbour in graph[screen][1]:
+        if neighbour not in seen_screens:
+          seen_screens.add(neighbour)
+          following.append(neighbour)
+    frontier = following
+  return list(order)
+
+
+def build_prefetch_plan(content, assets=None, precache_hash=None, depth=PREFETCH_DEPTH):
+  graph = screens(content, assets)
+  ordered = {name: prefetch_order(graph, name, depth) for name in graph}
+  urls = list(dict.fromkeys(url for name in ordered for url in ordered[name]))
+  ids = {url: i for i, url in enumerate(urls)}
+  return {
+    "version": 1,
+    "precache": precache_hash,
+    "assets": urls,
+    "screens": {name: [ids[u] for u in order] for name, order in ordered.items()},
+  }
+
+
+def _files(content, assets, public_dir):
+  """``[(url, path)]`` for every asset in first-needed order (from the stage picker outwards)."""
+  graph = screens(content, assets)
+  return [(url, public_dir / url.lstrip("/")) for url in prefetch_order(graph, "attract", len(graph))]
+
+
+def build_precache_manifest(content, public_dir, assets=None):
+  """The service worker manifest; files missing from ``public_dir`` are left out."""
+  entries = []
+  for url, path in _files(content, assets, public_dir):
+    try:
+      data = path.read_bytes()
+    except (FileNotFoundError, IsADirectoryError):
+      continue
+    entries.append({"url": url, "revision": hashlib.sha256(data).hexdigest()[:12], "bytes": len(data)})
+  combined = hashlib.sha256("\n".join(f"{e['url']} {e['revision']}" for e in entries).encode("utf-8"))
+  return {"version": 1, "hash": combined.hexdigest()[:12], "assets": entries}
+
+
+def precache_inputs(content, public_dir, assets=None):
+  """What the manifest depends on: the content, assets and the files' ``(mtime, size)``."""
+  stamps = []
+  for url, path in _files(content, assets, public_dir):
+    try:
+      st = path.stat()
+    except FileNotFoundError:
+      continue
+    stamps.append((url, st.st_mtime_ns, st.st_size))
+  return prefetch_inputs(content, assets), stamps
+
+
+def prefetch_inputs(content, assets=None):
+  return content["life_stages"], content["domains"], content["blurbs"], assets
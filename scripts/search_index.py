@@ -0,0 +1,276 @@
+"""Prebuilt full-text search index over the project texts.
+
+``build_json.py`` writes ``src/data/searchIndex.json`` so the kiosk can
+search on-device without scanning the blurbs at runtime. Every project is one
+document; its fields are weighted (``FIELDS``) and the stage title and domain
+label are indexed too, so "health" finds every project under Health.
+
+Text goes through the same pipeline at build and query time:
+
+1. inline HTML (``<strong>``, ``<li>``, entities) is stripped;
+2. NFKD folding drops diacritics, lower-cases, and maps the letters NFKD
+   leaves alone (``ß``, ``æ``, ``ø`` ...) via ``FOLD``;
+3. tokens are runs of letters and digits; stop words and single letters
+   (the "s" of "women's") are dropped;
+4. stems come from a light suffix stripper: the longest matching suffix of
+   the configured languages' ``SUFFIXES`` is replaced, provided at least
+   ``MIN_STEM`` characters remain.
+
+The fold map, stop words and suffix rules are written into the index, so
+``src/content/search.ts`` applies exactly these rules to queries without a
+copy of its own. The document looks like::
+
+  {
+    "version": 1,
+    "docs": [[stage, domain, projectId, title], ...],
+    "terms": ["abil", "absorb", ...],              sorted stems
+    "postings": [[docDelta, score, ...], ...],     per term, doc ids delta-encoded
+    "words": ["ability", "able", ...],             sorted folded surface words
+    "wordTerms": [0, 0, ...],                      stem index of each word
+    "prefixes": {"a": [0, 41], "ab": [0, 3], ...}, [start, end) ranges into words
+    "fold": {...}, "stopWords": [...], "suffixes": [[suffix, replacement], ...], "minStem": 3
+  }
+
+Scores are BM25 weights precomputed per (term, document) and scaled to
+integers, so a query only adds up a few short lists. ``words`` and
+``prefixes`` serve typeahead: the unfinished last word of a query is matched
+as a prefix of the surface words and expanded to their stems (or, when it
+is already a complete word, by its stem). The file is
+written without whitespace (``dump_index``).
+"""
+import argparse
+import bisect
+import html
+import json
+import math
+import pathlib
+import re
+import sys
+import unicodedata
+
+from normalize import normalize_project
+
+# Field -> weight in the term frequency
+FIELDS = {"title": 3.0, "author": 2.0, "topic": 1.5, "introduction": 1.0, "conclusion": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+SCORE_SCALE = 100
+MIN_STEM = 3
+PREFIX_LEN = 2
+DEFAULT_LANGUAGES = ("en",)
+INDEX_PATH = pathlib.Path(__file__).resolve().parent.parent / "src" / "data" / "searchIndex.json"
+
+# Letters NFKD does not decompose
+FOLD = {"ß": "ss", "æ": "ae", "œ": "oe", "ø": "o", "đ": "d", "ð": "d", "þ": "th", "ł": "l", "ı": "i"}
+
+STOP_WORDS = {
+  "en": "a an and are as at be by for from has have in is it its of on or that the their this to was were which with",
+  "fr": "au aux avec ce ces dans de des du elle en et il ils la le les leur mais ou par pour qui que sa se ses son sur un une",
+  "de": "auf aus bei das dem den der des die ein eine einem einen einer fur im in ist mit oder sich sie und von zu zum zur",
+}
+
+# (suffix, replacement); the longest match across the enabled languages wins
+SUFFIXES = {
+  "en": [
+    ("ational", "ate"), ("ization", "ize"), ("fulness", "ful"), ("iveness", "ive"), ("ousness", "ous"),
+    ("ations", "ate"), ("ation", "ate"), ("ments", ""), ("ment", ""), ("ness", ""), ("ities", ""), ("ity", ""),
+    ("ings", ""), ("ing", ""), ("edly", ""), ("ies", "y"), ("ied", "y"), ("ed", ""), ("ly", ""),
+    ("es", ""), ("s", ""), ("e", ""),
+  ],
+  "fr": [
+    ("issements", ""), ("issement", ""), ("ements", ""), ("ement", ""), ("ations", ""), ("ation", ""),
+    ("euses", ""), ("euse", ""), ("eux", ""), ("ités", ""), ("ité", ""), ("ives", "if"), ("ive", "if"),
+    ("es", ""), ("s", ""), ("e", ""),
+  ],
+  "de": [
+    ("ungen", "ung"), ("heiten", "heit"), ("keiten", "keit"), ("ern", ""), ("em", ""), ("en", ""),
+    ("er", ""), ("es", ""), ("e", ""), ("s", ""),
+  ],
+}
+
+_TAG_RE = re.compile(r"<[^>]*>")
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def strip_html(text):
+  """Plain text of a field that may hold inline HTML."""
+  return html.unescape(_TAG_RE.sub(" ", text or ""))
+
+
+def fold(text):
+  """Lower-case ``text`` and drop diacritics."""
+  decomposed = unicodedata.normalize("NFKD", text.lower())
+  return "".join(FOLD.get(c, c) for c in decomposed if not unicodedata.combining(c))
+
+
+def language_rules(languages=DEFAULT_LANGUAGES):
+  """``(stop_words, suffixes)`` for ``languages``, suffixes longest first."""
+  unknown = [lang for lang in languages if lang not in SUFFIXES]
+  if unknown:
+    raise ValueError(f"no search rules for language(s): {', '.join(unknown)} (have {', '.join(SUFFIXES)})")
+  stop_words = sorted({fold(w) for lang in languages for w in STOP_WORDS[lang].split()})
+  suffixes = {}
+  for lang in languages:
+    for suffix, replacement in SUFFIXES[lang]:
+      suffixes.setdefault(fold(suffix), fold(replacement))
+  return stop_words, sorted(suffixes.items(), key=lambda r: (-len(r[0]), r[0]))
+
+
+def stem(word, suffixes, min_stem=MIN_STEM):
+  for suffix, replacement in suffixes:
+    if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+      return word[:len(word) - len(suffix)] + replacement
+  return word
+
+
+def tokens(text):
+  """Folded words of ``text``, HTML stripped."""
+  return [w for w in _TOKEN_RE.findall(fold(strip_html(text))) if len(w) > 1 or w.isdigit()]
+
+
+def _documents(content):
+  """``(doc, {field: text})`` per project, in stage/domain/project order."""
+  stage_titles = {s["id"]: s.get("title") or s["id"] for s in content["life_stages"]}
+  domain_labels = {d["id"]: d.get("label") or d["id"] for d in content["domains"]}
+  for stage_id, stage_entry in content["blurbs"].items():
+    for domain_id, entry in (stage_entry.get("domains") or {}).items():
+      topic = f"{stage_titles.get(stage_id, stage_id)} {domain_labels.get(domain_id, domain_id)}"
+      for idx, raw in enumerate(entry.get("projects") or []):
+        project = normalize_project(raw, stage_id, domain_id, idx)
+        title = strip_html(project.get("title") or "").strip()
+        fields = {name: project.get(name) or "" for name in FIELDS}
+        fields["topic"] = topic
+        yield [stage_id, domain_id, project["id"], title], fields
+
+
+def build_search_index(content, languages=DEFAULT_LANGUAGES):
+  """The ``searchIndex.json`` document for the assembled ``content``."""
+  stop_words, suffixes = language_rules(languages)
+  stops = set(stop_words)
+  docs = []
+  freqs = []     # per doc: {stem: weighted tf}
+  lengths = []
+  surface = {}   # folded word -> stem
+  for doc, fields in _documents(content):
+    tf = {}
+    length = 0.0
+    for name, text in fields.items():
+      weight = FIELDS[name]
+      for word in tokens(text):
+        if word in stops:
+          continue
+        term = surface.get(word)
+        if term is None:
+          term = surface[word] = stem(word, suffixes)
+        tf[term] = tf.get(term, 0.0) + weight
+        length += weight
+    docs.append(doc)
+    freqs.append(tf)
+    lengths.append(length)
+
+  terms = sorted({term for tf in freqs for term in tf})
+  term_ids = {term: i for i, term in enumerate(terms)}
+  postings = [[] for _ in terms]
+  last_doc = [0] * len(terms)
+  avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+  df = {}
+  for tf in freqs:
+    for term in tf:
+      df[term] = df.get(term, 0) + 1
+  for doc_id, (tf, length) in enumerate(zip(freqs, lengths)):
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length) if avg_length else BM25_K1
+    for term, f in sorted(tf.items()):
+      idf = math.log(1 + (len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+      score = idf * f * (BM25_K1 + 1) / (f + norm)
+      tid = term_ids[term]
+      postings[tid] += [doc_id - last_doc[tid], max(1, round(score * SCORE_SCALE))]
+      last_doc[tid] = doc_id
+
+  words = sorted(surface)
+  prefixes = {}
+  for i, word in enumerate(words):
+    for n in range(1, PREFIX_LEN + 1):
+      if len(word) >= n:
+        prefixes.setdefault(word[:n], [i, i])[1] = i + 1
+
+  return {
+    "version": 1,
+    "languages": list(languages),
+    "docs": docs,
+    "terms": terms,
+    "postings": postings,
+    "words": words,
+    "wordTerms": [term_ids[surface[w]] for w in words],
+    "prefixes": prefixes,
+    "fold": FOLD,
+    "stopWords": stop_words,
+    "suffixes": [list(r) for r in suffixes],
+    "minStem": MIN_STEM,
+  }
+
+
+def search_inputs(content, languages=DEFAULT_LANGUAGES):
+  """Everything ``build_search_index`` reads, for change detection in watch mode."""
+  return content["blurbs"], content["life_stages"], content["domains"], tuple(languages)
+
+
+def dump_index(doc):
+  return json.dumps(doc, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _lookup(terms, term):
+  tid = bisect.bisect_left(terms, term)
+  return {tid} if tid < len(terms) and terms[tid] == term else set()
+
+
+def search(index, query, limit=10):
+  """Reference implementation of ``src/content/search.ts``: ``[(score, doc)]``, best first.
+
+  Every query word must match (AND); the last word also matches as a prefix
+  unless the query ends with a space.
+  """
+  stops = set(index["stopWords"])
+  suffixes = [tuple(r) for r in index["suffixes"]]
+  words = _TOKEN_RE.findall(fold(query))
+  partial = words.pop() if words and not query[-1:].isspace() else None
+  words = [w for w in words if len(w) > 1 or w.isdigit()]
+  terms = index["terms"]
+  groups = []
+  for term in {stem(w, suffixes, index["minStem"]) for w in words if w not in stops}:
+    groups.append(_lookup(terms, term))
+  if partial:
+    start, end = index["prefixes"].get(partial[:PREFIX_LEN], (0, 0))
+    expanded = {index["wordTerms"][i] for i in range(start, end) if index["words"][i].startswith(partial)}
+    groups.append(expanded | _lookup(terms, stem(partial, suffixes, index["minStem"])))
+  if not groups:
+    return []
+  scores = None
+  for group in groups:
+    found = {}
+    for tid in group:
+      doc_id = 0
+      plist = index["postings"][tid]
+      for i in range(0, len(plist), 2):
+        doc_id += plist[i]
+        found[doc_id] = max(found.get(doc_id, 0), plist[i + 1])
+    scores = found if scores is None else {d: s + found[d] for d, s in scores.items() if d in found}
+  ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+  return [(score, index["docs"][doc_id]) for doc_id, score in ranked]
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Query src/data/searchIndex.json like the kiosk does.")
+  parser.add_argument("query")
+  parser.add_argument("--index", type=pathlib.Path, default=INDEX_PATH, help="default: %(default)s")
+  parser.add_argument("--limit", type=int, default=10)
+  args = parser.parse_args(argv)
+  index = json.loads(args.index.read_text(encoding="utf-8"))
+  results = search(index, args.query, args.limit)
+  for score, (stage, domain, project, title) in results:
+    print(f"{score:6d}  {stage}/{domain}/{project}  {title}")
+  if not results:
+    print("no matches", file=sys.stderr)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,82 @@
+"""Per stage/domain shards of the blurbs and questions for lazy loading.
+
+Each shard is ``src/data/shards/<stage>/<domain>.json`` and holds exactly
+what ``DomainScreen`` and ``QuestionScreen`` need for one screen, already in
+the shape the components render::
+
+  {
+    "stage": "early",
+    "domain": "wellbeing",
+    "projects": [{"id", "title", "introduction", "conclusion",
+                  "image", "image_source", "qrCode", "author",
+                  optional "imageWidth", "imageHeight", "imagePlaceholder",
+                  "imageSources", "imageVideo"}],
+    "questions": ["ch_wel_ggd_1", ...],
+    "quiz": {"ch_wel_ggd_1": {"question", "choices", "answer"}, ...}
+  }
+
+``shards/index.json`` lists the shards per stage with their project and
+question counts and a short content hash, so the app knows which shards
+exist without loading any of them.
+"""
+import hashlib
+
+from incremental import dump_json
+from normalize import asset_refs, attach_assets, normalize_project
+
+SHARD_DIR = "shards"
+
+
+def build_shard(stage_id, domain_id, entry, questions, assets=None):
+  question_ids = list(entry.get("questions") or [])
+  return {
+    "stage": stage_id,
+    "domain": domain_id,
+    "projects": [
+      attach_assets(normalize_project(p, stage_id, domain_id, idx), assets or {})
+      for idx, p in enumerate(entry.get("projects") or [])
+    ],
+    "questions": question_ids,
+    "quiz": {qid: questions[qid] for qid in question_ids if qid in questions},
+  }
+
+
+def shard_inputs(stage_id, domain_id, entry, questions, assets=None):
+  """Everything ``build_shard`` reads for one shard, for change detection in watch mode."""
+  assets = assets or {}
+  used = {}
+  for idx, p in enumerate(entry.get("projects") or []):
+    for key in asset_refs(normalize_project(p, stage_id, domain_id, idx)):
+      if key in assets:
+        used[key] = assets[key]
+  quiz = {qid: questions.get(qid) for qid in entry.get("questions") or []}
+  return entry, quiz, used
+
+
+def plan_shards(blurbs, questions, assets=None):
+  """Yield ``(relative_path, inputs, make)`` per shard, in stage/domain order."""
+  for stage_id, stage_entry in blurbs.items():
+    for domain_id, entry in (stage_entry.get("domains") or {}).items():
+      yield (
+        f"{SHARD_DIR}/{stage_id}/{domain_id}.json",
+        shard_inputs(stage_id, domain_id, entry, questions, assets),
+        lambda s=stage_id, d=domain_id, e=entry: build_shard(s, d, e, questions, assets),
+      )
+
+
+def index_entry(shard):
+  return {
+    "file": f"{shard['stage']}/{shard['domain']}.json",
+    "projects": len(shard["projects"]),
+    "questions": len(shard["questions"]),
+    "hash": hashlib.sha256(dump_json(shard)).hexdigest()[:12],
+  }
+
+
+def shard_index(shards):
+  """``shards/index.json`` for ``(shard, index_entry)`` pairs in stage/domain order."""
+  index = {}
+  for shard, entry in shards:
+    index.setdefault(shard["stage"], {})[shard["domain"]] = entry
+  return {"version": 1, "stages": index}
+
@@ -0,0 +1,69 @@
+"""``build_json.py --watch`` keeps running when a content file is broken mid-edit.
+
+Run from the repo root with ``python -m pytest scripts/tests`` (or
+``python -m unittest discover scripts/tests``). Every rebuild here fails at
+load time, so nothing is written to ``src/data``.
+"""
+import argparse
+import contextlib
+import io
+import pathlib
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import build_json  # noqa: E402
+import watcher  # noqa: E402
+
+
+class FakeWatcher:
+  def close(self):
+    pass
+
+
+class WatchModeTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp = pathlib.Path(tempfile.mkdtemp())
+    self.addCleanup(shutil.rmtree, self.tmp)
+    self.content = self.tmp / "content"
+    shutil.copytree(build_json.CONTENT_DIR, self.content)
+    self.args = argparse.Namespace(
+      content=self.content, jobs=1, force=False, validate=True, strict=False, assets=False, shards=True,
+      search_languages=build_json.DEFAULT_LANGUAGES, poll=True, debounce=0.0,
+    )
+
+  def test_malformed_sources_are_reported_and_watching_continues(self):
+    yaml_file = self.content / "projects" / "broken.yaml"
+    json_file = self.content / "projects" / "half_saved.json"
+    yaml_file.write_text("id: [unclosed\n", encoding="utf-8")
+    builds = []
+
+    def batches(_watcher, debounce):
+      builds.append("initial")
+      yaml_file.unlink()
+      json_file.write_text("[1, 2]\n", encoding="utf-8")
+      yield {json_file}
+      builds.append("non-object")
+      yield {json_file}
+      builds.append("again")
+
+    stderr = io.StringIO()
+    with mock.patch.object(watcher, "make_watcher", return_value=FakeWatcher()), \
+         mock.patch.object(watcher, "batches", batches), \
+         contextlib.redirect_stderr(stderr), contextlib.redirect_stdout(io.StringIO()):
+      build_json.WatchSession(self.args).run()
+
+    self.assertEqual(builds, ["initial", "non-object", "again"])
+    errors = stderr.getvalue().splitlines()
+    self.assertTrue(any(line.startswith(f"build_json: {yaml_file}:") for line in errors), errors)
+    self.assertIn(f"build_json: {json_file}: expected an object", errors)
+    self.assertEqual(sum(str(json_file) in line for line in errors), 2)
+
+
+if __name__ == "__main__":
+  unittest.main()
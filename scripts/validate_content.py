@@ -0,0 +1,218 @@
+"""Schema and referential-integrity checks for the generated content.
+
+Runs inside ``build_json.py`` on the assembled documents, before anything is
+written. The cross-reference indexes (stage, domain, project and question
+ids, referenced public files) are built once and every rule is checked in a
+single pass over them.
+
+Errors (broken references the kiosk would hit) fail the build; warnings are
+printed. Results are cached in ``.build-cache/validate.json`` keyed by a
+hash of the documents and of which referenced public files exist, so a
+repeated run on unchanged content costs one hash and a few ``stat`` calls.
+
+Run standalone with ``python scripts/validate_content.py``.
+"""
+import hashlib
+import json
+import pathlib
+import sys
+
+from incremental import atomic_write
+from optimize_assets import public_ref
+
+QUESTION_FIELDS = ("question", "choices", "answer")
+
+
+class Issues:
+  def __init__(self):
+    self.errors = []
+    self.warnings = []
+
+  def error(self, message):
+    self.errors.append(message)
+
+  def warn(self, message):
+    self.warnings.append(message)
+
+
+def _image_src(image):
+  return image.get("src") if isinstance(image, dict) else image
+
+
+def _qr_list(qr):
+  if isinstance(qr, list):
+    return qr
+  return [qr] if qr else []
+
+
+def collect_references(content):
+  """Return ``[(public_ref, where, required)]`` for every file the content points at.
+
+  Icons of domains that no stage lists are never rendered, so a missing file
+  there is only a warning.
+  """
+  used_domains = {d for stage in content["life_stages"] for d in stage.get("domains", [])}
+  refs = []
+  for stage in content["life_stages"]:
+    if stage.get("icon"):
+      refs.append((stage["icon"], f"stage '{stage['id']}' icon", True))
+  for domain in content["domains"]:
+    if domain.get("icon"):
+      refs.append((domain["icon"], f"domain '{domain['id']}' icon", domain["id"] in used_domains))
+  for stage_id, stage_entry in content["blurbs"].items():
+    for domain_id, entry in stage_entry.get("domains", {}).items():
+      for project in entry.get("projects") or []:
+        where = f"project '{project.get('id')}' ({stage_id}/{domain_id})"
+        src = _image_src(project.get("image"))
+        if src:
+          refs.append((src, f"{where} image", True))
+        for code in _qr_list(project.get("qrCode")):
+          refs.append((code, f"{where} qrCode", True))
+  return refs
+
+
+def validate(content, public_dir):
+  """Check ``content`` (as returned by ``load_content``) and return an ``Issues``."""
+  public_dir = pathlib.Path(public_dir)
+  issues = Issues()
+  life_stages, domains, blurbs, questions = (
+    content["life_stages"], content["domains"], content["blurbs"], content["questions"]
+  )
+
+  # Indexes, built once
+  domain_ids = {}
+  for domain in domains:
+    if domain.get("id") in domain_ids:
+      issues.error(f"domains.json: duplicate domain id '{domain.get('id')}'")
+    domain_ids[domain.get("id")] = domain
+  stage_ids = {}
+  for stage in life_stages:
+    if stage.get("id") in stage_ids:
+      issues.error(f"life_stages.json: duplicate stage id '{stage.get('id')}'")
+    stage_ids[stage.get("id")] = stage
+  referenced_questions = {}
+  project_ids = {}
+
+  for stage in life_stages:
+    for key in ("id", "title", "domains"):
+      if key not in stage:
+        issues.error(f"life_stages.json: stage '{stage.get('id')}' is missing '{key}'")
+    for domain_id in stage.get("domains", []):
+      if domain_id not in domain_ids:
+        issues.error(f"life_stages.json: stage '{stage.get('id')}' lists unknown domain '{domain_id}'")
+
+  used_domains = {d for stage in life_stages for d in stage.get("domains", [])}
+  for domain_id in domain_ids:
+    if domain_id not in used_domains:
+      issues.warn(f"domains.json: domain '{domain_id}' is not listed by any stage")
+
+  for stage_id, stage_entry in blurbs.items():
+    if stage_id not in stage_ids:
+      issues.error(f"blurbs: unknown stage '{stage_id}'")
+    for domain_id, entry in stage_entry.get("domains", {}).items():
+      where = f"{stage_id}/{domain_id}"
+      if domain_id not in stage_ids.get(stage_id, {}).get("domains", []):
+        issues.error(f"{where}: domain is not listed under stage '{stage_id}' in life_stages.json")
+      for project in entry.get("projects") or []:
+        pid = project.get("id")
+        if not pid:
+          issues.error(f"{where}: project without an id")
+        elif pid in project_ids:
+          issues.error(f"{where}: project id '{pid}' also used in {project_ids[pid]}")
+        else:
+          project_ids[pid] = where
+        if not project.get("title"):
+          issues.warn(f"{where}: project '{pid}' has no title")
+      for qid in entry.get("questions") or []:
+        if qid not in questions:
+          issues.error(f"{where}: question '{qid}' does not exist in questions.json")
+        referenced_questions.setdefault(qid, where)
+
+  for qid, question in questions.items():
+    missing = [f for f in QUESTION_FIELDS if f not in question]
+    if missing:
+      issues.error(f"question '{qid}': missing {', '.join(missing)}")
+      continue
+    choices = question["choices"]
+    if not isinstance(choices, list) or len(choices) < 2:
+      issues.error(f"question '{qid}': needs at least two choices")
+    elif not all(isinstance(choice, str) for choice in choices):
+      issues.error(f"question '{qid}': every choice must be a string")
+    elif not isinstance(question["answer"], str):
+      issues.error(f"question '{qid}': answer must be a string")
+    elif question["answer"] not in choices:
+      issues.error(f"question '{qid}': answer '{question['answer']}' is not one of its choices")
+    elif len(set(choices)) != len(choices):
+      issues.warn(f"question '{qid}': duplicate choices")
+    if qid not in referenced_questions:
+      issues.warn(f"question '{qid}' is not used by any domain")
+
+  for ref, where, required in collect_references(content):
+    if not (public_dir / public_ref(ref).lstrip("/")).is_file():
+      (issues.error if required else issues.warn)(f"{where}: public{public_ref(ref)} does not exist")
+
+  return issues
+
+
+def cache_key(content, public_dir):
+  """Hash of the documents plus the existence of every referenced public file.
+
+  This module's own source is part of the key, so editing a rule invalidates
+  cached results.
+  """
+  public_dir = pathlib.Path(public_dir)
+  h = hashlib.sha256(pathlib.Path(__file__).read_bytes())
+  for name in ("life_stages", "domains", "blurbs", "questions"):
+    h.update(json.dumps(content[name], sort_keys=True, ensure_ascii=False).encode("utf-8"))
+  for ref, _, _ in collect_references(content):
+    h.update(f"{ref}:{(public_dir / public_ref(ref).lstrip('/')).is_file()}".encode("utf-8"))
+  return h.hexdigest()
+
+
+def validate_cached(content, public_dir, cache_path):
+  """Like ``validate`` but reuses the stored result for an unchanged content hash."""
+  cache_path = pathlib.Path(cache_path)
+  key = cache_key(content, public_dir)
+  try:
+    cached = json.loads(cache_path.read_text(encoding="utf-8"))
+    if cached.get("key") == key:
+      issues = Issues()
+      issues.errors, issues.warnings = cached["errors"], cached["warnings"]
+      return issues
+  except (FileNotFoundError, ValueError, KeyError):
+    pass
+  issues = validate(content, public_dir)
+  payload = {"key": key, "errors": issues.errors, "warnings": issues.warnings}
+  atomic_write(cache_path, json.dumps(payload, indent=2, ensure_ascii=False).encode("utf-8"))
+  return issues
+
+
+def report(issues, prefix="  "):
+  for message in issues.warnings:
+    print(f"{prefix}warning: {message}")
+  for message in issues.errors:
+    print(f"{prefix}error:   {message}", file=sys.stderr)
+
+
+def main(argv=None):
+  import argparse
+  from build_json import CONTENT_DIR, ROOT
+  from content_loader import ContentError, load_content
+
+  parser = argparse.ArgumentParser(description="Validate the kiosk content and its references.")
+  parser.add_argument("--content", type=pathlib.Path, default=CONTENT_DIR)
+  parser.add_argument("--strict", action="store_true", help="treat warnings as errors")
+  args = parser.parse_args(argv)
+  try:
+    content = load_content(args.content)
+  except ContentError as e:
+    sys.exit(f"validate_content: {e}")
+  issues = validate(content, ROOT / "public")
+  report(issues)
+  failed = issues.errors or (args.strict and issues.warnings)
+  print(f"{len(issues.errors)} error(s), {len(issues.warnings)} warning(s).")
+  sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,175 @@
+"""File change notification for ``build_json.py --watch``.
+
+On Linux the directories are watched with inotify (through ``ctypes``, no
+extra packages); elsewhere, or when inotify is unavailable or out of
+watches, a polling watcher compares ``(mtime, size)`` snapshots instead.
+Both yield batches of changed paths: after the first change the batch stays
+open until the tree has been quiet for ``debounce`` seconds, so an editor's
+save burst (temp file, rename, chmod) becomes a single rebuild.
+"""
+import ctypes
+import ctypes.util
+import os
+import pathlib
+import select
+import struct
+import sys
+import time
+
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ATTRIB
+_EVENT = struct.Struct("iIII")
+
+
+def _ignored(name):
+  # Editor swap/backup files and our own atomic_write temp files
+  return name.startswith((".", "_")) or name.endswith(("~", ".swp", ".tmp"))
+
+
+def _walk(root, exclude):
+  """``os.walk`` minus ignored names and the ``exclude`` directories (e.g. build outputs)."""
+  for dirpath, dirnames, filenames in os.walk(root):
+    dirnames[:] = [d for d in dirnames if not _ignored(d) and os.path.join(dirpath, d) not in exclude]
+    yield dirpath, filenames
+
+
+class PollingWatcher:
+  """Portable fallback: rescans the roots every ``interval`` seconds."""
+
+  def __init__(self, roots, interval=0.5, exclude=()):
+    self.roots = [pathlib.Path(r) for r in roots]
+    self.interval = interval
+    self.exclude = {str(p) for p in exclude}
+    self.snapshot = self._scan()
+
+  def _scan(self):
+    stamps = {}
+    for root in self.roots:
+      for dirpath, filenames in _walk(root, self.exclude):
+        for name in filenames:
+          path = os.path.join(dirpath, name)
+          if _ignored(name) or path in self.exclude:
+            continue
+          try:
+            st = os.stat(path)
+          except FileNotFoundError:
+            continue
+          stamps[path] = (st.st_mtime_ns, st.st_size)
+    return stamps
+
+  def poll(self, timeout):
+    """Return the set of paths changed since the last call (waits up to ``timeout``)."""
+    deadline = time.monotonic() + (timeout if timeout is not None else float("inf"))
+    while True:
+      current = self._scan()
+      previous, self.snapshot = self.snapshot, current
+      changed = {p for p in previous.keys() | current.keys() if previous.get(p) != current.get(p)}
+      if changed:
+        return {pathlib.Path(p) for p in changed}
+      remaining = deadline - time.monotonic()
+      if remaining <= 0:
+        return set()
+      time.sleep(min(self.interval, remaining))
+
+  def close(self):
+    pass
+
+
+class InotifyWatcher:
+  """Recursive inotify watch; new subdirectories are picked up as they appear."""
+
+  def __init__(self, roots, exclude=()):
+    self.exclude = {str(p) for p in exclude}
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    self._add_watch = libc.inotify_add_watch
+    self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+    self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if self.fd < 0:
+      raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    self.dirs = {}
+    try:
+      for root in roots:
+        self._watch_tree(pathlib.Path(root))
+    except OSError:
+      self.close()
+      raise
+
+  def _watch_tree(self, root):
+    for dirpath, _ in _walk(root, self.exclude):
+      wd = self._add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+      if wd < 0:
+        # ENOSPC here means fs.inotify.max_user_watches is exhausted
+        raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {dirpath}")
+      self.dirs[wd] = pathlib.Path(dirpath)
+
+  def _read(self):
+    changed = set()
+    while True:
+      try:
+        buf = os.read(self.fd, 64 * 1024)
+      except BlockingIOError:
+        return changed
+      offset = 0
+      while offset < len(buf):
+        wd, mask, _, length = _EVENT.unpack_from(buf, offset)
+        name = buf[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0").decode("utf-8", "replace")
+        offset += _EVENT.size + length
+        if mask & IN_Q_OVERFLOW:
+          # Events were dropped: report every watched directory so the caller rebuilds fully
+          changed.update(self.dirs.values())
+          continue
+        directory = self.dirs.get(wd)
+        if directory is None or not name or _ignored(name):
+          continue
+        path = directory / name
+        if mask & IN_ISDIR:
+          if str(path) in self.exclude:
+            continue
+          if mask & (IN_CREATE | IN_MOVED_TO):
+            self._watch_tree(path)
+          changed.add(path)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_ATTRIB):
+          if str(path) not in self.exclude:
+            changed.add(path)
+
+  def poll(self, timeout):
+    ready, _, _ = select.select([self.fd], [], [], timeout)
+    return self._read() if ready else set()
+
+  def close(self):
+    if self.fd >= 0:
+      os.close(self.fd)
+      self.fd = -1
+
+
+def make_watcher(roots, polling=False, exclude=(), log=print):
+  if not polling and sys.platform.startswith("linux"):
+    try:
+      return InotifyWatcher(roots, exclude=exclude)
+    except (OSError, AttributeError) as e:
+      log(f"  inotify unavailable ({e}); falling back to polling")
+  return PollingWatcher(roots, exclude=exclude)
+
+
+def batches(watcher, debounce=0.2):
+  """Yield sets of changed paths, one per quiet period."""
+  while True:
+    changed = watcher.poll(None)
+    while changed:
+      more = watcher.poll(debounce)
+      if not more:
+        break
+      changed |= more
+    if changed:
+      yield changed
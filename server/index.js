@@ -3,6 +3,7 @@ import morgan from "morgan";
 import path from "path";
 import fs from "fs";
 import { fileURLToPath } from "url";
+import { createHash } from "crypto";
 import 'dotenv/config';
 import cors from "cors";
 import initSqlJs from "sql.js";
@@ -208,8 +209,11 @@ app.post("/api/analytics/events-plain",
   }
 );
 
-app.get("/analytics/health", (_req, res) => res.json({ ok: true }));
-app.get("/api/analytics/health", (_req, res) => res.json({ ok: true }));
+// Identifies the database file without exposing its path; scripts/analytics
+// bench-ingest refuses to load-test a server whose id is the stand's own file
+const dbId = createHash("sha256").update(path.join(fs.realpathSync(__dirname), "analytics.db")).digest("hex").slice(0, 16);
+app.get("/analytics/health", (_req, res) => res.json({ ok: true, dbId }));
+app.get("/api/analytics/health", (_req, res) => res.json({ ok: true, dbId }));
 
 // --- Existing aggregate endpoints (shortened for brevity) ---
 function buildSinceClause(sinceHours) {
@@ -334,6 +338,22 @@ app.get("/api/analytics/question-stats", requireAdmin, async (req, res) => {
   res.json(rows);
 });
 
+// Precomputed quiz item analysis (written by `python scripts/analytics quiz --out`)
+const quizStatsPath = path.join(__dirname, "quiz_stats.json");
+let quizStatsCache = { mtimeMs: 0, body: null };
+app.get("/api/analytics/quiz-stats", requireAdmin, async (_req, res) => {
+  let stat;
+  try {
+    stat = fs.statSync(quizStatsPath);
+  } catch {
+    return res.status(404).json({ error: "quiz stats not generated" });
+  }
+  if (stat.mtimeMs !== quizStatsCache.mtimeMs) {
+    quizStatsCache = { mtimeMs: stat.mtimeMs, body: fs.readFileSync(quizStatsPath, "utf8") };
+  }
+  res.type("application/json").send(quizStatsCache.body);
+});
+
 // Quiz skipped counts
 app.get("/api/analytics/quiz-skips", requireAdmin, async (req, res) => {
   const sinceHours = parseFloat(req.query.sinceHours);
@@ -9,7 +9,9 @@ import lifeStages from "./data/lifeStages.json";
 import Header from "./components/Header";
 import Breadcrumbs from "./components/Breadcrumbs";
 import TransitionScreen from "./pages/TransitionScreen";
-import blurbsData from "./data/blurbs.json";
+import { domainHasQuestions } from "./content/contentIndex";
+import { prefetchScreen, screenKey } from "./content/prefetch";
+import type { SearchResult } from "./content/search";
 import AiFutureScreen from "./pages/AiFutureScreen";
 import { initAnalytics, trackEnterApp, trackStageVisit, trackDomainStart, trackDomainEnd, trackQuizSkipped, trackExitToAttract } from "./analytics";
 
@@ -20,6 +22,8 @@ function App() {
   const [showQuestion, setShowQuestion] = useState(false);
   const [showTakeQuiz, setShowTakeQuiz] = useState(false);
   const [showTransition, setShowTransition] = useState(false);
+  // Project a search result opened, shown first in its domain
+  const [focusProjectId, setFocusProjectId] = useState<string | null>(null);
   const idleTimerRef = useRef<number | null>(null);
 
   // NEW: track which domains have been answered in this stage
@@ -90,6 +94,11 @@ function App() {
   const lastDomainRef = useRef<string | null>(null);
   const lastStageRef = useRef<string | null>(null);
 
+  // Warm the assets of the screens one or two taps away from this one
+  useEffect(() => {
+    prefetchScreen(screenKey(attractMode, currentStageId, selectedDomain));
+  }, [attractMode, currentStageId, selectedDomain]);
+
   // Init analytics once
   useEffect(() => {
     initAnalytics({
@@ -155,10 +164,7 @@ function App() {
   const handleDomainSelect = (domainId: string | null, options?: { skipQuiz?: boolean }) => {
     setSelectedDomain(domainId);
     if (domainId && currentStageId) {
-      const stageEntry = (blurbsData as Record<string, any>)[currentStageId];
-      const domainsObj = stageEntry?.domains || stageEntry?.domain || {};
-      const q = domainsObj?.[domainId]?.questions;
-      const hasQuestions = Array.isArray(q) && q.length > 0;
+      const hasQuestions = domainHasQuestions(currentStageId, domainId);
       const alreadyAnswered = answeredDomainsThisStage.has(domainId);
 
       const shouldPromptQuiz = hasQuestions && !alreadyAnswered && !options?.skipQuiz;
@@ -167,6 +173,20 @@ function App() {
     }
   };
 
+  // Search results jump straight to the project's domain, through the usual quiz prompt
+  const handleOpenProject = (result: SearchResult) => {
+    setCurrentStageId(result.stage);
+    setSelectedDomain(result.domain);
+    setFocusProjectId(result.projectId);
+    setShowTakeQuiz(domainHasQuestions(result.stage, result.domain));
+    setShowQuestion(false);
+  };
+
+  // The focus only applies to the domain the search opened
+  useEffect(() => {
+    if (!selectedDomain) setFocusProjectId(null);
+  }, [selectedDomain]);
+
   // Ensure AI Future stage never goes to domain/question UI
   useEffect(() => {
     if (currentStageId === "ai_future") {
@@ -251,11 +271,9 @@ function App() {
                     <DomainScreen
                       stageId={currentStageId}
                       selectedDomain={selectedDomain}
+                      projectId={focusProjectId}
                       onSelectDomain={id => {
-                        const stageEntry = (blurbsData as Record<string, any>)[currentStageId];
-                        const domainsObj = stageEntry?.domains || stageEntry?.domain || {};
-                        const q = domainsObj?.[id]?.questions;
-                        const hasQuestions = Array.isArray(q) && q.length > 0;
+                        const hasQuestions = domainHasQuestions(currentStageId, id);
                         const alreadyAnswered = answeredDomainsThisStage?.has
                           ? answeredDomainsThisStage.has(id)
                           : false;
@@ -283,6 +301,7 @@ function App() {
                     setCurrentStageId={setCurrentStageId}
                     selectedDomain={selectedDomain}
                     setSelectedDomain={handleDomainSelect}
+                    onOpenProject={handleOpenProject}
                     onExitToAttract={() => {
                         // analytics
                         trackExitToAttract("button");
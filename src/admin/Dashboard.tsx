@@ -68,6 +68,7 @@ function Dashboard() {
   const [projectStats, setProjectStats] = useState<any[]>([]);
   const [questionStats, setQuestionStats] = useState<any[]>([]);
   const [quizSkips, setQuizSkips] = useState<any[]>([]);
+  const [quizStats, setQuizStats] = useState<any | null>(null);
   const [screensaver, setScreensaver] = useState<any[]>([]);
   const [daily, setDaily] = useState<any[]>([]);
   const [topSessions, setTopSessions] = useState<any[]>([]);
@@ -120,6 +121,8 @@ function Dashboard() {
       setScreensaver(screenData);
       setDaily(dailyData);
       setTopSessions(topSessionsData);
+      // Optional: only there once `python scripts/analytics quiz --out` has run
+      setQuizStats(await AnalyticsAPI.quizStats().catch(() => null));
     } catch (e: any) {
       setErr(e.message);
     } finally {
@@ -416,6 +419,39 @@ function Dashboard() {
           ) : <div className="text-xs opacity-60">No question data</div>}
         </SectionCard>
 
+        <SectionCard title="Quiz Difficulty">
+          {quizStats?.questions?.length ? (
+            <div className="text-[11px] space-y-2 max-h-64 overflow-y-auto">
+              {quizStats.questions.map((q: any) => (
+                <div key={q.id}>
+                  <div className="flex justify-between">
+                    <span className="truncate max-w-[120px]" title={q.question ?? q.id}>{q.id}</span>
+                    <span>
+                      {q.p == null ? "–" : `${Math.round(q.p * 100)}% (${Math.round(q.pLo * 100)}–${Math.round(q.pHi * 100)})`}
+                      {" · "}r {q.rpb == null ? "–" : q.rpb.toFixed(2)} · n {q.n}
+                    </span>
+                  </div>
+                  <div className="flex gap-2 opacity-70">
+                    {q.shares.map((share: number | null, i: number) => (
+                      <span key={i} className={i === q.answer ? "font-semibold" : undefined}>
+                        {String.fromCharCode(65 + i)} {share == null ? "–" : `${Math.round(share * 100)}%`}
+                      </span>
+                    ))}
+                  </div>
+                  {q.flags.length > 0 && <div className="text-warning">{q.flags.join(", ")}</div>}
+                </div>
+              ))}
+              <div className="opacity-60">
+                Generated {new Date(quizStats.generatedAt).toLocaleString()}
+              </div>
+            </div>
+          ) : (
+            <div className="text-xs opacity-60">
+              No quiz stats; run <code>python scripts/analytics quiz --out</code>
+            </div>
+          )}
+        </SectionCard>
+
         <SectionCard title="Quiz Skips">
           <div className="text-xs space-y-1 max-h-64 overflow-y-auto">
             {quizSkips.map(q => (
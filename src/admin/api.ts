@@ -34,6 +34,7 @@ export const AnalyticsAPI = {
     get(`/project-stats${sinceHours ? `?sinceHours=${sinceHours}` : ""}`),
   questionStats: (sinceHours?: number) =>
     get(`/question-stats${sinceHours ? `?sinceHours=${sinceHours}` : ""}`),
+  quizStats: () => get(`/quiz-stats`),
   quizSkips: (sinceHours?: number) =>
     get(`/quiz-skips${sinceHours ? `?sinceHours=${sinceHours}` : ""}`),
   screensaver: (sinceHours?: number) =>
@@ -0,0 +1,57 @@
+import React from "react";
+import type { ShardProject } from "../content/shards";
+
+interface ProjectImageProps {
+  project: ShardProject;
+  className?: string;
+  // rendered width hint for picking a srcset candidate
+  sizes?: string;
+}
+
+// Uses the variants produced by scripts/optimize_assets.py when the shard has them
+// (WebP/AVIF srcset, video for animated GIFs, blurred placeholder, intrinsic size),
+// otherwise the original image file.
+const ProjectImage: React.FC<ProjectImageProps> = ({ project, className, sizes = "33vw" }) => {
+  const placeholderStyle = project.imagePlaceholder
+    ? { backgroundImage: `url(${project.imagePlaceholder})`, backgroundSize: "cover" }
+    : undefined;
+
+  if (project.imageVideo && project.imageVideo.length > 0) {
+    return (
+      <video
+        className={className}
+        width={project.imageWidth}
+        height={project.imageHeight}
+        style={placeholderStyle}
+        aria-label={project.title}
+        autoPlay
+        loop
+        muted
+        playsInline
+      >
+        {project.imageVideo.map(v => (
+          <source key={v.src} src={v.src} type={v.type} />
+        ))}
+      </video>
+    );
+  }
+
+  return (
+    <picture>
+      {project.imageSources?.map(s => (
+        <source key={s.type} type={s.type} srcSet={s.srcset} sizes={sizes} />
+      ))}
+      <img
+        src={project.image}
+        alt={project.title}
+        width={project.imageWidth}
+        height={project.imageHeight}
+        decoding="async"
+        className={className}
+        style={placeholderStyle}
+      />
+    </picture>
+  );
+};
+
+export default ProjectImage;
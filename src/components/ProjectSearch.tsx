@@ -0,0 +1,83 @@
+import { useEffect, useState } from "react";
+import lifeStages from "../data/lifeStages.json";
+import domainsData from "../data/domains.json";
+import { loadSearchIndex, search, type SearchResult } from "../content/search";
+
+interface ProjectSearchProps {
+  onOpen: (result: SearchResult) => void;
+  /** Results shown at most */
+  limit?: number;
+}
+
+// Wait for a pause in typing before querying the index
+const QUERY_DELAY_MS = 150;
+
+export default function ProjectSearch({ onOpen, limit = 6 }: ProjectSearchProps) {
+  const [query, setQuery] = useState("");
+  const [results, setResults] = useState<SearchResult[]>([]);
+
+  useEffect(() => {
+    if (!query.trim()) {
+      setResults([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = window.setTimeout(() => {
+      search(query, limit)
+        .then(found => {
+          if (!cancelled) setResults(found);
+        })
+        .catch(() => {
+          if (!cancelled) setResults([]);
+        });
+    }, QUERY_DELAY_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query, limit]);
+
+  const stageTitle = (id: string) => lifeStages.find(s => s.id === id)?.title ?? id;
+  const domainLabel = (id: string) =>
+    (domainsData as Array<{ id: string; label: string }>).find(d => d.id === id)?.label ?? id;
+
+  return (
+    <div className="relative w-full max-w-md mx-auto">
+      <input
+        type="search"
+        className="input input-bordered input-sm w-full rounded-full"
+        placeholder="Search projects"
+        aria-label="Search projects"
+        value={query}
+        // The index is a separate chunk; start loading it as soon as the field is used
+        onFocus={() => void loadSearchIndex().catch(() => undefined)}
+        onChange={e => setQuery(e.target.value)}
+      />
+      {query.trim() && (
+        <ul className="absolute z-20 mt-1 w-full bg-base-100 rounded-xl shadow-xl border border-base-300/50 text-left overflow-hidden">
+          {results.length === 0 ? (
+            <li className="px-4 py-2 text-sm text-base-content/60">No matching projects</li>
+          ) : (
+            results.map(result => (
+              <li key={`${result.stage}/${result.domain}/${result.projectId}`}>
+                <button
+                  type="button"
+                  className="w-full px-4 py-2 text-left hover:bg-base-200"
+                  onClick={() => {
+                    setQuery("");
+                    onOpen(result);
+                  }}
+                >
+                  <span className="block text-sm font-medium">{result.title}</span>
+                  <span className="block text-xs text-base-content/60">
+                    {stageTitle(result.stage)} · {domainLabel(result.domain)}
+                  </span>
+                </button>
+              </li>
+            ))
+          )}
+        </ul>
+      )}
+    </div>
+  );
+}
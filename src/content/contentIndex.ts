@@ -0,0 +1,43 @@
+import contentIndex from "../data/contentIndex.json";
+
+// Lookup tables precomputed by scripts/normalize.py (build_content_index)
+type DomainIndexEntry = {
+  projects: string[];
+  questions: string[];
+};
+
+export type QuestionLocation = {
+  stage: string;
+  domain: string;
+  project: string | null;
+};
+
+type ContentIndex = {
+  stages: Record<string, Record<string, DomainIndexEntry>>;
+  questions: Record<string, QuestionLocation>;
+  domainStages: Record<string, string[]>;
+};
+
+const index = contentIndex as ContentIndex;
+
+export function getDomainEntry(stageId: string | null, domainId: string | null): DomainIndexEntry | undefined {
+  if (!stageId || !domainId) return undefined;
+  return index.stages[stageId]?.[domainId];
+}
+
+// Domains with content under a stage, in display order
+export function getStageDomains(stageId: string): string[] {
+  return Object.keys(index.stages[stageId] ?? {});
+}
+
+export function domainHasQuestions(stageId: string | null, domainId: string | null): boolean {
+  return (getDomainEntry(stageId, domainId)?.questions.length ?? 0) > 0;
+}
+
+export function getStagesForDomain(domainId: string): string[] {
+  return index.domainStages[domainId] ?? [];
+}
+
+export function locateQuestion(questionId: string): QuestionLocation | undefined {
+  return index.questions[questionId];
+}
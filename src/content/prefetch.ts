@@ -0,0 +1,93 @@
+// Per-screen warm-up lists written by scripts/precache.py: the screen's own
+// assets, then those of the screens one and two taps away.
+type PrefetchPlan = {
+  precache: string | null;
+  assets: string[];
+  screens: Record<string, number[]>;
+};
+
+let planPromise: Promise<PrefetchPlan> | null = null;
+
+// The plan grows with the content, so it is kept out of the main bundle and
+// loaded once, on the first prefetch (after the first screen has rendered)
+function loadPlan(): Promise<PrefetchPlan> {
+  if (!planPromise) {
+    planPromise = import("../data/prefetchPlan.json")
+      .then(module => module.default as unknown as PrefetchPlan)
+      .catch(err => {
+        planPromise = null;
+        throw err;
+      });
+  }
+  return planPromise;
+}
+
+// Hash of public/precache-manifest.json; versions the service worker URL so a
+// build with new or changed assets installs it again
+export function loadPrecacheVersion(): Promise<string | null> {
+  return loadPlan().then(plan => plan.precache);
+}
+
+// Requests in flight at once, so warming never competes with what is on screen
+const CONCURRENCY = 2;
+const VIDEO_RE = /\.(mp4|webm)$/i;
+
+// Decoded images are kept referenced so the browser keeps them in its memory
+// cache; only the current screen's plan is held, so this never outgrows it
+const warmed = new Map<string, HTMLImageElement | null>();
+let generation = 0;
+
+export function screenKey(
+  attractMode: boolean,
+  stageId: string | null,
+  domainId: string | null,
+): string {
+  if (attractMode) return "attract";
+  if (!stageId) return "stages";
+  if (!domainId) return `stage:${stageId}`;
+  return `domain:${stageId}/${domainId}`;
+}
+
+function warm(url: string): Promise<unknown> {
+  if (VIDEO_RE.test(url)) {
+    warmed.set(url, null);
+    return fetch(url).then(res => res.blob()).catch(() => warmed.delete(url));
+  }
+  const img = new Image();
+  img.decoding = "async";
+  img.src = url;
+  warmed.set(url, img);
+  return img.decode().catch(() => warmed.delete(url));
+}
+
+// requestIdleCallback is missing in Safari / the iOS WebView
+function idle(cb: () => void): void {
+  if (typeof requestIdleCallback === "function") requestIdleCallback(cb, { timeout: 1000 });
+  else setTimeout(cb, 50);
+}
+
+// Warm the assets for `screen` in plan order. A newer call supersedes an
+// older one, so only the current screen's neighbourhood is fetched, and
+// releases the assets that are no longer in it.
+export function prefetchScreen(screen: string): void {
+  const current = ++generation;
+  loadPlan().then(plan => {
+    if (current !== generation) return;
+    const urls = (plan.screens[screen] ?? []).map(i => plan.assets[i]);
+    const wanted = new Set(urls);
+    for (const url of warmed.keys()) {
+      if (!wanted.has(url)) warmed.delete(url);
+    }
+    const queue = urls.filter(url => !warmed.has(url));
+    const next = (): void => {
+      if (current !== generation) return;
+      const url = queue.shift();
+      if (url === undefined) return;
+      if (warmed.has(url)) return next();
+      void warm(url).then(() => idle(next));
+    };
+    idle(() => {
+      for (let i = 0; i < CONCURRENCY; i++) next();
+    });
+  }, () => undefined);
+}
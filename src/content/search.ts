@@ -0,0 +1,152 @@
+// Full-text search over the project texts, answered from the index prebuilt by
+// scripts/search_index.py (src/data/searchIndex.json). Folding, stop words and
+// stemming rules come from the index itself, so queries are normalized exactly
+// like the content was.
+
+type SearchIndex = {
+  version: number;
+  docs: [stage: string, domain: string, projectId: string, title: string][];
+  terms: string[];
+  postings: number[][];
+  words: string[];
+  wordTerms: number[];
+  prefixes: Record<string, [number, number]>;
+  fold: Record<string, string>;
+  stopWords: string[];
+  suffixes: [string, string][];
+  minStem: number;
+};
+
+export type SearchResult = {
+  stage: string;
+  domain: string;
+  projectId: string;
+  title: string;
+  score: number;
+};
+
+// Matches PREFIX_LEN in scripts/search_index.py
+const PREFIX_LEN = 2;
+const TOKEN_RE = /[\p{L}\p{N}]+/gu;
+const NUMBER_RE = /^\p{N}+$/u;
+
+let indexPromise: Promise<PreparedIndex> | null = null;
+
+type PreparedIndex = SearchIndex & { stops: Set<string>; foldRe: RegExp | null };
+
+// Kept out of the main bundle; the first search (or a prefetch) loads it once
+export function loadSearchIndex(): Promise<PreparedIndex> {
+  if (!indexPromise) {
+    indexPromise = import("../data/searchIndex.json")
+      .then(module => {
+        const index = module.default as unknown as SearchIndex;
+        const keys = Object.keys(index.fold);
+        return {
+          ...index,
+          stops: new Set(index.stopWords),
+          foldRe: keys.length ? new RegExp(`[${keys.join("")}]`, "gu") : null,
+        };
+      })
+      .catch(err => {
+        indexPromise = null;
+        throw err;
+      });
+  }
+  return indexPromise;
+}
+
+function fold(index: PreparedIndex, text: string): string {
+  const plain = text.toLowerCase().normalize("NFKD").replace(/\p{M}/gu, "");
+  return index.foldRe ? plain.replace(index.foldRe, c => index.fold[c]) : plain;
+}
+
+function stem(index: PreparedIndex, word: string): string {
+  for (const [suffix, replacement] of index.suffixes) {
+    if (word.endsWith(suffix) && word.length - suffix.length >= index.minStem) {
+      return word.slice(0, word.length - suffix.length) + replacement;
+    }
+  }
+  return word;
+}
+
+function lowerBound(sorted: string[], value: string, lo = 0, hi = sorted.length): number {
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (sorted[mid] < value) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+function lookup(index: PreparedIndex, term: string): number[] {
+  const i = lowerBound(index.terms, term);
+  return index.terms[i] === term ? [i] : [];
+}
+
+// Terms of the surface words starting with `prefix`, via the prefix table
+function expandPrefix(index: PreparedIndex, prefix: string): number[] {
+  const range = index.prefixes[prefix.slice(0, PREFIX_LEN)];
+  if (!range) return [];
+  const [start, end] = range;
+  const out = new Set<number>();
+  for (let i = lowerBound(index.words, prefix, start, end); i < end && index.words[i].startsWith(prefix); i++) {
+    out.add(index.wordTerms[i]);
+  }
+  return [...out];
+}
+
+// Every query word must match; the last one also as a prefix unless the query
+// ends with a space. Same ranking as search() in scripts/search_index.py.
+export function searchIndex(index: PreparedIndex, query: string, limit = 10): SearchResult[] {
+  const words = fold(index, query).match(TOKEN_RE) ?? [];
+  const partial = words.length && !/\s$/.test(query) ? words.pop()! : null;
+  const groups: number[][] = [];
+  const seen = new Set<string>();
+  for (const word of words) {
+    if ((word.length < 2 && !NUMBER_RE.test(word)) || index.stops.has(word)) continue;
+    const term = stem(index, word);
+    if (seen.has(term)) continue;
+    seen.add(term);
+    groups.push(lookup(index, term));
+  }
+  if (partial) {
+    groups.push([...new Set([...expandPrefix(index, partial), ...lookup(index, stem(index, partial))])]);
+  }
+  if (!groups.length) return [];
+
+  let scores: Map<number, number> | null = null;
+  for (const group of groups) {
+    const found = new Map<number, number>();
+    for (const termId of group) {
+      const list = index.postings[termId];
+      let doc = 0;
+      for (let i = 0; i < list.length; i += 2) {
+        doc += list[i];
+        found.set(doc, Math.max(found.get(doc) ?? 0, list[i + 1]));
+      }
+    }
+    if (scores === null) {
+      scores = found;
+    } else {
+      const next = new Map<number, number>();
+      for (const [doc, score] of scores) {
+        const more = found.get(doc);
+        if (more !== undefined) next.set(doc, score + more);
+      }
+      scores = next;
+    }
+    if (!scores.size) return [];
+  }
+
+  return [...scores!]
+    .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+    .slice(0, limit)
+    .map(([doc, score]) => {
+      const [stage, domain, projectId, title] = index.docs[doc];
+      return { stage, domain, projectId, title, score };
+    });
+}
+
+export async function search(query: string, limit = 10): Promise<SearchResult[]> {
+  return searchIndex(await loadSearchIndex(), query, limit);
+}
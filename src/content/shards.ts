@@ -0,0 +1,111 @@
+import { useEffect, useState } from "react";
+import shardIndex from "../data/shards/index.json";
+import { getStageDomains, getStagesForDomain } from "./contentIndex";
+
+// Shapes written by scripts/shards.py (already normalized at build time)
+export type ShardProject = {
+  id: string;
+  title?: string;
+  introduction?: string;
+  conclusion?: string;
+  image?: string;
+  image_source?: string;
+  qrCode?: string[];
+  author?: string;
+  // Present once scripts/optimize_assets.py has run (see assetManifest.json)
+  imageWidth?: number;
+  imageHeight?: number;
+  imagePlaceholder?: string;
+  imageSources?: { type: string; srcset: string }[];
+  imageVideo?: { type: string; src: string }[];
+};
+
+export type ShardQuestion = {
+  question: string;
+  choices: string[];
+  answer: string;
+};
+
+export type DomainShard = {
+  stage: string;
+  domain: string;
+  projects: ShardProject[];
+  questions: string[];
+  quiz: Record<string, ShardQuestion>;
+};
+
+type ShardIndexEntry = {
+  file: string;
+  projects: number;
+  questions: number;
+  hash: string;
+};
+
+const stages = (shardIndex as { stages: Record<string, Record<string, ShardIndexEntry>> }).stages;
+
+// One lazily loaded chunk per stage/domain shard
+const shardModules = import.meta.glob<DomainShard>("../data/shards/*/*.json", { import: "default" });
+
+const pending = new Map<string, Promise<DomainShard | null>>();
+const loaded = new Map<string, DomainShard>();
+
+export function getShardEntry(stageId: string, domainId: string): ShardIndexEntry | undefined {
+  return stages[stageId]?.[domainId];
+}
+
+// Same fallback the DomainScreen always had: the stage's first domain when none is
+// selected, or the selected domain under any stage when this stage lacks it.
+export function resolveShardKey(stageId: string, domainId: string | null): { stageId: string; domainId: string } | null {
+  if (!domainId) {
+    const first = getStageDomains(stageId)[0];
+    return first ? { stageId, domainId: first } : null;
+  }
+  if (getShardEntry(stageId, domainId)) return { stageId, domainId };
+  const otherStage = getStagesForDomain(domainId)[0];
+  return otherStage ? { stageId: otherStage, domainId } : null;
+}
+
+export function loadShard(stageId: string, domainId: string): Promise<DomainShard | null> {
+  const entry = getShardEntry(stageId, domainId);
+  const loader = entry ? shardModules[`../data/shards/${entry.file}`] : undefined;
+  if (!loader) return Promise.resolve(null);
+  let promise = pending.get(entry!.file);
+  if (!promise) {
+    promise = loader().then(shard => {
+      loaded.set(entry!.file, shard);
+      return shard;
+    }).catch(() => {
+      pending.delete(entry!.file);
+      return null;
+    });
+    pending.set(entry!.file, promise);
+  }
+  return promise;
+}
+
+function cachedShard(stageId: string, domainId: string): DomainShard | null | undefined {
+  const entry = getShardEntry(stageId, domainId);
+  if (!entry) return null;
+  return loaded.get(entry.file);
+}
+
+// undefined while loading, null when there is no shard for this stage/domain
+export function useDomainShard(stageId: string | null, domainId: string | null): DomainShard | null | undefined {
+  const [state, setState] = useState<{ key: string; shard: DomainShard | null | undefined }>({ key: "", shard: undefined });
+  const key = stageId && domainId ? `${stageId}/${domainId}` : "";
+
+  useEffect(() => {
+    if (!stageId || !domainId) return;
+    let cancelled = false;
+    loadShard(stageId, domainId).then(shard => {
+      if (!cancelled) setState({ key: `${stageId}/${domainId}`, shard });
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [stageId, domainId]);
+
+  if (!stageId || !domainId) return null;
+  if (state.key === key) return state.shard;
+  return cachedShard(stageId, domainId);
+}
@@ -2,9 +2,21 @@ import { StrictMode } from 'react'
 import { createRoot } from 'react-dom/client'
 import './index.css'
 import App from './App.tsx'
+import { loadPrecacheVersion } from './content/prefetch'
 
 createRoot(document.getElementById('root')!).render(
   <StrictMode>
     <App />
   </StrictMode>,
 )
+
+// Precache the content assets (public/sw.js); skipped in dev so Vite's HMR is untouched.
+// The URL changes with the manifest, since an unchanged sw.js would never reinstall.
+if (import.meta.env.PROD && 'serviceWorker' in navigator) {
+  window.addEventListener('load', () => {
+    loadPrecacheVersion()
+      .catch(() => null)
+      .then(version => navigator.serviceWorker.register(version ? `/sw.js?v=${version}` : '/sw.js'))
+      .catch(() => undefined)
+  })
+}
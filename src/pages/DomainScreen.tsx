@@ -1,104 +1,18 @@
 import lifeStages from '../data/lifeStages.json';
-import blurbsData from '../data/blurbs.json';
 import { motion, AnimatePresence } from 'framer-motion';
-import { useEffect, useMemo, useState, useRef } from 'react';
+import { useEffect, useState, useRef } from 'react';
 import DomainButtons from '../components/DomainButtons';
 import ExpandableText from '../components/ExpandableText';
+import ProjectImage from '../components/ProjectImage';
 import { trackProjectStart, trackProjectEnd } from '../analytics';
+import { resolveShardKey, useDomainShard, type ShardProject } from '../content/shards';
 
 // Prevent duplicate rapid project_view_start events (e.g., React 18 StrictMode double-mount in dev)
 const recentProjectStartMap: Record<string, number> = {};
 const PROJECT_START_DEDUP_WINDOW_MS = 1200; // window within which duplicate starts are ignored
 
-// Raw project shape from blurbs.json (updated to reflect new shapes)
-type RawProject = {
-  id?: string;  
-  title?: string;
-  introduction?: string;
-  conclusion?: string;
-  // some entries use an object { src, cite }, others may use a plain string
-  image?: { src?: string; cite?: string } | string;
-  qrCode?: string;
-  // author can be a string or an array of strings
-  author?: string | string[];
-};
-
-type RawDomainEntry = {
-  projects?: RawProject[];
-  // new: domain entries can include questions array
-  questions?: string[];
-};
-
-type RawStageEntry = {
-  stage: string;
-  // some stage objects use `domains`, others use `domain`
-  domains?: Record<string, RawDomainEntry>;
-  domain?: Record<string, RawDomainEntry>;
-};
-
-type RawBlurbsFile = Record<string, RawStageEntry>;
-
-// Normalized shapes used by the component
-type Project = {
-  id: string; // always present after normalization
-  title?: string;
-  introduction?: string;
-  conclusion?: string;
-  image?: string;
-  image_source?: string;
-  // normalize qrCode to an array (0..2 entries)
-  qrCode?: string[];
-  author?: string;
-};
-
-type Blurb = {
-  stage: string;
-  domain: string;
-  projects?: Project[];
-  // carry over domain-level question ids when present
-  questions?: string[];
-};
-
-function normalizeBlurbs(raw: RawBlurbsFile): Blurb[] {
-  const result: Blurb[] = [];
-  Object.values(raw).forEach(stageEntry => {
-    if (!stageEntry) return;
-    const stageId = stageEntry.stage;
-    const domainsObj = stageEntry.domains || stageEntry.domain || {};
-    Object.entries(domainsObj).forEach(([domainKey, domainValue]) => {
-      const projects: Project[] = (domainValue.projects || []).map((p, idx) => {
-        const imageSrc = typeof p.image === 'string' ? p.image : p.image?.src;
-        const imageSource = typeof p.image === 'object' ? p.image?.cite : undefined;
-        const authorNormalized = Array.isArray(p.author) ? p.author.join(', ') : p.author;
-        let qr: string[] | undefined;
-        if (Array.isArray(p.qrCode)) {
-          qr = p.qrCode.filter(Boolean).slice(0, 2);
-        } else if (typeof p.qrCode === 'string' && p.qrCode.trim() !== '') {
-          qr = [p.qrCode];
-        } else {
-          qr = undefined;
-        }
-        return {
-          id: (p as any).id ?? `${stageId}:${domainKey}:${idx}`, // NEW: carry id or fallback
-          title: p.title,
-          introduction: p.introduction,
-          conclusion: p.conclusion,
-          image: imageSrc,
-          image_source: imageSource,
-          qrCode: qr,
-          author: authorNormalized,
-        };
-      });
-      result.push({
-        stage: stageId,
-        domain: domainKey,
-        projects,
-        questions: Array.isArray(domainValue.questions) ? domainValue.questions.slice() : undefined,
-      });
-    });
-  });
-  return result;
-}
+// Projects arrive pre-normalized from the stage/domain shard (see scripts/shards.py)
+type Project = ShardProject;
 
 interface DomainScreenProps {
   stageId: string;
@@ -106,17 +20,17 @@ interface DomainScreenProps {
   onBack?: () => void;
   onSelectDomain?: (domainId: string) => void;
   onExitToAttract?: () => void; // NEW: exit to attract screen
+  projectId?: string | null; // project to open on, e.g. a search result
 }
 
 const uniformParagraphClasses =
   'text-lg text-slate-600 text-justify mt-1 md:mt-1 leading-relaxed px-3 md:px-3';
 
-const DomainScreen = ({ stageId, selectedDomain, onBack, onSelectDomain}: DomainScreenProps) => {
+const DomainScreen = ({ stageId, selectedDomain, onBack, onSelectDomain, projectId }: DomainScreenProps) => {
   const stage = lifeStages.find(s => s.id === stageId);
-  const normalizedBlurbs: Blurb[] = useMemo(
-    () => normalizeBlurbs(blurbsData as unknown as RawBlurbsFile),
-    []
-  );
+  // Only the shard for the screen being shown is fetched
+  const shardKey = resolveShardKey(stageId, selectedDomain);
+  const shard = useDomainShard(shardKey?.stageId ?? null, shardKey?.domainId ?? null);
 
   const [projectIndex, setProjectIndex] = useState(0);
   const [showImageModal, setShowImageModal] = useState(false);
@@ -125,25 +39,14 @@ const DomainScreen = ({ stageId, selectedDomain, onBack, onSelectDomain}: Domain
 
   if (!stage) return <div>Stage not found</div>;
 
-  // Select blurbs
-  let matchingBlurbs = normalizedBlurbs.filter(b => {
-    if (b.stage !== stageId) return false;
-    if (selectedDomain) return b.domain === selectedDomain;
-    return true;
-  });
-
-  if (matchingBlurbs.length === 0 && selectedDomain) {
-    matchingBlurbs = normalizedBlurbs.filter(b => b.domain === selectedDomain);
-  }
-
-  const activeBlurb = matchingBlurbs[0];
-  const projects = activeBlurb?.projects ?? [];
+  const projects = shard?.projects ?? [];
   const hasProjects = projects.length > 0;
   const currentProject: Project | undefined = hasProjects ? projects[projectIndex] : undefined;
 
   useEffect(() => {
-    setProjectIndex(0);
-  }, [stageId, selectedDomain, activeBlurb]);
+    const focused = projectId ? projects.findIndex(p => p.id === projectId) : -1;
+    setProjectIndex(Math.max(focused, 0));
+  }, [stageId, selectedDomain, shard, projectId]);
 
   
 
@@ -268,7 +171,7 @@ const DomainScreen = ({ stageId, selectedDomain, onBack, onSelectDomain}: Domain
         <div className="col-span-1 lg:col-span-3">
           <div className="flex flex-col px-3 lg:flex-row lg:items-center lg:justify-between mb-1">
             <h2 className="text-lg text-slate-800 md:text-xl w-2xl md:max-w-3xl font-semibold text-center lg:text-left px-4 lg:px-0">
-              {currentProject?.title || 'No content for this stage/domain'}
+              {currentProject?.title || (shard === undefined ? '' : 'No content for this stage/domain')}
             </h2>
             {onBack ? (
             <div className="col-span-1 mb-1">
@@ -361,9 +264,8 @@ const DomainScreen = ({ stageId, selectedDomain, onBack, onSelectDomain}: Domain
               className="cursor-zoom-in outline-none rounded-xl w-full border-base-300"
               aria-label="Open image in larger view"
             >
-              <img
-                src={currentProject.image}
-                alt={currentProject.title}
+              <ProjectImage
+                project={currentProject}
                 className="object-cover max-h-48 md:max-h-60 w-full min-h-56 border-base-300 transition-transform rounded-xl duration-200 hover:scale-[1.01]"
               />
             </div>
@@ -510,9 +412,9 @@ const DomainScreen = ({ stageId, selectedDomain, onBack, onSelectDomain}: Domain
                 </button>
               </div>
               <div className="flex-1 overflow-auto p-2">
-                <img
-                  src={currentProject?.image}
-                  alt={currentProject?.title}
+                <ProjectImage
+                  project={currentProject}
+                  sizes="100vw"
                   className="mx-auto max-h-[70vh] object-contain"
                 />
                 <p className="mt-2 text-center text-sm text-base-content/70">
@@ -1,7 +1,6 @@
 import React, { useRef, useState, useEffect } from "react";
 import { AnimatePresence, motion } from "framer-motion";
-import questionsData from "../data/questions.json";
-import blurbsData from "../data/blurbs.json";
+import { useDomainShard, type ShardQuestion } from "../content/shards";
 import { swapCard } from "../assets/animations/variants";
 import { trackQuestionAnswered } from "../analytics"; // <-- added
 
@@ -13,12 +12,6 @@ interface QuestionScreenProps {
   onNext?: () => void;
 }
 
-type QuestionFromMap = {
-  question: string;
-  choices: string[];
-  answer: string;
-};
-
 type Question = {
   id: string;
   Title: string;
@@ -65,21 +58,10 @@ const QuestionScreen: React.FC<QuestionScreenProps> = ({
   const timerRef = useRef<number | null>(null);
   const autoNavRef = useRef(false); // added: prevent double navigation when no questions
 
-  
-  const questionsMap = questionsData as Record<string, QuestionFromMap>;
-
-  // Read question ids for the current stage + domain from blurbs.json
-  const domainQuestionIds: string[] = React.useMemo(() => {
-    try {
-      const stage = (blurbsData as Record<string, any>)[currentStageId];
-      const domain = stage?.domains?.[selectedDomain];
-      const q = domain?.questions;
-      if (Array.isArray(q) && q.length > 0) return q;
-    } catch {
-      // fall through to empty
-    }
-    return [];
-  }, [currentStageId, selectedDomain]);
+  // Questions for this stage + domain come with its shard (undefined while loading)
+  const shard = useDomainShard(currentStageId, selectedDomain);
+  const questionsMap = React.useMemo<Record<string, ShardQuestion>>(() => shard?.quiz ?? {}, [shard]);
+  const domainQuestionIds: string[] = React.useMemo(() => shard?.questions ?? [], [shard]);
 
   // Randomly select one question id if there are multiple for the domain
   const selectedQuestionId = React.useMemo(() => {
@@ -117,14 +99,14 @@ const QuestionScreen: React.FC<QuestionScreenProps> = ({
   // added: Auto-navigate to DomainScreen if there are no questions for this domain,
   // or the selected question id is invalid for some reason.
   useEffect(() => {
-    if (autoNavRef.current) return;
+    if (autoNavRef.current || shard === undefined) return;
     const noQuestions = !domainQuestionIds || domainQuestionIds.length === 0;
     const invalidSelection = selectedQuestionId && !questionsMap[selectedQuestionId];
     if (noQuestions || invalidSelection) {
       autoNavRef.current = true;
       onNext?.();
     }
-  }, [domainQuestionIds, selectedQuestionId, questionsMap, onNext]);
+  }, [shard, domainQuestionIds, selectedQuestionId, questionsMap, onNext]);
 
   // Limit to 4 choices but always include the correct answer
   const displayedChoices: string[] = React.useMemo(() => {
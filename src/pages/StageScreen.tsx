@@ -1,14 +1,18 @@
 import React, { useState, useEffect } from "react";
 import StageNav from "../components/StageNav";
 import DomainButtons from "../components/DomainButtons";
+import ProjectSearch from "../components/ProjectSearch";
 import { motion, AnimatePresence } from "framer-motion";
-import blurbsData from "../data/blurbs.json"; // NEW: read questions info
+import { domainHasQuestions } from "../content/contentIndex";
+import type { SearchResult } from "../content/search";
 
 interface StageScreenProps {
   currentStageId: string | null;
   setCurrentStageId: (id: string | null) => void;
   selectedDomain: string | null;
   onExitToAttract?: () => void;
+  // Open a project found with the search field on the stage picker
+  onOpenProject?: (result: SearchResult) => void;
   // UPDATED: allow passing options to control whether to skip quiz flow
   setSelectedDomain: (domainId: string | null, options?: { skipQuiz?: boolean }) => void;
 }
@@ -23,6 +27,7 @@ const StageScreen: React.FC<StageScreenProps> = ({
   selectedDomain,
   setSelectedDomain,
   onExitToAttract,
+  onOpenProject,
 }) => {
   useEffect(() => {
     // Clear any previously selected domain when stage changes
@@ -38,10 +43,7 @@ const StageScreen: React.FC<StageScreenProps> = ({
       setSelectedDomain(domainId);
       return;
     }
-    const stageEntry = (blurbsData as Record<string, any>)[currentStageId];
-    const domainsObj = stageEntry?.domains || stageEntry?.domain || {};
-    const q = domainsObj?.[domainId]?.questions;
-    const hasQuestions = Array.isArray(q) && q.length > 0;
+    const hasQuestions = domainHasQuestions(currentStageId, domainId);
 
     setSelectedDomain(domainId, { skipQuiz: !hasQuestions });
   };
@@ -55,6 +57,11 @@ const StageScreen: React.FC<StageScreenProps> = ({
            <div/>
           <div className="justify-center text-base-content/70 text-center md:text-base mb-3 md:mb-4">
             <p className="text-lg">Select a life stage below to continue</p>
+            {onOpenProject && !currentStageId ? (
+              <div className="mt-2">
+                <ProjectSearch onOpen={onOpenProject} />
+              </div>
+            ) : null}
           </div>
          
           <div>